@@ -3,15 +3,49 @@ from PIL import Image
 import time
 import re
 import json
+import os
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
+from ocr_accuracy import score_accuracy
 
 # Tesseract 경로 설정 (Windows 환경)
 pytesseract.pytesseract.tesseract_cmd = r'C:\Users\User\AppData\Local\Packages\PythonSoftwareFoundation.Python.3.11_qbz5n2kfra8p0\LocalCache\local-packages\Python311\Scripts\pytesseract.exe'
 
+# 기본 OCR에 사용할 Tesseract 설정 목록 (순서가 곧 결과 우선순위)
+OCR_CONFIGS = [
+    r'--oem 3 --psm 6',  # 기본 설정
+    r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz가-힣()[]:/\-+,.XCL',
+    r'--oem 3 --psm 4',  # 단일 컬럼 텍스트
+    r'--oem 3 --psm 8'   # 단일 단어
+]
+
+# 캐스케이드 모드에서 시도할 설정 순서 (OCR_CONFIGS 인덱스)
+# 표 전체를 한 블록으로 읽는 psm 6이 가장 자주 통과하므로 먼저, 다음은 분할 방식이 다른 psm 4
+CASCADE_ORDER = [0, 2, 1, 3]
+# 캐스케이드 조기 종료 기준 (score_accuracy 점수)
+DEFAULT_QUALITY_THRESHOLD = 70
+
+def run_tesseract_config(img, config):
+    """설정 하나로 Tesseract 실행 (결과 텍스트, 소요 시간) 반환 - 실패 시 빈 문자열"""
+    start_time = time.time()
+    try:
+        result = pytesseract.image_to_string(img, lang='kor+eng', config=config)
+    except:
+        result = ""
+    return result, time.time() - start_time
+
 class CafeScheduleTesseractTester:
-    def __init__(self, image_path):
+    def __init__(self, image_path, max_workers=None, preprocess=False, cascade=False,
+                 quality_threshold=DEFAULT_QUALITY_THRESHOLD):
         self.image_path = image_path
+        # 설정별 Tesseract 프로세스를 동시에 몇 개까지 띄울지 (None이면 설정 수와 CPU 수 중 작은 값)
+        self.max_workers = max_workers
+        # True면 이진화/기울기 보정/테두리 제거한 이미지(캐시됨)로 OCR (image_preprocess.py)
+        self.preprocess = preprocess
+        # True면 설정을 하나씩 실행하고 품질 점수가 quality_threshold 이상이면 바로 종료
+        self.cascade = cascade
+        self.quality_threshold = quality_threshold
         self.expected_data = self.define_expected_data()
         self.test_results = {}
         
@@ -77,38 +111,47 @@ class CafeScheduleTesseractTester:
         return scores
     
     def execute_base_ocr(self):
-        """기본 OCR 실행 및 결과 저장"""
+        """기본 OCR 실행 및 결과 저장 (설정별 Tesseract를 병렬 실행, cascade 모드면 순차 조기 종료)"""
         try:
-            img = Image.open(self.image_path)
+            preprocess_info = None
+            if self.preprocess:
+                from image_preprocess import preprocess_file
+                clean, preprocess_info, preprocess_hit = preprocess_file(self.image_path)
+                img = Image.fromarray(clean)
+                preprocess_info = dict(preprocess_info, cache_hit=preprocess_hit)
+            else:
+                img = Image.open(self.image_path)
+                img.load()  # 스레드들이 같은 이미지를 공유하므로 미리 디코딩
             start_time = time.time()
             
-            # 여러 OCR 설정 시도
-            configs = [
-                r'--oem 3 --psm 6',  # 기본 설정
-                r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz가-힣()[]:/\-+,.XCL',
-                r'--oem 3 --psm 4',  # 단일 컬럼 텍스트
-                r'--oem 3 --psm 8'   # 단일 단어
-            ]
-            
-            results = []
-            for config in configs:
-                try:
-                    result = pytesseract.image_to_string(img, lang='kor+eng', config=config)
-                    results.append(result)
-                except:
-                    results.append("")
-            
-            # 가장 긴 결과를 메인 결과로 선택
-            best_result = max(results, key=len) if results else ""
+            cascade_info = None
+            if self.cascade:
+                best_result, results, config_times, cascade_info = self.run_cascade(img)
+            else:
+                # 여러 OCR 설정을 동시에 시도 (각 호출은 별도의 tesseract 프로세스)
+                configs = OCR_CONFIGS
+                max_workers = self.max_workers or min(len(configs), os.cpu_count() or 1)
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    outputs = list(executor.map(lambda config: run_tesseract_config(img, config), configs))
+                
+                # 완료 순서와 관계없이 설정 순서대로 정렬된 결과
+                results = [text for text, _ in outputs]
+                config_times = [elapsed for _, elapsed in outputs]
+                
+                # 가장 긴 결과를 메인 결과로 선택 (길이가 같으면 앞선 설정 우선)
+                best_result = max(results, key=len) if results else ""
             
             end_time = time.time()
             
             self.test_results.update({
                 'raw_text': best_result,
                 'all_results': results,
+                'config_times': config_times,
                 'processing_time': end_time - start_time,
                 'image_size': img.size,
-                'text_length': len(best_result)
+                'text_length': len(best_result),
+                'preprocess': preprocess_info,
+                'cascade': cascade_info
             })
             
         except Exception as e:
@@ -119,56 +162,56 @@ class CafeScheduleTesseractTester:
                 'error': str(e)
             })
     
+    def run_cascade(self, img):
+        """
+        CASCADE_ORDER 순서로 설정을 하나씩 실행하고 품질 점수가 기준 이상이면 중단
+        기준을 넘는 결과가 없으면 점수가 가장 높은 결과 (같으면 더 긴 결과) 선택
+        return: (최종 텍스트, 실행한 설정 결과 목록, 설정별 소요 시간, 캐스케이드 정보)
+        """
+        results = []
+        config_times = []
+        scores = []
+        configs_run = []
+        for index in CASCADE_ORDER:
+            text, elapsed = run_tesseract_config(img, OCR_CONFIGS[index])
+            results.append(text)
+            config_times.append(elapsed)
+            scores.append(self.score_accuracy(text)['score'])
+            configs_run.append(index)
+            if scores[-1] >= self.quality_threshold:
+                break
+        
+        best = max(range(len(results)), key=lambda i: (scores[i], len(results[i])))
+        return results[best], results, config_times, {
+            'configs_run': configs_run,
+            'scores': scores,
+            'selected_config': configs_run[best],
+            'threshold': self.quality_threshold,
+            'early_exit': scores[-1] >= self.quality_threshold
+        }
+    
+    def score_accuracy(self, extracted_text):
+        """
+        정확도 신호 계산 (출력 없음) - test_accuracy와 캐스케이드 품질 판정에서 공용
+        return: {'score': 0-100, 이름/시간대/특수코드/숫자별 인식 수와 점수} (ocr_accuracy.score_accuracy)
+        """
+        return score_accuracy(extracted_text, self.expected_data)
+    
     def test_accuracy(self):
         """1. 정확도 테스트 (25%)"""
         print("📊 1. 정확도 테스트")
         
         extracted_text = self.test_results.get('raw_text', '')
-        score = 0
-        
-        # 스태프 이름 인식 (40점)
-        recognized_names = 0
-        for name in self.expected_data['staff_names']:
-            if name in extracted_text:
-                recognized_names += 1
-            elif any(char in extracted_text for char in name):  # 부분 일치
-                recognized_names += 0.5
-        
-        name_score = (recognized_names / len(self.expected_data['staff_names'])) * 40
-        score += name_score
-        
-        # 시간대 인식 (30점)
-        time_patterns_found = 0
-        for pattern in self.expected_data['time_patterns']:
-            if pattern in extracted_text or pattern.replace('-', '') in extracted_text:
-                time_patterns_found += 1
-        
-        time_score = (time_patterns_found / len(self.expected_data['time_patterns'])) * 30
-        score += time_score
-        
-        # 특수 코드 인식 (20점)
-        special_codes_found = 0
-        for code in ['CL', 'X']:
-            count = extracted_text.count(code)
-            if count >= 3:  # 충분히 많이 발견됨
-                special_codes_found += 1
-            elif count >= 1:  # 일부 발견됨
-                special_codes_found += 0.5
-        
-        special_score = (special_codes_found / 2) * 20
-        score += special_score
-        
-        # 숫자 인식 (10점)
-        numbers = re.findall(r'\d+', extracted_text)
-        if len(numbers) >= 15:
-            number_score = 10
-        elif len(numbers) >= 10:
-            number_score = 7
-        elif len(numbers) >= 5:
-            number_score = 4
-        else:
-            number_score = 1
-        score += number_score
+        signals = self.score_accuracy(extracted_text)
+        score = signals['score']
+        recognized_names = signals['recognized_names']
+        name_score = signals['name_score']
+        time_patterns_found = signals['time_patterns_found']
+        time_score = signals['time_score']
+        special_codes_found = signals['special_codes_found']
+        special_score = signals['special_score']
+        numbers = signals['numbers']
+        number_score = signals['number_score']
         
         print(f"   ✅ 이름 인식: {recognized_names:.1f}/{len(self.expected_data['staff_names'])} (점수: {name_score:.1f})")
         print(f"   ✅ 시간대 인식: {time_patterns_found}/{len(self.expected_data['time_patterns'])} (점수: {time_score:.1f})")
@@ -245,6 +288,17 @@ class CafeScheduleTesseractTester:
             score = 10
             
         print(f"   ✅ 처리시간: {processing_time:.2f}초")
+        cascade_info = self.test_results.get('cascade')
+        config_numbers = [i + 1 for i in cascade_info['configs_run']] if cascade_info else None
+        for i, elapsed in enumerate(self.test_results.get('config_times', [])):
+            print(f"      - 설정 {config_numbers[i] if config_numbers else i + 1}: {elapsed:.2f}초")
+        if cascade_info:
+            print(f"      - 캐스케이드: {len(cascade_info['configs_run'])}/{len(OCR_CONFIGS)}개 설정 실행 "
+                  f"(점수 {', '.join(f'{sc:.0f}' for sc in cascade_info['scores'])}, 기준 {cascade_info['threshold']})")
+        preprocess_info = self.test_results.get('preprocess')
+        if preprocess_info:
+            steps = ', '.join(f"{step} {elapsed:.3f}초" for step, elapsed in preprocess_info['timing'].items())
+            print(f"      - 전처리{' (캐시)' if preprocess_info['cache_hit'] else ''}: {steps}")
         print(f"   🎯 속도 점수: {score}/100")
         
         return score
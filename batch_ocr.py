@@ -0,0 +1,207 @@
+"""
+이미지 디렉터리 일괄 OCR (프로세스 풀)
+워커 프로세스마다 엔진을 한 번만 초기화하고, 작업 큐에서 이미지 경로를 하나씩 가져가 처리합니다.
+결과는 입력 순서대로 스트리밍되므로 수천 장을 처리해도 메모리에 모아두지 않습니다.
+
+사용 예:
+    python batch_ocr.py ./rosters --engine tesseract --workers 8 --output tesseract_test_results.json
+    python batch_ocr.py --corpus corpus.json --engine easyocr   # 미리 디코딩한 코퍼스 (image_corpus.py, 캐시 없이)
+    python batch_ocr.py ./rosters --output tesseract_batch_results.ndjson   # 한 줄에 한 장, 다시 실행하면 이어서 처리
+    python batch_ocr.py ./rosters --engine easyocr --workers 2 --threads 4    # CPU 예산 직접 지정 (cpu_budget.py)
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import time
+from pathlib import Path
+
+from cpu_budget import plan_budget
+from result_stream import completed_names, is_stream_path, open_result_writer
+
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff']
+ENGINES = ['tesseract', 'easyocr']
+
+# 워커 프로세스 전역 상태 (워커마다 한 번 초기화)
+_worker_run = None
+_worker_run_frame = None
+_worker_error_result = None
+_worker_corpus = None
+
+
+def find_image_files(directory='.'):
+    """디렉터리의 이미지 파일 목록 (이름순, 대소문자 확장자 중복 제거)"""
+    return sorted(p for p in Path(directory).iterdir()
+                  if p.is_file() and p.suffix.lower() in IMAGE_EXTENSIONS)
+
+
+def _init_worker(engine, options, corpus_path=None, budget=None, worker_counter=None):
+    """
+    워커 초기화: 엔진 모듈 로드 및 모델 워밍 (코퍼스는 워커마다 메모리 매핑 - 페이지는 프로세스끼리 공유)
+    budget: cpu_budget.plan_budget 결과 - 엔진 import 전에 스레드 수 제한 + 워커 번호별 코어 고정
+    """
+    global _worker_run, _worker_run_frame, _worker_error_result, _worker_corpus
+
+    if budget:
+        from cpu_budget import apply_worker_budget
+        with worker_counter.get_lock():
+            index = worker_counter.value
+            worker_counter.value += 1
+        apply_worker_budget(budget, index)
+
+    if engine == 'easyocr':
+        from easyocr_test import ocr_image_easyocr, ocr_bytes_easyocr, error_result
+        from ocr_engines import get_easyocr_reader
+        reader = get_easyocr_reader(['ko', 'en'], gpu=False)
+        _worker_run = lambda img_path: ocr_image_easyocr(reader, img_path, **options)
+        _worker_run_frame = lambda frame: ocr_bytes_easyocr(reader, None, frame.name, use_cache=False,
+                                                            frame=frame, **options)
+    elif engine == 'tesseract':
+        from tesseract_test import ocr_image_tesseract, ocr_bytes_tesseract, error_result
+        _worker_run = lambda img_path: ocr_image_tesseract(img_path, **options)
+        _worker_run_frame = lambda frame: ocr_bytes_tesseract(None, frame.name, use_cache=False,
+                                                              frame=frame, **options)
+    else:
+        raise ValueError(f"지원하지 않는 엔진: {engine}")
+    _worker_error_result = error_result
+    if budget:
+        # 엔진이 import한 torch / cv2에도 적용
+        from cpu_budget import set_library_threads
+        set_library_threads(budget['threads'])
+    if corpus_path:
+        from image_corpus import ImageCorpus
+        _worker_corpus = ImageCorpus(corpus_path)
+
+
+def _process_image(item):
+    """워커에서 이미지 한 장 처리 (item: 이미지 경로 또는 코퍼스 프레임 번호, 예외는 결과 항목으로 변환)"""
+    if isinstance(item, int):
+        name = _worker_corpus.frames[item]['name']
+    else:
+        name = Path(item).name
+    try:
+        if isinstance(item, int):
+            result = _worker_run_frame(_worker_corpus.frame(item))
+        else:
+            result = _worker_run(item)
+        if result is None:
+            return _worker_error_result(name, "이미지를 읽을 수 없습니다")
+        result['worker_pid'] = os.getpid()
+        return result
+    except Exception as e:
+        return _worker_error_result(name, e)
+
+
+def run_batch_ocr(image_paths, engine='tesseract', workers=None, corpus=None, budget=None, **options):
+    """
+    여러 이미지를 워커 프로세스 N개로 OCR
+    image_paths: 이미지 경로 목록 (corpus를 지정하면 처리할 프레임 이름 목록, None이면 전체)
+    corpus: image_corpus 인덱스 경로 - 지정하면 코퍼스 프레임을 디코딩 없이 처리 (캐시 사용 안 함)
+    engine: 'tesseract' 또는 'easyocr'
+    workers: 워커 프로세스 수 (None이면 budget의 워커 수, budget도 없으면 CPU 수)
+    budget: cpu_budget.plan_budget 결과 - 워커마다 엔진 스레드 수를 제한하고 코어를 고정 (None이면 엔진 기본값)
+    options: 엔진별 처리 함수에 전달할 옵션 (tesseract: config, single_pass)
+    yield: 이미지별 결과 dict (입력 순서 유지)
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"지원하지 않는 엔진: {engine}")
+
+    if corpus:
+        from image_corpus import ImageCorpus
+        names = ImageCorpus(corpus).names
+        if image_paths is None:
+            items = list(range(len(names)))
+        else:
+            positions = {name: i for i, name in enumerate(names)}
+            items = [positions[Path(p).name] for p in image_paths]
+    else:
+        items = [str(p) for p in image_paths]
+    workers = workers or (budget and budget['workers']) or os.cpu_count() or 1
+    workers = max(1, min(workers, len(items)))
+    if not items:
+        return
+
+    # torch 등 fork와 궁합이 나쁜 라이브러리가 있어 spawn 사용 (Windows 기본값과 동일)
+    ctx = mp.get_context('spawn')
+    # 워커 번호 (코어 묶음 배정용)
+    worker_counter = ctx.Value('i', 0)
+    with ctx.Pool(processes=workers, initializer=_init_worker,
+                  initargs=(engine, options, corpus, budget, worker_counter)) as pool:
+        # chunksize=1: 워커가 큐에서 한 장씩 가져가므로 처리 시간이 제각각이어도 부하가 고르게 분산됨
+        for result in pool.imap(_process_image, items, chunksize=1):
+            yield result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이미지 디렉터리 일괄 OCR")
+    parser.add_argument('directory', nargs='?', default='.', help="이미지 디렉터리 (기본: 현재 디렉터리)")
+    parser.add_argument('--engine', choices=ENGINES, default='tesseract')
+    parser.add_argument('--workers', type=int, default=None,
+                        help="워커 프로세스 수 (기본: cpu_budget.json 또는 코어 수 / 엔진 스레드 수)")
+    parser.add_argument('--threads', type=int, default=None, help="워커당 엔진 스레드 수 (기본: 코어 수 / 워커 수)")
+    parser.add_argument('--no-pin', action='store_true', help="워커를 코어에 고정하지 않음")
+    parser.add_argument('--output', default=None,
+                        help="결과 파일 (기본: <engine>_batch_results.json, .ndjson이면 한 줄씩 기록하고 이어서 처리, "
+                             ".ocrc면 열 기반 바이너리)")
+    parser.add_argument('--normalize', action='store_true', help="글자 높이 기준으로 축소 디코딩 후 인식")
+    parser.add_argument('--corpus', default=None, help="미리 디코딩한 코퍼스 인덱스 (image_corpus.py pack)")
+    args = parser.parse_args()
+
+    if args.corpus:
+        if args.normalize:
+            print("❌ --normalize는 원본 파일 축소 디코딩이라 --corpus와 함께 쓸 수 없습니다.")
+            return
+        from image_corpus import ImageCorpus
+        image_files = ImageCorpus(args.corpus).names
+    else:
+        image_files = find_image_files(args.directory)
+    if not image_files:
+        print("❌ 이미지 파일을 찾을 수 없습니다.")
+        return
+
+    output_file = args.output or f'{args.engine}_batch_results.json'
+    if is_stream_path(output_file):
+        # 이전 실행에서 이미 기록된 이미지는 건너뜀
+        done = completed_names(output_file)
+        if done:
+            image_files = [p for p in image_files if Path(p).name not in done]
+            print(f"♻️  이미 기록된 {len(done)}개 이미지는 건너뜁니다: {output_file}")
+        if not image_files:
+            print("✅ 모든 이미지가 이미 처리되었습니다.")
+            return
+    budget = plan_budget(args.engine, args.workers, args.threads, pin=not args.no_pin)
+    workers = max(1, min(budget['workers'], len(image_files)))
+    print(f"📁 발견된 이미지 파일: {len(image_files)}개")
+    print(f"🔧 {args.engine} 워커 {workers}개 x 스레드 {budget['threads']}개로 처리 시작 "
+          f"(코어 {len(budget['cores'])}개, {budget['source']})")
+
+    start_time = time.time()
+    success_count = 0
+    total_texts = 0
+
+    # 결과를 한 장씩 파일에 기록 (.ndjson은 한 줄에 하나, 그 외는 기존 *_test_results.json과 같은 JSON 배열 형식)
+    with open_result_writer(output_file) as writer:
+        for i, result in enumerate(run_batch_ocr(image_files, args.engine, workers, args.corpus, budget,
+                                                 normalize=args.normalize)):
+            writer.write(result)
+
+            if 'error' in result:
+                print(f"   ❌ [{i+1}/{len(image_files)}] {result['image_name']}: {result['error']}")
+            else:
+                success_count += 1
+                total_texts += result['text_count']
+                print(f"   ✅ [{i+1}/{len(image_files)}] {result['image_name']}: "
+                      f"{result['text_count']}개 텍스트, {result['processing_time']:.2f}초")
+
+    elapsed = time.time() - start_time
+    print(f"\n{'='*60}")
+    print("📊 일괄 처리 결과 요약")
+    print(f"{'='*60}")
+    print(f"✅ 성공: {success_count}/{len(image_files)}개 이미지")
+    print(f"📝 총 추출된 텍스트: {total_texts}개")
+    print(f"⏱️  전체 소요 시간: {elapsed:.2f}초 ({len(image_files) / max(elapsed, 1e-9):.2f}장/초)")
+    print(f"💾 결과가 '{output_file}'에 저장되었습니다.")
+
+
+if __name__ == "__main__":
+    main()
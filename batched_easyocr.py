@@ -0,0 +1,231 @@
+"""
+여러 이미지를 묶어서 EasyOCR 인식 (CPU에서 호출당 오버헤드 분산)
+readtext/recognize는 CPU에서 batch_size와 관계없이 글자 영역을 하나씩 인식기에 넘깁니다
+(easyocr.Reader.recognize의 device == 'cpu' 분기).
+여기서는 이미지마다 검출(reader.detect)만 따로 하고, 여러 이미지에서 잘라낸 글자 영역을
+인식 함수(easyocr.recognition.get_text)에 직접 batch_size 단위로 넘깁니다.
+배치는 가장 넓은 영역 폭으로 패딩되므로 인식기 입력 폭이 같은 영역끼리 묶습니다.
+
+배치 크기는 사용 가능한 메모리(MemAvailable)에 맞춰 정합니다.
+결과 항목 형식은 easyocr_test.ocr_image_easyocr와 같습니다 (bbox는 원본 이미지 좌표, 빈 텍스트 항목도 포함).
+"""
+
+import math
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# 인식기 입력 한 개(높이 64로 리사이즈된 글자 영역)당 필요한 메모리 추정치 (활성값 포함)
+BYTES_PER_CROP = 8 * 1024 * 1024
+# 사용 가능한 메모리 중 배치에 쓸 비율
+MEMORY_FRACTION = 0.25
+MIN_BATCH_SIZE = 8
+MAX_BATCH_SIZE = 256
+# EasyOCR 인식기 입력 높이 기본값 (easyocr.easyocr 모듈 전역 imgH - 사용자 모델이면 yaml 값으로 바뀜)
+DEFAULT_IMAGE_HEIGHT = 64
+
+
+def available_memory_bytes():
+    """사용 가능한 메모리 (리눅스 /proc/meminfo, 없으면 psutil, 측정 불가 시 None)"""
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    try:
+        import psutil
+        return psutil.virtual_memory().available
+    except ImportError:
+        return None
+
+
+def auto_batch_size(memory_bytes=None):
+    """사용 가능한 메모리에 맞춘 인식 배치 크기"""
+    memory_bytes = memory_bytes or available_memory_bytes()
+    if not memory_bytes:
+        return MIN_BATCH_SIZE * 2
+    size = int(memory_bytes * MEMORY_FRACTION // BYTES_PER_CROP)
+    return max(MIN_BATCH_SIZE, min(MAX_BATCH_SIZE, size))
+
+
+def _quad_crop(gray, quad):
+    """기울어진 4점 영역을 수평 직사각형으로 펴서 잘라냄"""
+    import cv2
+
+    quad = np.asarray(quad, dtype=np.float32)
+    width = int(round(max(np.linalg.norm(quad[1] - quad[0]), np.linalg.norm(quad[2] - quad[3]))))
+    height = int(round(max(np.linalg.norm(quad[3] - quad[0]), np.linalg.norm(quad[2] - quad[1]))))
+    if width < 1 or height < 1:
+        return None
+    target = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.float32)
+    return cv2.warpPerspective(gray, cv2.getPerspectiveTransform(quad, target), (width, height))
+
+
+def detect_crops(reader, image):
+    """
+    이미지 한 장에서 글자 영역 검출 후 잘라내기
+    image: BGR 배열 또는 DecodedFrame (흑백 변환을 다른 단계와 공유)
+    return: [(원본 좌표 4점 bbox, 흑백 글자 영역 이미지), ...]
+    """
+    from decoded_frame import as_frame
+
+    frame = as_frame(image)
+    gray = frame.gray
+    horizontal_list, free_list = reader.detect(frame.bgr)
+    horizontal_list, free_list = horizontal_list[0], free_list[0]
+
+    h, w = gray.shape
+    crops = []
+    for x_min, x_max, y_min, y_max in horizontal_list:
+        x_min, y_min = max(0, int(x_min)), max(0, int(y_min))
+        x_max, y_max = min(w, int(x_max)), min(h, int(y_max))
+        if x_max <= x_min or y_max <= y_min:
+            continue
+        bbox = [[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]]
+        crops.append((bbox, gray[y_min:y_max, x_min:x_max]))
+    for quad in free_list:
+        crop = _quad_crop(gray, quad)
+        if crop is not None:
+            crops.append(([[float(x), float(y)] for x, y in quad], crop))
+    return crops
+
+
+def recognize_crops(reader, crops, batch_size):
+    """
+    여러 이미지의 글자 영역을 인식기에 batch_size개씩 넘겨 인식
+    crops: 흑백 글자 영역 이미지 목록
+    return: crops 순서대로 [(text, confidence)]
+    """
+    from easyocr.recognition import get_text
+    from easyocr.utils import compute_ratio_and_resize
+
+    # reader.recognize와 같은 전처리: 높이 imgH로 리사이즈, 언어에 없는 글자는 무시
+    image_height = getattr(sys.modules[type(reader).__module__], 'imgH', DEFAULT_IMAGE_HEIGHT)
+    items = []
+    for i, crop in enumerate(crops):
+        height, width = crop.shape[:2]
+        if height and width:
+            resized, ratio = compute_ratio_and_resize(crop, width, height, image_height)
+            items.append((ratio, i, resized))
+    items.sort(key=lambda item: item[0])
+    ignore_char = ''.join(set(reader.character) - set(reader.lang_char))
+
+    # 입력 폭(get_image_list와 같은 ceil(비율) x 높이)이 같은 영역끼리 batch_size개까지 묶음
+    # - 폭이 다른 영역을 섞으면 가장 넓은 폭으로 패딩되어 영역별 인식보다 느려짐
+    groups = []
+    for item in items:
+        if groups and math.ceil(groups[-1][0][0]) == math.ceil(item[0]) and len(groups[-1]) < batch_size:
+            groups[-1].append(item)
+        else:
+            groups.append([item])
+
+    outputs = [('', 0.0)] * len(crops)
+    for group in groups:
+        max_width = math.ceil(max(1, group[-1][0])) * image_height
+        results = get_text(reader.character, image_height, int(max_width), reader.recognizer, reader.converter,
+                           [(i, resized) for _, i, resized in group], ignore_char=ignore_char,
+                           batch_size=len(group), workers=0, device=reader.device)
+        for i, text, confidence in results:
+            outputs[i] = (text, float(confidence))
+    return outputs
+
+
+def _make_result(image_name, extracted_texts, processing_time):
+    total_confidence = sum(item['confidence'] for item in extracted_texts)
+    return {
+        'image_name': image_name,
+        'processing_time': processing_time,
+        'cache_hit': False,
+        'text_count': len(extracted_texts),
+        'avg_confidence': total_confidence / len(extracted_texts) if extracted_texts else 0,
+        'total_length': sum(len(item['text']) for item in extracted_texts),
+        'extracted_texts': extracted_texts,
+        'full_text': ' '.join(item['text'] for item in extracted_texts)
+    }
+
+
+def ocr_images_batched(reader, image_paths, batch_size=None, crops_per_call=None):
+    """
+    여러 이미지를 검출은 한 장씩, 인식은 여러 장을 묶어서 처리
+    image_paths: 이미지 경로 또는 DecodedFrame(image_corpus 프레임 등 - 디코딩 없이 사용) 목록
+    batch_size: 인식기 배치 크기 (None이면 사용 가능한 메모리에 맞춤)
+    crops_per_call: recognize 한 번에 넘길 최대 글자 영역 수 (None이면 batch_size의 4배)
+    yield: 이미지 순서대로 결과 dict (읽을 수 없는 이미지는 {'image_name', 'error'})
+        processing_time은 검출 시간 + 묶음 인식 시간을 글자 영역 수로 나눈 몫
+    """
+    import cv2
+    from decoded_frame import DecodedFrame
+
+    batch_size = batch_size or auto_batch_size()
+    crops_per_call = crops_per_call or batch_size * 4
+
+    pending = []  # [(이미지 이름, [(bbox, crop)], 검출 시간)]
+    pending_crops = 0
+
+    def flush():
+        all_crops = [crop for _, items, _ in pending for _, crop in items]
+        start_time = time.time()
+        recognized = recognize_crops(reader, all_crops, batch_size)
+        recognize_time = time.time() - start_time
+        per_crop = recognize_time / len(all_crops) if all_crops else 0
+
+        offset = 0
+        for image_name, items, detect_time in pending:
+            extracted_texts = []
+            # 인식 결과가 빈 문자열인 영역도 readtext처럼 그대로 포함 (text_count/avg_confidence가 같도록)
+            for (bbox, _), (text, confidence) in zip(items, recognized[offset:offset + len(items)]):
+                extracted_texts.append({'text': text, 'confidence': confidence,
+                                        'bbox': [[float(x), float(y)] for x, y in bbox]})
+            offset += len(items)
+            yield _make_result(image_name, extracted_texts, detect_time + per_crop * len(items))
+
+    for item in image_paths:
+        if isinstance(item, DecodedFrame):
+            image_name = item.name
+            frame = item
+            try:
+                image = item.bgr
+            except ValueError:
+                image = None
+        else:
+            image_name = Path(item).name
+            image = cv2.imread(str(item))
+            frame = image
+        if image is None:
+            # 앞선 이미지 결과를 먼저 내보내 순서 유지
+            yield from flush()
+            pending, pending_crops = [], 0
+            yield {'image_name': image_name, 'error': "이미지를 읽을 수 없습니다"}
+            continue
+
+        start_time = time.time()
+        items = detect_crops(reader, frame)
+        pending.append((image_name, items, time.time() - start_time))
+        pending_crops += len(items)
+        if pending_crops >= crops_per_call:
+            yield from flush()
+            pending, pending_crops = [], 0
+
+    if pending:
+        yield from flush()
+
+
+if __name__ == "__main__":
+    import sys
+    from ocr_engines import get_easyocr_reader
+
+    paths = sys.argv[1:] or sorted(p for p in Path('.').iterdir()
+                                   if p.suffix.lower() in ('.jpg', '.jpeg', '.png', '.bmp', '.tiff'))
+    reader = get_easyocr_reader(['ko', 'en'], gpu=False)
+    batch_size = auto_batch_size()
+    print(f"🔧 인식 배치 크기: {batch_size} (사용 가능 메모리 {(available_memory_bytes() or 0) / 1024**3:.1f}GB)")
+    for result in ocr_images_batched(reader, paths, batch_size):
+        if 'error' in result:
+            print(f"❌ {result['image_name']}: {result['error']}")
+        else:
+            print(f"✅ {result['image_name']}: {result['text_count']}개 텍스트, {result['processing_time']:.2f}초")
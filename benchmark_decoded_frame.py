@@ -0,0 +1,98 @@
+"""
+이미지 한 장을 여러 엔진/설정이 처리할 때의 디코딩/복사 메모리 비교
+    기존: 소비자(엔진 호출)마다 파일 바이트를 디코딩하고, Tesseract는 호출마다 RGB 변환 + PIL 변환
+    공유: DecodedFrame 하나를 모든 소비자가 참조 (디코딩 1회, PIL 변환 1회)
+
+소비자 구성 (ensemble/app.py와 같은 형태): Tesseract 설정 N개 + EasyOCR + PaddleOCR + 재인식(refine)
+엔진은 실행하지 않고, 각 엔진이 입력으로 받는 이미지를 만드는 비용만 측정합니다.
+NumPy/OpenCV 배열은 tracemalloc으로, PIL 이미지 메모리(tracemalloc에 잡히지 않음)는 크기로 계산합니다.
+
+사용 예:
+    python benchmark_decoded_frame.py image5.jpg KakaoTalk_20200225_123418979.png --tesseract-configs 4
+"""
+
+import argparse
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+
+def _pil_bytes(image):
+    """PIL 이미지 메모리 (RGB는 픽셀당 4바이트로 저장)"""
+    bands = 4 if image.mode == 'RGB' else len(image.getbands())
+    return image.width * image.height * bands
+
+
+def consume_separately(image_bytes, tesseract_configs):
+    """기존 방식: 소비자마다 디코딩 - return: (유지 중인 입력 목록, PIL 바이트, 디코딩 횟수)"""
+    import cv2
+    from PIL import Image
+
+    inputs = []
+    pil_bytes = 0
+    decodes = 0
+    for _ in range(tesseract_configs):
+        image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+        pil = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        pil_bytes += _pil_bytes(pil)
+        decodes += 1
+        inputs.append(pil)
+    for _ in ('easyocr', 'paddleocr', 'refine'):
+        inputs.append(cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR))
+        decodes += 1
+    return inputs, pil_bytes, decodes
+
+
+def consume_shared(image_bytes, tesseract_configs):
+    """공유 방식: DecodedFrame 하나 - return: (유지 중인 입력 목록, PIL 바이트, 디코딩 횟수)"""
+    from decoded_frame import DecodedFrame
+
+    frame = DecodedFrame(image_bytes)
+    inputs = [frame.pil() for _ in range(tesseract_configs)]
+    inputs += [frame.bgr for _ in ('easyocr', 'paddleocr', 'refine')]
+    return inputs, _pil_bytes(frame.pil()), frame.decode_count
+
+
+def measure(consume, image_bytes, tesseract_configs):
+    """return: {'array_bytes' (측정 끝에 유지 중인 배열 메모리), 'pil_bytes', 'decodes', 'time'}"""
+    tracemalloc.start()
+    start_time = time.time()
+    inputs, pil_bytes, decodes = consume(image_bytes, tesseract_configs)
+    elapsed = time.time() - start_time
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del inputs
+    return {'array_bytes': current, 'pil_bytes': pil_bytes, 'decodes': decodes, 'time': elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DecodedFrame 공유 메모리 절감 측정")
+    parser.add_argument('images', nargs='*', default=['image5.jpg'])
+    parser.add_argument('--tesseract-configs', type=int, default=4, help="Tesseract 설정 수 (app.py는 4개)")
+    args = parser.parse_args()
+
+    mb = 1024 * 1024
+    print(f"🧪 소비자: Tesseract 설정 {args.tesseract_configs}개 + EasyOCR + PaddleOCR + 재인식")
+    print("=" * 70)
+    for path in args.images:
+        image_bytes = Path(path).read_bytes()
+        # 첫 호출의 모듈 로드 비용 제외
+        measure(consume_shared, image_bytes, 1)
+        separate = measure(consume_separately, image_bytes, args.tesseract_configs)
+        shared = measure(consume_shared, image_bytes, args.tesseract_configs)
+
+        print(f"🖼️  {path}")
+        for label, stats in (('기존', separate), ('공유', shared)):
+            total = stats['array_bytes'] + stats['pil_bytes']
+            print(f"   {label}: 디코딩 {stats['decodes']}회, 유지 메모리 {total / mb:7.1f}MB "
+                  f"(배열 {stats['array_bytes'] / mb:.1f}MB + PIL {stats['pil_bytes'] / mb:.1f}MB), "
+                  f"{stats['time'] * 1000:.1f}ms")
+        saved = (separate['array_bytes'] + separate['pil_bytes']) - (shared['array_bytes'] + shared['pil_bytes'])
+        print(f"   💾 이미지당 절감: {saved / mb:.1f}MB, "
+              f"{(separate['time'] - shared['time']) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+EasyOCR 이미지별 readtext 루프 vs 여러 이미지 묶음 인식(batched_easyocr) 처리량 벤치마크
+두 방식 모두 같은 프로세스에서 같은 Reader로 실행하고, 캐시는 사용하지 않습니다.
+첫 호출의 모델 워밍업 시간은 측정에서 제외합니다.
+
+사용 예:
+    python benchmark_easyocr_batch.py                       # 저장소의 샘플 이미지 전체
+    python benchmark_easyocr_batch.py image5.jpg image6.jpg --batch-size 64 --repeat 3
+    python benchmark_easyocr_batch.py --corpus corpus.json  # 미리 디코딩한 코퍼스 (디코딩 시간 제외)
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff')
+
+
+def run_loop(reader, image_paths):
+    """기존 방식: 이미지마다 readtext (DecodedFrame이면 디코딩 없이)"""
+    from decoded_frame import DecodedFrame
+    from easyocr_test import ocr_bytes_easyocr, ocr_image_easyocr
+    return [ocr_bytes_easyocr(reader, None, item.name, use_cache=False, frame=item)
+            if isinstance(item, DecodedFrame) else ocr_image_easyocr(reader, item, use_cache=False)
+            for item in image_paths]
+
+
+def run_batched(reader, image_paths, batch_size):
+    """묶음 인식"""
+    from batched_easyocr import ocr_images_batched
+    return list(ocr_images_batched(reader, image_paths, batch_size))
+
+
+def text_agreement(loop_results, batched_results):
+    """두 방식에서 같은 텍스트가 나온 비율 (이미지별 텍스트 집합 기준)"""
+    same = total = 0
+    for a, b in zip(loop_results, batched_results):
+        if not a or 'error' in b:
+            continue
+        texts_a = {item['text'] for item in a['extracted_texts']}
+        texts_b = {item['text'] for item in b['extracted_texts']}
+        same += len(texts_a & texts_b)
+        total += len(texts_a | texts_b)
+    return same / total if total else 1.0
+
+
+def main():
+    from batched_easyocr import auto_batch_size, available_memory_bytes
+    from ocr_engines import get_easyocr_reader
+
+    parser = argparse.ArgumentParser(description="EasyOCR 묶음 인식 벤치마크")
+    parser.add_argument('images', nargs='*')
+    parser.add_argument('--batch-size', type=int, default=None, help="인식 배치 크기 (기본: 메모리에 맞춤)")
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--corpus', default=None, help="미리 디코딩한 코퍼스 인덱스 (image_corpus.py pack)")
+    args = parser.parse_args()
+
+    if args.corpus:
+        from image_corpus import ImageCorpus
+        image_paths = list(ImageCorpus(args.corpus))
+    else:
+        image_paths = [Path(p) for p in args.images] or sorted(
+            p for p in Path('.').iterdir() if p.is_file() and p.suffix.lower() in IMAGE_EXTENSIONS)
+    if not image_paths:
+        print("❌ 이미지 파일을 찾을 수 없습니다.")
+        return
+
+    batch_size = args.batch_size or auto_batch_size()
+    memory_gb = (available_memory_bytes() or 0) / 1024 ** 3
+    print(f"🧪 EasyOCR 묶음 인식 벤치마크: 이미지 {len(image_paths)}장, 배치 {batch_size} "
+          f"(사용 가능 메모리 {memory_gb:.1f}GB), {args.repeat}회 반복")
+    print("=" * 70)
+
+    reader = get_easyocr_reader(['ko', 'en'], gpu=False)
+    # 모델 워밍업 (첫 호출의 지연 초기화 제외)
+    run_loop(reader, image_paths[:1])
+
+    timings = {'loop': [], 'batched': []}
+    loop_results = batched_results = None
+    for _ in range(args.repeat):
+        start_time = time.time()
+        loop_results = run_loop(reader, image_paths)
+        timings['loop'].append(time.time() - start_time)
+
+        start_time = time.time()
+        batched_results = run_batched(reader, image_paths, batch_size)
+        timings['batched'].append(time.time() - start_time)
+
+    for mode, elapsed_list in timings.items():
+        best = min(elapsed_list)
+        print(f"   {mode:8s} 최단 {best:.2f}초  →  {len(image_paths) / best:.2f} 이미지/초")
+
+    speedup = min(timings['loop']) / min(timings['batched'])
+    print(f"\n⚡ 속도 향상: {speedup:.2f}배")
+    print(f"🔤 텍스트 일치율: {text_agreement(loop_results, batched_results) * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+모듈 import 시간 벤치마크 (시작 시간 회귀 방지용)
+파서/분석 모듈을 import하는 것만으로 OCR 엔진(torch, paddle 등)이 로드되지 않는지 확인합니다.
+각 모듈은 새 파이썬 프로세스에서 측정하므로 다른 모듈의 import 결과에 영향을 받지 않습니다.
+
+사용 예:
+    python benchmark_startup.py            # 기본 시간 제한 1초
+    python benchmark_startup.py --budget 0.5
+실패한 항목이 있으면 종료 코드 1을 반환합니다.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+# 엔진 없이(numpy만으로) import 되어야 하는 모듈들
+LIGHT_MODULES = [
+    'table_schedule_parser',
+    'fixed_tesseract_parser',
+    'improved_schedule_parser',
+    'tesseract_table_parser',
+    'debug_tesseract_parser',
+    'paddleocr_test',
+    'simple_test',
+    'test_table_analysis',
+    'test_image5',
+    'easyocr_test',
+    'ocr_engines',
+    'ocr_cache',
+    'image_preprocess',
+    'schedule_pipeline',
+    'schedule_service',
+    'job_queue',
+    'ocr_result',
+    'batched_easyocr',
+    'paddle_stages',
+    'refine_ocr',
+    'ensemble_ocr',
+    'engine_router',
+    'decoded_frame',
+    'image_corpus',
+    'result_stream',
+    'columnar_results',
+    'cpu_budget',
+    'cell_ocr',
+    'tiled_ocr',
+    'ocr_accuracy',
+]
+
+# 위 모듈 import 시 로드되면 안 되는 무거운 모듈들
+HEAVY_MODULES = ['easyocr', 'torch', 'paddleocr', 'paddle', 'openai', 'cv2']
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'elapsed': elapsed, 'heavy': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import(module):
+    """새 프로세스에서 모듈 import 시간과 함께 로드된 무거운 모듈 목록 측정"""
+    code = _PROBE.format(module=module, heavy=HEAVY_MODULES)
+    proc = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {'module': module, 'error': proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'import 실패'}
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['module'] = module
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모듈 import 시간 벤치마크")
+    parser.add_argument('--budget', type=float, default=1.0, help="모듈당 허용 import 시간 (초)")
+    parser.add_argument('modules', nargs='*', default=LIGHT_MODULES)
+    args = parser.parse_args()
+
+    print("⏱️  모듈 import 시간 측정")
+    print("=" * 60)
+
+    failures = 0
+    for module in args.modules:
+        result = measure_import(module)
+        if 'error' in result:
+            failures += 1
+            print(f"❌ {module:28s} import 오류: {result['error']}")
+            continue
+
+        problems = []
+        if result['heavy']:
+            problems.append(f"엔진 로드됨: {', '.join(result['heavy'])}")
+        if result['elapsed'] > args.budget:
+            problems.append(f"제한 {args.budget:.2f}초 초과")
+
+        if problems:
+            failures += 1
+            print(f"❌ {module:28s} {result['elapsed']:.3f}초 ({'; '.join(problems)})")
+        else:
+            print(f"✅ {module:28s} {result['elapsed']:.3f}초")
+
+    print("=" * 60)
+    if failures:
+        print(f"❌ {failures}개 모듈이 기준을 통과하지 못했습니다.")
+        sys.exit(1)
+    print("✅ 모든 모듈이 엔진 없이 빠르게 import 됩니다.")
+
+
+if __name__ == "__main__":
+    main()
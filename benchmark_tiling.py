@@ -0,0 +1,89 @@
+"""
+타일 분할 OCR vs 전체 이미지 OCR 벤치마크
+각 방식은 별도 프로세스에서 실행하여 최대 메모리(peak RSS)를 독립적으로 측정합니다.
+
+사용 예:
+    python benchmark_tiling.py KakaoTalk_20200225_123418979.png image3.jpg --engine easyocr
+    python benchmark_tiling.py image3.jpg --tile-size 1024 --overlap 128
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+
+def _peak_rss_mb():
+    """현재 프로세스의 최대 RSS (MB)"""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return peak / 1024 if sys.platform != 'darwin' else peak / (1024 * 1024)
+
+
+def run_child(mode, image_path, engine, tile_size, overlap):
+    """자식 프로세스: 엔진 로드 → OCR 1회 → 결과 JSON 출력"""
+    import cv2
+    from tiled_ocr import ocr_tiled, easyocr_tile_fn, tesseract_tile_fn
+
+    image = cv2.imread(image_path)
+    if engine == 'easyocr':
+        from ocr_engines import get_easyocr_reader
+        ocr_tile = easyocr_tile_fn(get_easyocr_reader(['ko', 'en'], gpu=False))
+    else:
+        ocr_tile = tesseract_tile_fn()
+
+    rss_before = _peak_rss_mb()
+    start_time = time.time()
+    if mode == 'whole':
+        items = ocr_tile(image)
+        info = {'tiles': 1}
+    else:
+        items, info = ocr_tiled(image, ocr_tile, tile_size=tile_size, overlap=overlap)
+    elapsed = time.time() - start_time
+
+    print(json.dumps({
+        'mode': mode,
+        'image': image_path,
+        'size': [image.shape[1], image.shape[0]],
+        'wall_time': elapsed,
+        'peak_rss_mb': _peak_rss_mb(),
+        'peak_rss_before_ocr_mb': rss_before,
+        'boxes': len(items),
+        'tiles': info['tiles']
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="타일 분할 OCR 벤치마크")
+    parser.add_argument('images', nargs='*', default=['KakaoTalk_20200225_123418979.png', 'image3.jpg'])
+    parser.add_argument('--engine', choices=['easyocr', 'tesseract'], default='easyocr')
+    parser.add_argument('--tile-size', type=int, default=1280)
+    parser.add_argument('--overlap', type=int, default=160)
+    parser.add_argument('--child', choices=['whole', 'tiled'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.images[0], args.engine, args.tile_size, args.overlap)
+        return
+
+    print(f"🧪 타일 분할 OCR 벤치마크 ({args.engine}, 타일 {args.tile_size}px, 겹침 {args.overlap}px)")
+    print("=" * 70)
+    for image_path in args.images:
+        print(f"\n🖼️  {image_path}")
+        for mode in ['whole', 'tiled']:
+            cmd = [sys.executable, __file__, image_path, '--child', mode, '--engine', args.engine,
+                   '--tile-size', str(args.tile_size), '--overlap', str(args.overlap)]
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+            if proc.returncode != 0:
+                print(f"   ❌ {mode}: {proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else '실행 실패'}")
+                continue
+            r = json.loads(proc.stdout.strip().splitlines()[-1])
+            ocr_rss = r['peak_rss_mb'] - r['peak_rss_before_ocr_mb']
+            print(f"   {'전체' if mode == 'whole' else '타일'} ({r['size'][0]}x{r['size'][1]}, 타일 {r['tiles']}개): "
+                  f"{r['wall_time']:.2f}초, peak RSS {r['peak_rss_mb']:.0f}MB (OCR 중 +{ocr_rss:.0f}MB), 박스 {r['boxes']}개")
+
+
+if __name__ == "__main__":
+    main()
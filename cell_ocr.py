@@ -0,0 +1,195 @@
+"""
+표 괘선 기반 셀 단위 OCR
+전체 페이지 텍스트 검출 + 박스 중심 클러스터링 대신, 괘선(가로/세로 선)으로 셀 영역을 먼저 찾고
+각 셀 영역을 한꺼번에 인식기에 넘겨 배치 인식합니다 (텍스트 검출 단계 생략).
+결과는 바로 grid[row][col] = text 형태이므로 cluster_texts_to_grid 단계가 필요 없습니다.
+
+지원 인식기:
+    easyocr   - 흑백 셀 이미지들을 인식기에 배치로 (batched_easyocr.recognize_crops)
+    paddleocr - PaddleOCR.ocr(셀 이미지 목록, det=False)
+"""
+
+import time
+from collections import defaultdict
+
+import numpy as np
+
+# 빈 셀 판정 기준: 셀 면적 대비 글자(괘선 제외) 픽셀 비율
+EMPTY_CELL_INK_RATIO = 0.004
+
+
+def _line_runs(profile, min_ratio=0.5):
+    """
+    투영 프로파일에서 선 위치 찾기
+    profile: 행(또는 열)별 선 픽셀 수
+    return: [(시작, 끝), ...] - 연속된 선 픽셀 구간 (두꺼운 선은 하나로 묶음)
+    """
+    if profile.max() <= 0:
+        return []
+    idx = np.flatnonzero(profile >= profile.max() * min_ratio)
+    if len(idx) == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(idx) > 1)
+    starts = np.concatenate(([idx[0]], idx[breaks + 1]))
+    ends = np.concatenate((idx[breaks], [idx[-1]]))
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def _cell_bounds(runs, min_cell_size):
+    """선 구간 사이의 셀 구간 [(시작, 끝), ...] (끝은 포함하지 않음)"""
+    bounds = []
+    for (_, prev_end), (next_start, _) in zip(runs, runs[1:]):
+        if next_start - prev_end - 1 >= min_cell_size:
+            bounds.append((prev_end + 1, next_start))
+    return bounds
+
+
+def detect_table_cells(image, min_line_ratio=0.5, min_cell_size=8, line_scale=40):
+    """
+    괘선으로 표의 셀 영역 검출 (OpenCV 모폴로지)
+    image: cv2.imread로 읽은 BGR 이미지 (또는 흑백 이미지, DecodedFrame)
+    min_line_ratio: 가장 긴 선 대비 이 비율 이상인 행/열만 괘선으로 인정
+    min_cell_size: 이보다 작은 간격은 셀이 아닌 것으로 간주 (이중선 등)
+    line_scale: 이미지 크기 / line_scale 보다 긴 직선만 괘선으로 추출
+    return: {'row_bounds': [(y1, y2)], 'col_bounds': [(x1, x2)], 'ink': 셀별 글자 픽셀 비율 (행 x 열 배열)}
+    """
+    import cv2
+    from decoded_frame import as_frame
+
+    gray = as_frame(image).gray
+    binary = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV, 15, 10)
+    h, w = binary.shape
+
+    # 가로/세로 방향으로 긴 직선만 남김
+    horiz_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(w // line_scale, 10), 1))
+    vert_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, max(h // line_scale, 10)))
+    horiz = cv2.morphologyEx(binary, cv2.MORPH_OPEN, horiz_kernel)
+    vert = cv2.morphologyEx(binary, cv2.MORPH_OPEN, vert_kernel)
+
+    row_runs = _line_runs(np.count_nonzero(horiz, axis=1), min_line_ratio)
+    col_runs = _line_runs(np.count_nonzero(vert, axis=0), min_line_ratio)
+    row_bounds = _cell_bounds(row_runs, min_cell_size)
+    col_bounds = _cell_bounds(col_runs, min_cell_size)
+
+    # 셀별 글자 픽셀 비율 (적분 영상으로 모든 셀을 한 번에 계산)
+    ink = np.zeros((len(row_bounds), len(col_bounds)))
+    if row_bounds and col_bounds:
+        text_mask = (binary > 0) & (horiz == 0) & (vert == 0)
+        integral = cv2.integral(text_mask.astype(np.uint8))
+        ys = np.array(row_bounds)
+        xs = np.array(col_bounds)
+        y1, y2 = ys[:, 0][:, None], ys[:, 1][:, None]
+        x1, x2 = xs[:, 0][None, :], xs[:, 1][None, :]
+        counts = integral[y2, x2] - integral[y1, x2] - integral[y2, x1] + integral[y1, x1]
+        ink = counts / np.maximum((y2 - y1) * (x2 - x1), 1)
+
+    return {'row_bounds': row_bounds, 'col_bounds': col_bounds, 'ink': ink}
+
+
+def _recognize_easyocr(reader, frame, boxes, batch_size):
+    """EasyOCR로 셀 박스들 배치 인식 - return: 박스 순서대로 [(text, confidence)]"""
+    from batched_easyocr import recognize_crops
+
+    # 인식기는 흑백 입력을 받음 (readtext는 내부에서 변환) - 셀 검출에서 만든 흑백 이미지 재사용
+    gray = frame.gray
+    crops = [gray[y1:y2, x1:x2] for (x1, y1, x2, y2) in boxes]
+    return recognize_crops(reader, crops, batch_size)
+
+
+def _recognize_paddleocr(ocr, frame, boxes):
+    """PaddleOCR 인식기만으로 셀 이미지들 배치 인식 - return: 박스 순서대로 [(text, confidence)]"""
+    from paddle_stages import rec_lines
+    image = frame.bgr
+    crops = [np.ascontiguousarray(image[y1:y2, x1:x2]) for (x1, y1, x2, y2) in boxes]
+    result = ocr.ocr(crops, det=False, cls=False)
+    return rec_lines(result, len(crops))
+
+
+def ocr_table_cells(image, engine='easyocr', recognizer=None, batch_size=64, padding=2,
+                    skip_empty=True, **detect_options):
+    """
+    괘선 기반 셀 검출 후 셀 단위 배치 인식
+    image: cv2.imread로 읽은 BGR 이미지 또는 DecodedFrame (셀 검출과 인식이 흑백 변환을 공유)
+    engine: 'easyocr' 또는 'paddleocr'
+    recognizer: easyocr.Reader 또는 PaddleOCR 인스턴스 (None이면 easyocr는 레지스트리에서 가져옴)
+    batch_size: 한 번에 인식기에 넘길 셀 수 (easyocr)
+    padding: 셀 안쪽으로 잘라낼 여백 (괘선 잔여물 제거)
+    skip_empty: 글자 픽셀이 거의 없는 셀은 인식하지 않음
+    return: {'grid': grid[row][col] = text, 'cells': [...], 'n_rows', 'n_cols', 'timing': {...}}
+    """
+    from decoded_frame import as_frame
+
+    frame = as_frame(image)
+    timing = {}
+    start_time = time.time()
+    table = detect_table_cells(frame, **detect_options)
+    timing['detect_cells'] = time.time() - start_time
+
+    row_bounds, col_bounds, ink = table['row_bounds'], table['col_bounds'], table['ink']
+    boxes = []
+    positions = []
+    for r, (y1, y2) in enumerate(row_bounds):
+        for c, (x1, x2) in enumerate(col_bounds):
+            if skip_empty and ink[r, c] < EMPTY_CELL_INK_RATIO:
+                continue
+            if x2 - x1 <= 2 * padding or y2 - y1 <= 2 * padding:
+                continue
+            boxes.append((x1 + padding, y1 + padding, x2 - padding, y2 - padding))
+            positions.append((r, c))
+
+    start_time = time.time()
+    if not boxes:
+        recognized = []
+    elif engine == 'easyocr':
+        if recognizer is None:
+            from ocr_engines import get_easyocr_reader
+            recognizer = get_easyocr_reader(['ko', 'en'], gpu=False)
+        recognized = _recognize_easyocr(recognizer, frame, boxes, batch_size)
+    elif engine == 'paddleocr':
+        if recognizer is None:
+            raise ValueError("paddleocr 인식에는 PaddleOCR 인스턴스가 필요합니다")
+        recognized = _recognize_paddleocr(recognizer, frame, boxes)
+    else:
+        raise ValueError(f"지원하지 않는 엔진: {engine}")
+    timing['recognize'] = time.time() - start_time
+
+    grid = defaultdict(dict)
+    cells = []
+    for (r, c), (x1, y1, x2, y2), (text, confidence) in zip(positions, boxes, recognized):
+        text = text.strip()
+        cells.append({
+            'row': r,
+            'col': c,
+            'text': text,
+            'confidence': confidence,
+            'bbox': [[x1, y1], [x2, y1], [x2, y2], [x1, y2]]
+        })
+        if text:
+            grid[r][c] = text
+
+    return {
+        'grid': grid,
+        'cells': cells,
+        'n_rows': len(row_bounds),
+        'n_cols': len(col_bounds),
+        'timing': timing
+    }
+
+
+if __name__ == "__main__":
+    import sys
+    import cv2
+
+    image_path = sys.argv[1] if len(sys.argv) > 1 else "image5.jpg"
+    image = cv2.imread(image_path)
+    if image is None:
+        print(f"❌ 이미지를 읽을 수 없습니다: {image_path}")
+        sys.exit(1)
+
+    print(f"🖼️  셀 단위 OCR: {image_path}")
+    result = ocr_table_cells(image)
+    print(f"📋 그리드 크기: {result['n_rows']}행 x {result['n_cols']}열 (인식한 셀 {len(result['cells'])}개)")
+    print(f"⏱️  셀 검출 {result['timing']['detect_cells']:.2f}초, 인식 {result['timing']['recognize']:.2f}초")
+    for row in range(result['n_rows']):
+        row_text = [result['grid'].get(row, {}).get(col, '') for col in range(result['n_cols'])]
+        print(f"   행 {row}: {row_text}")
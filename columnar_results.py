@@ -0,0 +1,311 @@
+"""
+열 기반 바이너리 OCR 결과 파일 (.ocrc)
+*_test_results.json은 박스를 extracted_texts와 raw_data에 두 번 저장하고 indent=2라 크기가 크며,
+첫 번째 이미지만 쓰더라도 파일 전체를 json.load 해야 합니다.
+.ocrc는 이미지마다 박스/신뢰도/텍스트를 NumPy 배열 + 문자열 테이블로 이어 쓰고, 끝에 인덱스(JSON)를 둡니다.
+읽을 때는 인덱스만 파싱하고 필요한 이미지의 배열만 메모리 매핑으로 읽습니다.
+
+    [MAGIC] [이미지 0 배열들] [이미지 1 배열들] ... [인덱스 JSON] [인덱스 길이 uint64] [MAGIC]
+
+엔진별 저장 방식 (ocr_bytes_* 결과 dict 그대로 기록, 읽으면 같은 dict로 복원):
+    tesseract - raw_data의 모든 열(text, conf, 좌표, level/page_num 등)을 열마다 배열로 저장,
+                extracted_texts는 raw_data에서 다시 계산 (같을 때만, 아니면 둘 다 저장)
+    easyocr / paddleocr - 4점 bbox (N, 4, 2), full_text는 텍스트를 공백으로 이은 것이면 저장하지 않음
+좌표/신뢰도 배열은 값이 그대로 복원되는 가장 작은 형식(int32 / float32 / float64)으로 저장합니다.
+
+사용 예:
+    python columnar_results.py convert tesseract_test_results.json      # → tesseract_test_results.ocrc
+    python columnar_results.py info tesseract_test_results.ocrc
+    python batch_ocr.py ./rosters --output tesseract_batch_results.ocrc
+
+    results = ColumnarResults('tesseract_test_results.ocrc')
+    first = results.result(0)           # 첫 번째 이미지만 읽음
+    ocr = results.ocr_result('image5.jpg')   # dict 없이 바로 OCRResult (cluster_grid 등에 전달)
+"""
+
+import json
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from result_stream import RunningSummary
+
+COLUMNAR_SUFFIX = '.ocrc'
+COLUMNAR_VERSION = 2
+MAGIC = b'OCRCOLS1'
+# 배열 시작 위치 정렬 (바이트)
+ALIGN = 8
+# 배열로 저장하고 인덱스에는 넣지 않는 결과 항목
+PAYLOAD_KEYS = ('extracted_texts', 'full_text', 'raw_data')
+RAW_COORD_KEYS = ('left', 'top', 'width', 'height')
+# extracted_texts를 raw_data에서 다시 계산하는 데 필요한 열
+RAW_TEXT_KEYS = ('text', 'conf') + RAW_COORD_KEYS
+
+
+def is_columnar_path(path):
+    return str(path).lower().endswith(COLUMNAR_SUFFIX)
+
+
+def _numeric(values, width=None):
+    """값이 그대로 복원되는 가장 작은 배열 (정수 → int32/int64, 실수 → float32/float64)"""
+    array = np.asarray(values)
+    if width is not None:
+        array = array.reshape((-1,) + width)
+    if array.dtype.kind in 'iub':
+        if len(array) == 0 or (array.min() >= np.iinfo(np.int32).min and array.max() <= np.iinfo(np.int32).max):
+            return array.astype(np.int32)
+        return array.astype(np.int64)
+    array = array.astype(np.float64)
+    compact = array.astype(np.float32)
+    if np.array_equal(compact, array):
+        return compact
+    return array
+
+
+def _string_table(strings):
+    """문자열 목록 → (바이트 오프셋 (N+1,) uint32, UTF-8 바이트 배열)"""
+    encoded = [s.encode('utf-8') for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint32)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b''.join(encoded), dtype=np.uint8)
+
+
+def texts_from_raw_data(raw_data):
+    """tesseract raw_data에서 extracted_texts 계산 (ocr_bytes_tesseract와 같은 규칙)"""
+    extracted_texts = []
+    for text, conf, left, top, width, height in zip(raw_data['text'], raw_data['conf'],
+                                                    *(raw_data[key] for key in RAW_COORD_KEYS)):
+        text = text.strip()
+        if text and conf > 0:
+            extracted_texts.append({'text': text, 'confidence': conf / 100.0,
+                                    'bbox': [left, top, left + width, top + height]})
+    return extracted_texts
+
+
+class ColumnarResultWriter:
+    """result_stream의 기록기와 같은 사용법 (write / close / with) - 이미지마다 바로 기록하고 인덱스는 close에서"""
+
+    def __init__(self, path):
+        self.path = path
+        self.summary = RunningSummary()
+        self.images = []
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC)
+        self._offset = len(MAGIC)
+
+    def _write_array(self, array):
+        """배열 하나 기록 - return: [오프셋, dtype, shape]"""
+        padding = -self._offset % ALIGN
+        self._file.write(b'\0' * padding)
+        self._offset += padding
+        array = np.ascontiguousarray(array)
+        offset = self._offset
+        self._file.write(array.tobytes())
+        self._offset += array.nbytes
+        return [offset, array.dtype.str, list(array.shape)]
+
+    def _write_strings(self, arrays, name, strings):
+        offsets, blob = _string_table(strings)
+        arrays[name + '_offsets'] = self._write_array(offsets)
+        arrays[name] = self._write_array(blob)
+
+    def write(self, result):
+        """ocr_bytes_* 결과 dict 한 장 기록 (오류 결과 포함)"""
+        extracted_texts = result.get('extracted_texts') or []
+        raw_data = result.get('raw_data')
+        arrays = {}
+        entry = {'keys': list(result), 'meta': {k: v for k, v in result.items() if k not in PAYLOAD_KEYS},
+                 'arrays': arrays}
+
+        if raw_data is not None:
+            # 열 순서 그대로 저장 (문자열 열은 문자열 테이블, 나머지는 숫자 배열)
+            entry['raw_keys'] = list(raw_data)
+            for key, column in raw_data.items():
+                if column and all(isinstance(value, str) for value in column):
+                    self._write_strings(arrays, 'raw:' + key, column)
+                else:
+                    arrays['raw:' + key] = self._write_array(_numeric(column))
+
+        if (raw_data is not None and all(key in raw_data for key in RAW_TEXT_KEYS) and
+                extracted_texts == texts_from_raw_data(raw_data)):
+            entry['extracted'] = 'raw'
+        else:
+            quad = bool(extracted_texts) and isinstance(extracted_texts[0]['bbox'][0], (list, tuple))
+            entry['extracted'] = 'quad' if quad else 'ltrb'
+            arrays['box'] = self._write_array(
+                _numeric([item['bbox'] for item in extracted_texts], (4, 2) if quad else (4,)))
+            arrays['confidence'] = self._write_array(_numeric([item['confidence'] for item in extracted_texts]))
+            self._write_strings(arrays, 'text', [item['text'] for item in extracted_texts])
+
+        full_text = result.get('full_text')
+        if full_text is not None:
+            if full_text == ' '.join(item['text'] for item in extracted_texts):
+                entry['full_text'] = 'joined'
+            else:
+                entry['full_text'] = 'stored'
+                arrays['full_text'] = self._write_array(np.frombuffer(full_text.encode('utf-8'), dtype=np.uint8))
+
+        self.images.append(entry)
+        self.summary.add(result)
+
+    def close(self):
+        index = json.dumps({'version': COLUMNAR_VERSION, 'images': self.images},
+                           ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self._file.write(index)
+        self._file.write(struct.pack('<Q', len(index)))
+        self._file.write(MAGIC)
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ColumnarResults:
+    def __init__(self, path):
+        """path: ColumnarResultWriter가 만든 .ocrc 파일 (인덱스만 읽고 배열은 메모리 매핑)"""
+        self.path = Path(path)
+        trailer = struct.calcsize('<Q') + len(MAGIC)
+        with open(self.path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"열 기반 결과 파일이 아닙니다: {path}")
+            f.seek(-trailer, 2)
+            index_length, = struct.unpack('<Q', f.read(struct.calcsize('<Q')))
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"기록이 끝나지 않은 파일입니다 (인덱스 없음): {path}")
+            f.seek(-trailer - index_length, 2)
+            index = json.loads(f.read(index_length).decode('utf-8'))
+        if index.get('version') != COLUMNAR_VERSION:
+            raise ValueError(f"지원하지 않는 결과 파일 버전: {index.get('version')}")
+        self.images = index['images']
+        self._by_name = {}
+        for i, entry in enumerate(self.images):
+            self._by_name.setdefault(entry['meta'].get('image_name'), i)
+        self._data = np.memmap(self.path, dtype=np.uint8, mode='r')
+
+    def __len__(self):
+        return len(self.images)
+
+    def __iter__(self):
+        return (self.result(i) for i in range(len(self)))
+
+    @property
+    def names(self):
+        return [entry['meta'].get('image_name') for entry in self.images]
+
+    def _position(self, key):
+        if isinstance(key, str):
+            if key not in self._by_name:
+                raise KeyError(key)
+            return self._by_name[key]
+        return key
+
+    def _array(self, entry, name):
+        """이미지 항목의 배열 (메모리 매핑 뷰, 복사 없음)"""
+        offset, dtype, shape = entry['arrays'][name]
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape))
+        return np.frombuffer(self._data, dtype=dtype, count=count, offset=offset).reshape(shape)
+
+    def _strings(self, entry, name):
+        offsets = self._array(entry, name + '_offsets').tolist()
+        blob = self._array(entry, name).tobytes()
+        return [blob[start:end].decode('utf-8') for start, end in zip(offsets[:-1], offsets[1:])]
+
+    def _raw_column(self, entry, key, as_list=True):
+        name = 'raw:' + key
+        if name + '_offsets' in entry['arrays']:
+            return self._strings(entry, name)
+        column = self._array(entry, name)
+        return column.tolist() if as_list else column
+
+    def _raw_data(self, entry):
+        return {key: self._raw_column(entry, key) for key in entry['raw_keys']}
+
+    def ocr_result(self, key):
+        """이미지 한 장의 박스를 OCRResult로 (dict 목록을 만들지 않음)"""
+        from ocr_result import OCRResult
+
+        entry = self.images[self._position(key)]
+        if entry['extracted'] == 'raw':
+            return OCRResult.from_tesseract_data(
+                {key: self._raw_column(entry, key, as_list=False) for key in RAW_TEXT_KEYS})
+        boxes = self._array(entry, 'box')
+        confidences = self._array(entry, 'confidence')
+        texts = self._strings(entry, 'text')
+        if entry['extracted'] == 'quad':
+            return OCRResult._from_quads(boxes, confidences, texts)
+        return OCRResult(boxes, confidences, texts)
+
+    def result(self, key):
+        """이미지 한 장의 결과 dict (기록한 dict와 같은 내용/키 순서)"""
+        entry = self.images[self._position(key)]
+        payload = {}
+        raw_data = self._raw_data(entry) if 'raw_keys' in entry else None
+        if raw_data is not None:
+            payload['raw_data'] = raw_data
+        if entry['extracted'] == 'raw':
+            extracted_texts = texts_from_raw_data(raw_data)
+        else:
+            extracted_texts = [{'text': text, 'confidence': confidence, 'bbox': bbox}
+                               for text, confidence, bbox in zip(self._strings(entry, 'text'),
+                                                                 self._array(entry, 'confidence').tolist(),
+                                                                 self._array(entry, 'box').tolist())]
+        payload['extracted_texts'] = extracted_texts
+        if entry.get('full_text') == 'joined':
+            payload['full_text'] = ' '.join(item['text'] for item in extracted_texts)
+        elif entry.get('full_text') == 'stored':
+            payload['full_text'] = self._array(entry, 'full_text').tobytes().decode('utf-8')
+
+        meta = entry['meta']
+        return {key: meta[key] if key in meta else payload[key] for key in entry['keys']}
+
+
+def convert_results(source, output=None):
+    """
+    결과 파일(.json 배열 / .ndjson)을 .ocrc로 변환 (한 장씩 읽고 기록)
+    return: 출력 경로
+    """
+    from result_stream import read_results
+
+    output = Path(output) if output else Path(source).with_suffix(COLUMNAR_SUFFIX)
+    with ColumnarResultWriter(output) as writer:
+        for result in read_results(source):
+            writer.write(result)
+    return output
+
+
+def main():
+    import argparse
+    import os
+
+    parser = argparse.ArgumentParser(description="열 기반 바이너리 OCR 결과 파일")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    convert_parser = subparsers.add_parser('convert', help="*_results.json / .ndjson → .ocrc")
+    convert_parser.add_argument('source')
+    convert_parser.add_argument('--output', default=None, help="출력 파일 (기본: 확장자만 .ocrc로)")
+    info_parser = subparsers.add_parser('info', help="이미지별 내용 출력")
+    info_parser.add_argument('path')
+    args = parser.parse_args()
+
+    mb = 1024 * 1024
+    if args.command == 'convert':
+        output = convert_results(args.source, args.output)
+        source_size, output_size = os.path.getsize(args.source), os.path.getsize(output)
+        print(f"📦 {args.source} ({source_size / mb:.2f}MB) → {output} ({output_size / mb:.2f}MB, "
+              f"{output_size / max(source_size, 1) * 100:.0f}%)")
+        return
+
+    results = ColumnarResults(args.path)
+    for i, entry in enumerate(results.images):
+        meta = entry['meta']
+        status = f"❌ {meta['error']}" if 'error' in meta else f"{meta.get('text_count', 0)}개 텍스트"
+        print(f"   [{i}] {meta.get('image_name')}: {status} ({entry['extracted']})")
+    print(f"📦 {len(results)}개 이미지, {os.path.getsize(args.path) / mb:.2f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+CPU 예산 (워커 프로세스 수 x 워커당 엔진 스레드 수)
+EasyOCR(torch), PaddleOCR, Tesseract(OpenMP)는 각자 CPU 수만큼 스레드를 만들기 때문에
+워커 프로세스를 여러 개 띄우면 코어가 과할당되어 오히려 직렬 실행보다 느려질 수 있습니다.
+워커 수 x 스레드 수가 사용 가능한 코어 수를 넘지 않도록 나누고, 워커마다 코어 묶음을 고정(sched_setaffinity)합니다.
+
+스레드 수 적용 (워커 초기화에서 엔진 import 전에):
+    환경 변수 OMP_NUM_THREADS / OMP_THREAD_LIMIT(Tesseract) / MKL / OpenBLAS / OPENCV_FOR_THREADS_NUM
+    이미 로드된 torch / cv2는 set_num_threads / setNumThreads
+    PaddleOCR은 PaddleOCR(cpu_threads=...) 파라미터 (paddle_params)
+
+엔진별 기본 스레드 수는 DEFAULT_THREADS, autotune으로 측정한 값이 있으면 cpu_budget.json을 사용합니다.
+
+사용 예:
+    python cpu_budget.py autotune --engine tesseract image1.jpg image5.jpg --repeat 4
+    python cpu_budget.py show
+    python batch_ocr.py ./rosters --engine easyocr          # cpu_budget.json의 분할 사용
+    python batch_ocr.py ./rosters --workers 2 --threads 4   # 직접 지정
+"""
+
+import json
+import os
+import sys
+import time
+
+DEFAULT_BUDGET_PATH = 'cpu_budget.json'
+# autotune 전 엔진별 워커당 스레드 수 (Tesseract는 단일 스레드 프로세스 여러 개가 가장 빠름)
+DEFAULT_THREADS = {'tesseract': 1, 'easyocr': 4, 'paddleocr': 4}
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'OMP_THREAD_LIMIT', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS',
+                   'NUMEXPR_NUM_THREADS', 'VECLIB_MAXIMUM_THREADS', 'OPENCV_FOR_THREADS_NUM')
+
+
+def available_cores():
+    """이 프로세스가 사용할 수 있는 코어 번호 목록 (affinity/컨테이너 제한 반영)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def load_budget(path=DEFAULT_BUDGET_PATH):
+    """저장된 autotune 결과 (없으면 빈 dict)"""
+    if path and os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def plan_budget(engine, workers=None, threads=None, pin=True, path=DEFAULT_BUDGET_PATH):
+    """
+    엔진의 워커 수 / 워커당 스레드 수 결정
+    workers, threads: 직접 지정 (하나만 지정하면 나머지는 코어 수에 맞춤)
+    둘 다 None이면 같은 코어 수로 측정한 autotune 결과, 없으면 DEFAULT_THREADS
+    return: {'engine', 'workers', 'threads', 'cores' (사용 가능한 코어 번호), 'pin', 'source'}
+    """
+    cores = available_cores()
+    tuned = load_budget(path).get('engines', {}).get(engine)
+    if workers is None and threads is None and tuned and tuned['cores'] == len(cores):
+        workers, threads, source = tuned['workers'], tuned['threads'], 'autotune'
+    else:
+        source = 'manual' if workers or threads else 'default'
+        if threads is None:
+            threads = max(1, len(cores) // workers) if workers else min(DEFAULT_THREADS.get(engine, 1), len(cores))
+        if workers is None:
+            workers = max(1, len(cores) // threads)
+    return {'engine': engine, 'workers': workers, 'threads': threads, 'cores': cores, 'pin': pin,
+            'source': source}
+
+
+def worker_cores(budget, index):
+    """index번째 워커에 고정할 코어 묶음 (워커 x 스레드가 코어 수를 넘으면 앞에서부터 다시 배정)"""
+    cores = budget['cores']
+    start = index * budget['threads']
+    return [cores[(start + i) % len(cores)] for i in range(min(budget['threads'], len(cores)))]
+
+
+def thread_env(threads):
+    """엔진 스레드 풀 크기를 정하는 환경 변수 (import 전에 설정해야 적용되는 라이브러리가 많음)"""
+    return {name: str(threads) for name in THREAD_ENV_VARS}
+
+
+def paddle_params(threads):
+    """PaddleOCR 생성자에 추가할 스레드 파라미터 (기본값 10은 코어 수와 무관)"""
+    return {'cpu_threads': threads}
+
+
+def set_library_threads(threads):
+    """이미 import된 torch / cv2의 스레드 수 변경"""
+    if 'torch' in sys.modules:
+        sys.modules['torch'].set_num_threads(threads)
+    if 'cv2' in sys.modules:
+        sys.modules['cv2'].setNumThreads(threads)
+
+
+def apply_worker_budget(budget, index=0):
+    """
+    현재 프로세스(워커)에 예산 적용 - 엔진 import 전에 호출
+    return: 고정한 코어 목록 (고정하지 않았으면 None)
+    """
+    os.environ.update(thread_env(budget['threads']))
+    set_library_threads(budget['threads'])
+    if not budget['pin'] or not hasattr(os, 'sched_setaffinity'):
+        return None
+    cores = worker_cores(budget, index)
+    try:
+        os.sched_setaffinity(0, cores)
+    except OSError:
+        return None
+    return cores
+
+
+def candidate_splits(core_count):
+    """autotune 후보 (워커 수, 스레드 수) - 스레드는 1, 2, 4, ... 와 전체 코어"""
+    threads = 1
+    splits = []
+    while threads < core_count:
+        splits.append((core_count // threads, threads))
+        threads *= 2
+    splits.append((1, core_count))
+    return splits
+
+
+def measure_split(engine, image_paths, budget):
+    """
+    예산 하나로 일괄 OCR 실행 후 초당 이미지 수
+    워커 시작/모델 로드는 제외하도록 첫 결과가 나온 뒤부터 측정 (캐시 사용 안 함)
+    """
+    from batch_ocr import run_batch_ocr
+
+    start_time = None
+    count = 0
+    for _ in run_batch_ocr(image_paths, engine, budget['workers'] if budget else len(available_cores()),
+                           budget=budget, use_cache=False):
+        if start_time is None:
+            start_time = time.time()
+        else:
+            count += 1
+    elapsed = time.time() - start_time if start_time else 0
+    return count / elapsed if elapsed > 0 else 0.0
+
+
+def autotune(engine, image_paths, path=DEFAULT_BUDGET_PATH):
+    """
+    후보 분할마다 처리량을 측정해 가장 빠른 분할을 저장
+    return: {'workers', 'threads', 'cores', 'images_per_second', 'splits', 'unbounded_images_per_second'}
+    """
+    core_count = len(available_cores())
+    splits = []
+    for workers, threads in candidate_splits(core_count):
+        budget = plan_budget(engine, workers, threads, path=None)
+        images_per_second = measure_split(engine, image_paths, budget)
+        splits.append({'workers': workers, 'threads': threads, 'images_per_second': images_per_second})
+        print(f"   ⚙️  워커 {workers:2d} x 스레드 {threads:2d}: {images_per_second:.2f}장/초")
+
+    # 비교용: 코어 수만큼 워커를 띄우고 스레드는 제한하지 않은 기존 방식
+    unbounded = measure_split(engine, image_paths, None)
+    print(f"   ⚙️  워커 {core_count:2d} x 스레드 제한 없음: {unbounded:.2f}장/초")
+
+    best = max(splits, key=lambda s: s['images_per_second'])
+    tuned = {**best, 'cores': core_count, 'splits': splits, 'unbounded_images_per_second': unbounded,
+             'tuned_at': time.time()}
+    saved = load_budget(path)
+    saved.setdefault('engines', {})[engine] = tuned
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(saved, f, indent=2)
+    return tuned
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="엔진 스레드 / 워커 프로세스 CPU 예산")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    tune_parser = subparsers.add_parser('autotune', help="분할별 처리량 측정 후 저장")
+    tune_parser.add_argument('images', nargs='*', help="측정용 이미지 (기본: 현재 디렉터리의 이미지 전체)")
+    tune_parser.add_argument('--engine', choices=['tesseract', 'easyocr'], default='tesseract')
+    tune_parser.add_argument('--repeat', type=int, default=2, help="이미지 목록 반복 횟수 (워커 수보다 충분히 많게)")
+    subparsers.add_parser('show', help="엔진별 현재 예산 출력")
+    args = parser.parse_args()
+
+    if args.command == 'show':
+        for engine in DEFAULT_THREADS:
+            budget = plan_budget(engine)
+            print(f"   {engine:10s} 워커 {budget['workers']:2d} x 스레드 {budget['threads']:2d} "
+                  f"(코어 {len(budget['cores'])}개, {budget['source']})")
+        return
+
+    from batch_ocr import find_image_files
+    image_paths = [str(p) for p in (args.images or find_image_files('.'))] * args.repeat
+    if not image_paths:
+        print("❌ 이미지 파일을 찾을 수 없습니다.")
+        return
+    print(f"🧪 {args.engine} autotune: 코어 {len(available_cores())}개, 이미지 {len(image_paths)}장")
+    tuned = autotune(args.engine, image_paths)
+    print(f"🏆 워커 {tuned['workers']} x 스레드 {tuned['threads']}: {tuned['images_per_second']:.2f}장/초 "
+          f"(제한 없음 대비 {tuned['images_per_second'] / max(tuned['unbounded_images_per_second'], 1e-9):.2f}배)")
+    print(f"💾 결과가 '{DEFAULT_BUDGET_PATH}'에 저장되었습니다.")
+
+
+if __name__ == "__main__":
+    main()
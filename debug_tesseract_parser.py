@@ -3,19 +3,18 @@ import re
 from collections import defaultdict
 from datetime import datetime
 import numpy as np
+from result_stream import first_result, read_results
 
 def debug_tesseract_result(json_path):
     """Tesseract 결과를 디버깅합니다."""
     print("🔍 Tesseract 결과 디버깅 시작")
     print("=" * 60)
     
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    print(f"📊 총 이미지 수: {len(data)}")
+    # 결과를 한 줄씩 세기만 함 (.ndjson 스트리밍 결과도 전체를 메모리에 올리지 않음)
+    print(f"📊 총 이미지 수: {sum(1 for _ in read_results(json_path))}")
     
     # 첫 번째 이미지 분석
-    first_image = data[0]
+    first_image = first_result(json_path)
     print(f"🖼️  첫 번째 이미지: {first_image['image_name']}")
     print(f"📝 추출된 텍스트 수: {first_image['text_count']}")
     print(f"🎯 평균 신뢰도: {first_image['avg_confidence']:.2f}")
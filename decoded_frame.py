@@ -0,0 +1,117 @@
+"""
+한 번만 디코딩해서 모든 엔진/전처리 단계가 같이 쓰는 이미지 객체
+여러 엔진이나 설정으로 같은 이미지를 처리할 때 단계마다 파일을 다시 디코딩하고 복사하던 것을
+DecodedFrame 하나를 참조로 넘겨 공유합니다.
+
+    frame = DecodedFrame(image_bytes)   # 디코딩은 처음 픽셀에 접근할 때 한 번 (캐시 적중 시 디코딩 없음)
+    frame.bgr        # OpenCV/EasyOCR/PaddleOCR용 BGR 배열 (읽기 전용)
+    frame.gray       # 흑백 배열 (처음 접근 시 한 번 변환 후 공유 - 셀 검출/영역 잘라내기/재인식)
+    frame.pil()      # Tesseract용 PIL RGB 이미지 (처음 접근 시 한 번 변환 후 공유)
+
+배열을 받던 함수들은 as_frame으로 배열과 DecodedFrame을 모두 받습니다.
+
+PIL에는 BGR 모드가 없고 RGB 모드는 외부 버퍼를 공유하지 못하므로 pil()은 한 번은 복사합니다.
+배열은 쓰기 금지로 만들어 한 단계가 다른 단계의 입력을 바꾸지 못하게 합니다.
+"""
+
+import threading
+from pathlib import Path
+
+import numpy as np
+
+
+class DecodedFrame:
+    def __init__(self, image_bytes, name=''):
+        """
+        image_bytes: 이미지 파일 바이트 (캐시 키에도 그대로 사용)
+        name: 이미지 이름 (결과 표시용)
+        """
+        self.data = image_bytes
+        self.name = name
+        self.decode_count = 0
+        self._bgr = None
+        self._gray = None
+        self._pil = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_path(cls, image_path):
+        image_path = Path(image_path)
+        return cls(image_path.read_bytes(), image_path.name)
+
+    @classmethod
+    def from_array(cls, image, name=''):
+        """이미 디코딩한 BGR(또는 흑백) 배열로 생성 (원본 바이트 없음 - 캐시 키로는 사용할 수 없음)"""
+        frame = cls(None, name)
+        frame._bgr = _read_only(image)
+        return frame
+
+    @property
+    def bgr(self):
+        """BGR 배열 (흑백 이미지는 2차원) - 디코딩 실패 시 ValueError"""
+        if self._bgr is None:
+            with self._lock:
+                if self._bgr is None:
+                    import cv2
+                    image = None
+                    if self.data:
+                        image = cv2.imdecode(np.frombuffer(self.data, np.uint8), cv2.IMREAD_COLOR)
+                    if image is None:
+                        raise ValueError("이미지를 디코딩할 수 없습니다")
+                    self.decode_count += 1
+                    self._bgr = _read_only(image)
+        return self._bgr
+
+    @property
+    def gray(self):
+        if self._gray is None:
+            image = self.bgr
+            with self._lock:
+                if self._gray is None:
+                    import cv2
+                    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+                    self._gray = _read_only(gray)
+        return self._gray
+
+    @property
+    def shape(self):
+        return self.bgr.shape
+
+    @property
+    def size(self):
+        """(가로, 세로) - PIL Image.size와 같은 순서"""
+        return self.bgr.shape[1], self.bgr.shape[0]
+
+    def pil(self):
+        """PIL RGB 이미지 (한 번 변환 후 공유 - 호출하는 쪽에서 수정하지 말 것)"""
+        if self._pil is None:
+            image = self.bgr
+            with self._lock:
+                if self._pil is None:
+                    from PIL import Image
+                    if image.ndim == 2:
+                        self._pil = self._gray_image(image)
+                    else:
+                        # BGR 버퍼를 PIL 'BGR' 원시 형식으로 바로 읽음 (중간 RGB 배열 없이 PIL 메모리로 한 번 복사)
+                        image = np.ascontiguousarray(image)
+                        self._pil = Image.frombuffer('RGB', (image.shape[1], image.shape[0]), image,
+                                                     'raw', 'BGR', 0, 1)
+        return self._pil
+
+    @staticmethod
+    def _gray_image(gray):
+        from PIL import Image
+        gray = np.ascontiguousarray(gray)
+        return Image.frombuffer('L', (gray.shape[1], gray.shape[0]), gray, 'raw', 'L', 0, 1)
+
+
+def as_frame(image):
+    """DecodedFrame은 그대로, 디코딩된 배열은 DecodedFrame으로 감싸서 반환 (흑백 변환 등을 공유하도록)"""
+    return image if isinstance(image, DecodedFrame) else DecodedFrame.from_array(image)
+
+
+def _read_only(image):
+    """쓰기 금지 뷰 (원래 배열의 플래그는 그대로)"""
+    view = image.view()
+    view.setflags(write=False)
+    return view
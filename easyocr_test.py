@@ -1,11 +1,13 @@
-import easyocr
 import time
 import re
 import json
 from collections import Counter
 from pathlib import Path
-import cv2
 import numpy as np
+from ocr_engines import get_easyocr_reader, print_engine_stats, reader_model_params
+from ocr_cache import cached_ocr, engine_version
+from image_preprocess import decode_normalized, map_boxes_to_original
+from result_stream import ResultSink
 
 class EasyOCRPerformanceTester:
     def __init__(self, image_path):
@@ -81,8 +83,8 @@ class EasyOCRPerformanceTester:
         try:
             start_time = time.time()
             
-            # EasyOCR 초기화 (한국어 + 영어)
-            reader = easyocr.Reader(['ko', 'en'])
+            # EasyOCR 초기화 (한국어 + 영어, 프로세스 전역 캐시 사용)
+            reader = get_easyocr_reader(['ko', 'en'], gpu=True)
             
             # OCR 실행
             results = reader.readtext(self.image_path)
@@ -272,7 +274,7 @@ class EasyOCRPerformanceTester:
         
         try:
             # 잘못된 이미지 경로 테스트
-            reader = easyocr.Reader(['ko', 'en'])
+            reader = get_easyocr_reader(['ko', 'en'], gpu=True)
             try:
                 results = reader.readtext("nonexistent_image.jpg")
                 score -= 30  # 오류 처리 부족
@@ -327,7 +329,7 @@ class EasyOCRPerformanceTester:
         results_list = []
         
         try:
-            reader = easyocr.Reader(['ko', 'en'])
+            reader = get_easyocr_reader(['ko', 'en'], gpu=True)
             
             for i in range(3):
                 results = reader.readtext(self.image_path)
@@ -428,12 +430,144 @@ class EasyOCRPerformanceTester:
                 'ocr_results_count': len(self.test_results.get('ocr_results', []))
             }, f, ensure_ascii=False, indent=2)
 
-def test_easyocr_on_images():
-    """EasyOCR을 사용하여 모든 이미지에서 텍스트를 추출하고 분석합니다."""
+def reader_cache_params(reader):
+    """
+    OCR 결과에 영향을 주는 reader 설정 (캐시 키용)
+    레지스트리에서 로드한 reader는 로드할 때 넘긴 model_params (모델 경로, 인식 네트워크 등),
+    직접 만든 reader는 확인할 수 있는 속성으로 대신 구분
+    """
+    params = reader_model_params(reader)
+    if params is None:
+        params = {name: getattr(reader, name, None)
+                  for name in ('model_lang', 'detect_network', 'model_storage_directory')}
+    return params
+
+def ocr_image_easyocr(reader, img_path, use_cache=True, normalize=False):
+    """
+    이미지 한 장을 EasyOCR로 처리하여 결과 dict 반환
+    use_cache: True면 같은 이미지+언어 설정의 이전 OCR 결과를 재사용 (ocr_cache.py)
+    normalize: True면 글자 높이 기준으로 축소 디코딩 후 인식 (image_preprocess.py), 좌표는 원본 기준으로 복원
+    return: test_easyocr_on_images 결과 항목과 같은 구조 (이미지를 읽을 수 없으면 None)
+    """
+    img_path = Path(img_path)
+    try:
+        image_bytes = img_path.read_bytes()
+    except OSError:
+        return None
+    return ocr_bytes_easyocr(reader, image_bytes, img_path.name, use_cache, normalize)
+
+def ocr_bytes_easyocr(reader, image_bytes, image_name='', use_cache=True, normalize=False, frame=None):
+    """
+    이미지 파일 바이트(업로드 등)를 EasyOCR로 처리 - 옵션과 반환값은 ocr_image_easyocr와 같음
+    frame: 같은 이미지의 DecodedFrame (여러 엔진/설정이 디코딩 결과를 공유, normalize는 축소 디코딩이라 사용하지 않음)
+    """
+    def run_ocr():
+        import cv2
+        
+        # 이미지 디코딩 - 캐시 적중 시에는 디코딩도 하지 않음
+        scale_x = scale_y = 1.0
+        if normalize:
+            try:
+                image, info = decode_normalized(image_bytes)
+            except Exception:
+                return None
+            scale_x, scale_y = info['scale_x'], info['scale_y']
+        elif frame is not None:
+            try:
+                image = frame.bgr
+            except ValueError:
+                return None
+        else:
+            image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            return None
+        
+        extracted_texts = []
+        for (bbox, text, confidence) in reader.readtext(image):
+            extracted_texts.append({
+                'text': text,
+                'confidence': float(confidence),  # numpy 타입을 float로 변환
+                'bbox': [[float(x) for x in point] for point in bbox]  # numpy 배열을 리스트로 변환
+            })
+        if (scale_x, scale_y) != (1.0, 1.0):
+            extracted_texts = map_boxes_to_original(extracted_texts, scale_x, scale_y)
+        return {'extracted_texts': extracted_texts}
+    
+    # EasyOCR로 텍스트 추출 (또는 캐시 조회)
+    start_time = time.time()
+    if use_cache:
+        cache_config = (f"lang={','.join(getattr(reader, 'lang_list', []))}"
+                        f"|params={json.dumps(reader_cache_params(reader), sort_keys=True, default=str)}|readtext")
+        if normalize:
+            cache_config += "|normalize"
+        ocr_output, cache_hit = cached_ocr(image_bytes, 'easyocr', engine_version('easyocr'),
+                                           cache_config, run_ocr)
+    else:
+        ocr_output, cache_hit = run_ocr(), False
+    processing_time = time.time() - start_time
+    
+    if ocr_output is None:
+        return None
+    
+    # 결과 분석
+    extracted_texts = ocr_output['extracted_texts']
+    total_confidence = sum(item['confidence'] for item in extracted_texts)
+    total_length = sum(len(item['text']) for item in extracted_texts)
+    avg_confidence = total_confidence / len(extracted_texts) if extracted_texts else 0
+    
+    return {
+        'image_name': image_name,
+        'processing_time': processing_time,
+        'cache_hit': cache_hit,
+        'text_count': len(extracted_texts),
+        'avg_confidence': avg_confidence,
+        'total_length': total_length,
+        'extracted_texts': extracted_texts,
+        'full_text': ' '.join([item['text'] for item in extracted_texts])
+    }
+
+def error_result(image_name, error):
+    """처리 실패한 이미지의 결과 항목"""
+    return {
+        'image_name': image_name,
+        'error': str(error),
+        'processing_time': 0,
+        'text_count': 0,
+        'avg_confidence': 0,
+        'total_length': 0,
+        'extracted_texts': [],
+        'full_text': ''
+    }
+
+def print_image_result(result):
+    """이미지 한 장의 처리 결과 출력"""
+    extracted_texts = result['extracted_texts']
+    
+    print(f"   ⏱️  처리 시간: {result['processing_time']:.2f}초{' (캐시)' if result.get('cache_hit') else ''}")
+    print(f"   📝 추출된 텍스트 수: {result['text_count']}개")
+    print(f"   🎯 평균 신뢰도: {result['avg_confidence']:.2f}")
+    print(f"   📏 총 텍스트 길이: {result['total_length']}자")
+    
+    if extracted_texts:
+        print(f"   📄 추출된 텍스트 미리보기:")
+        for i, item in enumerate(extracted_texts[:5]):  # 처음 5개만 표시
+            print(f"      {i+1}. '{item['text']}' (신뢰도: {item['confidence']:.2f})")
+        if len(extracted_texts) > 5:
+            print(f"      ... 외 {len(extracted_texts)-5}개 더")
+    else:
+        print("   ❌ 텍스트를 추출하지 못했습니다.")
+
+def test_easyocr_on_images(batched=False, batch_size=None, stream_path=None):
+    """
+    EasyOCR을 사용하여 모든 이미지에서 텍스트를 추출하고 분석합니다.
+    batched: True면 여러 이미지의 글자 영역을 묶어서 인식 (batched_easyocr.py, 캐시 미사용)
+    batch_size: 묶음 인식 배치 크기 (None이면 사용 가능한 메모리에 맞춤)
+    stream_path: 지정하면 결과를 모으지 않고 이미지마다 바로 기록 (.ndjson: 한 줄씩, 이미 기록된 이미지는 건너뜀 / .ocrc: 열 기반 바이너리)
+    """
     
     # EasyOCR 리더 초기화 (한국어, 영어 지원)
     print("🔧 EasyOCR 초기화 중...")
-    reader = easyocr.Reader(['ko', 'en'], gpu=False)
+    reader = get_easyocr_reader(['ko', 'en'], gpu=False)
     print("✅ EasyOCR 초기화 완료!")
     
     # 이미지 파일들 찾기
@@ -450,114 +584,47 @@ def test_easyocr_on_images():
     
     print(f"📁 발견된 이미지 파일: {len(image_files)}개")
     
-    results = []
+    sink = ResultSink('easyocr_test_results.json', stream_path)
+    if sink.done:
+        print(f"♻️  이미 기록된 {len(sink.done)}개 이미지는 건너뜁니다: {stream_path}")
+    image_files = sink.pending(image_files)
     
-    for img_path in image_files:
-        print(f"\n🖼️  처리 중: {img_path.name}")
-        
-        try:
-            # 이미지 읽기
-            image = cv2.imread(str(img_path))
-            if image is None:
-                print(f"❌ 이미지를 읽을 수 없습니다: {img_path}")
-                continue
-            
-            # EasyOCR로 텍스트 추출
-            start_time = time.time()
-            ocr_results = reader.readtext(image)
-            processing_time = time.time() - start_time
-            
-            # 결과 분석
-            extracted_texts = []
-            total_confidence = 0
-            total_length = 0
-            
-            for (bbox, text, confidence) in ocr_results:
-                extracted_texts.append({
-                    'text': text,
-                    'confidence': float(confidence),  # numpy 타입을 float로 변환
-                    'bbox': [[float(x) for x in point] for point in bbox]  # numpy 배열을 리스트로 변환
-                })
-                total_confidence += confidence
-                total_length += len(text)
-            
-            avg_confidence = total_confidence / len(extracted_texts) if extracted_texts else 0
-            
-            # 결과 저장
-            result = {
-                'image_name': img_path.name,
-                'processing_time': processing_time,
-                'text_count': len(extracted_texts),
-                'avg_confidence': avg_confidence,
-                'total_length': total_length,
-                'extracted_texts': extracted_texts,
-                'full_text': ' '.join([item['text'] for item in extracted_texts])
-            }
-            
-            results.append(result)
-            
-            # 결과 출력
-            print(f"   ⏱️  처리 시간: {processing_time:.2f}초")
-            print(f"   📝 추출된 텍스트 수: {len(extracted_texts)}개")
-            print(f"   🎯 평균 신뢰도: {avg_confidence:.2f}")
-            print(f"   📏 총 텍스트 길이: {total_length}자")
-            
-            if extracted_texts:
-                print(f"   📄 추출된 텍스트 미리보기:")
-                for i, item in enumerate(extracted_texts[:5]):  # 처음 5개만 표시
-                    print(f"      {i+1}. '{item['text']}' (신뢰도: {item['confidence']:.2f})")
-                if len(extracted_texts) > 5:
-                    print(f"      ... 외 {len(extracted_texts)-5}개 더")
+    if batched:
+        from batched_easyocr import ocr_images_batched
+        for result in ocr_images_batched(reader, image_files, batch_size):
+            print(f"\n🖼️  처리 완료: {result['image_name']}")
+            if 'error' in result:
+                print(f"❌ 오류 발생: {result['error']}")
+                result = error_result(result['image_name'], result['error'])
             else:
-                print("   ❌ 텍스트를 추출하지 못했습니다.")
+                print_image_result(result)
+            sink.add(result)
+    else:
+        for img_path in image_files:
+            print(f"\n🖼️  처리 중: {img_path.name}")
+            
+            try:
+                result = ocr_image_easyocr(reader, img_path)
+                if result is None:
+                    print(f"❌ 이미지를 읽을 수 없습니다: {img_path}")
+                    continue
                 
-        except Exception as e:
-            print(f"❌ 오류 발생: {e}")
-            results.append({
-                'image_name': img_path.name,
-                'error': str(e),
-                'processing_time': 0,
-                'text_count': 0,
-                'avg_confidence': 0,
-                'total_length': 0,
-                'extracted_texts': [],
-                'full_text': ''
-            })
-    
-    # 전체 결과 요약
-    print(f"\n{'='*60}")
-    print("📊 전체 결과 요약")
-    print(f"{'='*60}")
-    
-    successful_images = [r for r in results if 'error' not in r and r['text_count'] > 0]
-    failed_images = [r for r in results if 'error' in r or r['text_count'] == 0]
+                sink.add(result)
+                print_image_result(result)
+                    
+            except Exception as e:
+                print(f"❌ 오류 발생: {e}")
+                sink.add(error_result(img_path.name, e))
     
-    print(f"✅ 성공: {len(successful_images)}개 이미지에서 텍스트 추출")
-    print(f"❌ 실패: {len(failed_images)}개 이미지")
-    
-    if successful_images:
-        avg_processing_time = sum(r['processing_time'] for r in successful_images) / len(successful_images)
-        total_texts = sum(r['text_count'] for r in successful_images)
-        avg_confidence = sum(r['avg_confidence'] for r in successful_images) / len(successful_images)
-        
-        print(f"⏱️  평균 처리 시간: {avg_processing_time:.2f}초")
-        print(f"📝 총 추출된 텍스트: {total_texts}개")
-        print(f"🎯 평균 신뢰도: {avg_confidence:.2f}")
-    
-    # 결과를 JSON 파일로 저장
-    output_file = 'easyocr_test_results.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
-    
-    print(f"\n💾 결과가 '{output_file}'에 저장되었습니다.")
+    # 전체 결과 요약 (결과 파일 저장 후)
+    summary = sink.close()
+    summary.print_summary()
+    print(f"\n💾 결과가 '{sink.saved_path}'에 저장되었습니다.")
     
     # 가장 성공적인 이미지 표시
-    if successful_images:
-        best_image = max(successful_images, key=lambda x: x['text_count'])
-        print(f"\n🏆 가장 많은 텍스트가 추출된 이미지: {best_image['image_name']}")
-        print(f"   📝 추출된 텍스트: {best_image['text_count']}개")
-        print(f"   🎯 평균 신뢰도: {best_image['avg_confidence']:.2f}")
-        print(f"   📄 텍스트 미리보기: {best_image['full_text'][:100]}...")
+    summary.print_best()
+    
+    print_engine_stats()
 
 if __name__ == "__main__":
     test_easyocr_on_images() 
\ No newline at end of file
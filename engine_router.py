@@ -0,0 +1,333 @@
+"""
+이미지별 OCR 엔진/설정 선택 (비용 예측 라우터)
+가벼운 이미지 특징(크기, 파일 크기, 에지 밀도, 글자 높이)으로 경로(엔진 + 옵션)별
+처리 시간과 정확도를 예측하고, 목표 정확도를 넘는 경로 중 가장 빠른 것을 고릅니다.
+
+정확도는 라벨(정답 데이터)이 있는 이미지에서 ocr_accuracy.score_accuracy로 매긴 점수(0-1)입니다.
+엔진의 평균 신뢰도는 엔진마다 척도가 달라(PaddleOCR는 대체로 높고 Tesseract는 낮음) 경로끼리 비교할 수 없으므로
+기록만 하고 정확도로 쓰지 않습니다.
+
+예측 모델은 이전 실행 기록(router_timings.jsonl)으로 경로마다 최소제곱 선형 회귀를 학습합니다.
+처리 시간은 모든 기록으로, 정확도는 라벨 점수가 있는 기록으로만 학습하며,
+기록이 부족한 경로는 메가픽셀 기준 대략값(PRIOR_*)을 사용합니다.
+
+사용 예:
+    python engine_router.py calibrate image1.jpg image5.jpg ... --labels labels.json
+        # 모든 경로로 실행해 기록 수집 (labels.json: {이미지 파일명: {'staff_names', 'time_patterns'}})
+    python engine_router.py fit                                   # 기록으로 모델 학습 → engine_router.json
+    python engine_router.py route image5.jpg test_schedule.jpg    # 이미지별 선택 결과
+"""
+
+import json
+import os
+import random
+import threading
+import time
+
+import numpy as np
+
+DEFAULT_LOG_PATH = 'router_timings.jsonl'
+DEFAULT_MODEL_PATH = 'engine_router.json'
+DEFAULT_TARGET_ACCURACY = 0.7
+# 실행 중 다른 경로를 시험해 기록을 넓히는 비율
+DEFAULT_EXPLORE_RATE = 0.05
+# 경로별 회귀에 필요한 최소 기록 수 (미만이면 대략값 사용)
+MIN_SAMPLES = 8
+RIDGE = 1e-3
+
+# 경로 이름 → (엔진, ocr_bytes_* 옵션)
+ROUTES = {
+    'tesseract': ('tesseract', {}),
+    'tesseract-preprocess': ('tesseract', {'preprocess': True}),
+    'easyocr': ('easyocr', {}),
+    'easyocr-normalize': ('easyocr', {'normalize': True}),
+}
+
+# 기록이 없을 때의 대략값: 처리 시간(초) = 고정 + 메가픽셀당, 정확도(score_accuracy / 100)는 상수
+PRIOR_SECONDS = {
+    'tesseract': (0.3, 1.0),
+    'tesseract-preprocess': (0.4, 1.3),
+    'easyocr': (1.0, 4.0),
+    'easyocr-normalize': (1.0, 2.0),
+}
+PRIOR_ACCURACY = {
+    'tesseract': 0.6,
+    'tesseract-preprocess': 0.65,
+    'easyocr': 0.75,
+    'easyocr-normalize': 0.72,
+}
+
+
+def image_features(image_bytes):
+    """
+    가벼운 이미지 특징 (축소 디코딩 한 번)
+    return: {'megapixels', 'file_mb', 'edge_density', 'text_height'}
+    """
+    import cv2
+    from image_preprocess import decode_probe, estimate_text_height
+
+    probe, (width, height) = decode_probe(image_bytes)
+    edges = cv2.Canny(probe, 50, 150)
+    text_height = estimate_text_height(probe)
+    return {
+        'megapixels': width * height / 1e6,
+        'file_mb': len(image_bytes) / 1e6,
+        'edge_density': float(np.count_nonzero(edges)) / edges.size,
+        'text_height': text_height * width / probe.shape[1] if text_height else None
+    }
+
+
+def feature_vector(features):
+    """
+    회귀 입력 [1, 메가픽셀, 메가픽셀 x 에지 밀도 (글자 양), 파일 MB, 10 / 글자 높이]
+    글자 높이를 추정하지 못하면 마지막 항은 0
+    """
+    text_height = features.get('text_height')
+    return np.array([
+        1.0,
+        features['megapixels'],
+        features['megapixels'] * features['edge_density'],
+        features['file_mb'],
+        10.0 / text_height if text_height else 0.0
+    ])
+
+
+def _confidence(entry):
+    """기록의 엔진 평균 신뢰도 (예전 형식은 'accuracy'에 신뢰도를 저장했음)"""
+    return entry['confidence'] if 'confidence' in entry else entry.get('accuracy')
+
+
+def _labelled_accuracy(entry):
+    """기록의 라벨 정확도 (0-1, 라벨이 없거나 예전 형식이면 None)"""
+    return entry.get('accuracy') if 'confidence' in entry else None
+
+
+def fit_linear(X, y, ridge=RIDGE):
+    """최소제곱 선형 회귀 (작은 릿지 항으로 기록이 적을 때도 안정적으로) - return: 계수 배열"""
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    A = X.T @ X + ridge * np.eye(X.shape[1])
+    return np.linalg.solve(A, X.T @ y)
+
+
+class EngineRouter:
+    def __init__(self, routes=None, target_accuracy=DEFAULT_TARGET_ACCURACY, explore_rate=DEFAULT_EXPLORE_RATE,
+                 model_path=DEFAULT_MODEL_PATH, log_path=DEFAULT_LOG_PATH):
+        """
+        routes: 사용할 경로 이름 목록 (None이면 ROUTES 전체)
+        target_accuracy: 선택 기준 예측 정확도 (라벨 이미지 score_accuracy / 100, 0-1)
+        explore_rate: 기록 수집을 위해 무작위 경로로 실행할 비율 (0이면 항상 예측대로)
+        """
+        self.routes = list(routes or ROUTES)
+        for route in self.routes:
+            if route not in ROUTES:
+                raise ValueError(f"알 수 없는 경로: {route}")
+        self.target_accuracy = target_accuracy
+        self.explore_rate = explore_rate
+        self.model_path = model_path
+        self.log_path = log_path
+        self.models = {}
+        self._log_lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """저장된 모델 읽기 (없으면 대략값만 사용)"""
+        if self.model_path and os.path.exists(self.model_path):
+            with open(self.model_path, 'r', encoding='utf-8') as f:
+                self.models = json.load(f)
+
+    def predict(self, features):
+        """
+        return: {경로: {'seconds', 'accuracy', 'learned', 'accuracy_learned'}}
+            learned: 처리 시간을 기록으로 학습했는지, accuracy_learned: 정확도를 라벨 기록으로 학습했는지
+        """
+        x = feature_vector(features)
+        predictions = {}
+        for route in self.routes:
+            model = self.models.get(route) or {}
+            if model.get('seconds'):
+                seconds = float(x @ np.array(model['seconds']))
+            else:
+                base, per_mp = PRIOR_SECONDS[route]
+                seconds = base + per_mp * features['megapixels']
+            if model.get('accuracy'):
+                accuracy = float(x @ np.array(model['accuracy']))
+            else:
+                accuracy = PRIOR_ACCURACY[route]
+            predictions[route] = {'seconds': max(seconds, 0.0), 'accuracy': min(max(accuracy, 0.0), 1.0),
+                                  'learned': bool(model.get('seconds')),
+                                  'accuracy_learned': bool(model.get('accuracy'))}
+        return predictions
+
+    def choose(self, features):
+        """
+        목표 정확도를 넘는 경로 중 예측 시간이 가장 짧은 경로 (없으면 예측 정확도가 가장 높은 경로)
+        return: (경로 이름, 예측 dict)
+        """
+        predictions = self.predict(features)
+        eligible = [r for r in self.routes if predictions[r]['accuracy'] >= self.target_accuracy]
+        if eligible:
+            route = min(eligible, key=lambda r: predictions[r]['seconds'])
+        else:
+            route = max(self.routes, key=lambda r: predictions[r]['accuracy'])
+        return route, predictions
+
+    def record(self, route, features, seconds, confidence, accuracy=None):
+        """
+        실행 기록 한 줄 추가
+        confidence: 엔진 평균 신뢰도 (참고용), accuracy: 라벨 이미지의 score_accuracy / 100 (없으면 None)
+        """
+        if not self.log_path:
+            return
+        line = json.dumps({'route': route, 'features': features, 'seconds': seconds, 'confidence': confidence,
+                           'accuracy': accuracy, 'recorded_at': time.time()}, ensure_ascii=False)
+        with self._log_lock:
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+    def fit(self):
+        """
+        실행 기록으로 경로별 모델 학습 후 저장
+        처리 시간은 모든 기록, 정확도는 라벨 정확도가 있는 기록으로만 학습 (각각 MIN_SAMPLES 미만이면 학습하지 않음)
+        return: {경로: (기록 수, 라벨 기록 수)}
+        """
+        samples = {route: [] for route in ROUTES}
+        if os.path.exists(self.log_path):
+            with open(self.log_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        samples.setdefault(entry['route'], []).append(entry)
+
+        models = {}
+        counts = {}
+        for route, entries in samples.items():
+            labelled = [e for e in entries if _labelled_accuracy(e) is not None]
+            counts[route] = (len(entries), len(labelled))
+            model = {}
+            if len(entries) >= MIN_SAMPLES:
+                X = np.stack([feature_vector(e['features']) for e in entries])
+                model['seconds'] = fit_linear(X, [e['seconds'] for e in entries]).tolist()
+                model['samples'] = len(entries)
+            if len(labelled) >= MIN_SAMPLES:
+                X = np.stack([feature_vector(e['features']) for e in labelled])
+                model['accuracy'] = fit_linear(X, [_labelled_accuracy(e) for e in labelled]).tolist()
+                model['labelled_samples'] = len(labelled)
+            if model:
+                models[route] = model
+        self.models = models
+        if self.model_path:
+            with open(self.model_path, 'w', encoding='utf-8') as f:
+                json.dump(models, f, indent=2)
+        return counts
+
+    def run_route(self, route, image_bytes, image_name='', features=None, use_cache=True, label=None, **options):
+        """
+        지정한 경로로 OCR 실행 후 기록 (캐시 적중은 시간이 의미 없으므로 기록하지 않음)
+        label: 이미지의 정답 데이터 (ocr_accuracy.score_accuracy의 expected_data) - 있으면 정확도도 기록
+        options: ocr_bytes_*에 그대로 전달 (frame 등)
+        return: ocr_image_* 결과 dict (디코딩 실패 시 None)
+        """
+        from schedule_pipeline import run_ocr_bytes
+
+        engine, route_options = ROUTES[route]
+        features = features or image_features(image_bytes)
+        start_time = time.time()
+        result = run_ocr_bytes(image_bytes, engine, image_name, use_cache=use_cache, **route_options, **options)
+        elapsed = time.time() - start_time
+        if result is not None and not result.get('cache_hit'):
+            accuracy = None
+            if label:
+                from ocr_accuracy import score_accuracy
+                accuracy = score_accuracy(result['full_text'], label)['score'] / 100.0
+            self.record(route, features, elapsed, result['avg_confidence'], accuracy)
+        return result
+
+    def run(self, image_bytes, image_name='', **options):
+        """
+        특징 추출 → 경로 선택 → 실행
+        return: ocr_image_* 결과 dict + 'route': {'name', 'predicted', 'explored', 'features_time'}
+        """
+        start_time = time.time()
+        features = image_features(image_bytes)
+        features_time = time.time() - start_time
+
+        route, predictions = self.choose(features)
+        explored = len(self.routes) > 1 and random.random() < self.explore_rate
+        if explored:
+            route = random.choice([r for r in self.routes if r != route])
+
+        result = self.run_route(route, image_bytes, image_name, features, **options)
+        if result is not None:
+            result['route'] = {'name': route, 'predicted': predictions[route], 'explored': explored,
+                               'features_time': features_time}
+        return result
+
+
+_default_router = None
+_default_router_lock = threading.Lock()
+
+
+def get_default_router():
+    """프로세스 공용 라우터 (engine_router.json이 있으면 학습된 모델 사용)"""
+    global _default_router
+    with _default_router_lock:
+        if _default_router is None:
+            _default_router = EngineRouter()
+        return _default_router
+
+
+def main():
+    import argparse
+    from pathlib import Path
+
+    parser = argparse.ArgumentParser(description="비용 예측 OCR 엔진 라우터")
+    parser.add_argument('command', choices=['calibrate', 'fit', 'route'])
+    parser.add_argument('images', nargs='*')
+    parser.add_argument('--route', action='append', choices=list(ROUTES), help="사용할 경로 (기본: 전체)")
+    parser.add_argument('--target-accuracy', type=float, default=DEFAULT_TARGET_ACCURACY)
+    parser.add_argument('--labels', default=None,
+                        help="calibrate: 이미지 파일명 → 정답 데이터({'staff_names', 'time_patterns'}) JSON")
+    args = parser.parse_args()
+
+    router = EngineRouter(args.route, args.target_accuracy)
+    labels = {}
+    if args.labels:
+        with open(args.labels, 'r', encoding='utf-8') as f:
+            labels = json.load(f)
+
+    if args.command == 'fit':
+        counts = router.fit()
+        for route, (count, labelled) in counts.items():
+            model = router.models.get(route, {})
+            seconds = "학습" if 'seconds' in model else f"기록 부족 (최소 {MIN_SAMPLES}개)"
+            accuracy = "학습" if 'accuracy' in model else "대략값 (라벨 기록 부족)"
+            print(f"   {route:22s} 기록 {count:4d}개 (라벨 {labelled}개) → 시간 {seconds}, 정확도 {accuracy}")
+        print(f"💾 모델이 '{router.model_path}'에 저장되었습니다.")
+        return
+
+    for path in args.images:
+        image_bytes = Path(path).read_bytes()
+        features = image_features(image_bytes)
+        if args.command == 'calibrate':
+            # 모든 경로를 캐시 없이 실행해 기록 (라벨이 있는 이미지는 정확도도 기록)
+            label = labels.get(Path(path).name)
+            for route in router.routes:
+                result = router.run_route(route, image_bytes, Path(path).name, features, use_cache=False,
+                                          label=label)
+                if result is None:
+                    print(f"   ❌ {path}: 이미지를 읽을 수 없습니다")
+                    break
+                print(f"   📝 {path} [{route}] {result['processing_time']:.2f}초, "
+                      f"신뢰도 {result['avg_confidence']:.3f}{' (라벨 있음)' if label else ''}")
+        else:
+            route, predictions = router.choose(features)
+            predicted = predictions[route]
+            print(f"🧭 {path}: {route} (예측 {predicted['seconds']:.2f}초, 정확도 {predicted['accuracy']:.3f}"
+                  f"{', 라벨 학습' if predicted['accuracy_learned'] else ', 대략값'}) - "
+                  f"{features['megapixels']:.2f}MP, 에지 {features['edge_density']:.3f}, "
+                  f"글자 높이 {features['text_height'] or 0:.0f}px")
+
+
+if __name__ == "__main__":
+    main()
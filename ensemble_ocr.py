@@ -0,0 +1,274 @@
+"""
+여러 OCR 엔진 동시 실행 + 셀 단위 투표
+같은 이미지를 엔진별 스레드에서 동시에 인식하고, 모든 엔진의 박스를 한꺼번에 행/열 클러스터링해
+같은 셀에 들어간 결과끼리 신뢰도 가중 투표로 셀 텍스트를 정합니다.
+시간 제한(budget)을 넘긴 엔진은 기다리지 않고 투표에서 제외합니다.
+제외된 엔진의 스레드는 계속 실행되므로 결과의 'late_work'(모두 끝나면 완료되는 Future)로
+호출한 쪽이 그 작업을 동시 처리 수에 계속 포함할 수 있습니다 (schedule_service).
+
+    result = ensemble_ocr(image_bytes, engines=('tesseract', 'easyocr'), budget=10.0)
+    result['grid'][row][col]  # 투표로 정한 셀 텍스트
+
+엔진마다 단어/줄 단위가 다르므로 먼저 (셀, 엔진)별로 텍스트를 왼쪽부터 이어 붙인 뒤,
+공백을 뺀 텍스트가 같은 후보끼리 (엔진 가중치 x 평균 신뢰도)를 더해 가장 점수가 높은 후보를 고릅니다.
+"""
+
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+import numpy as np
+
+from decoded_frame import DecodedFrame
+from ocr_result import OCRResult, assign_cells
+
+ENSEMBLE_ENGINES = ('tesseract', 'easyocr', 'paddleocr')
+DEFAULT_ENGINES = ('tesseract', 'easyocr')
+DEFAULT_WEIGHTS = {'tesseract': 1.0, 'easyocr': 1.0, 'paddleocr': 1.0}
+
+
+
+class EnsembleTimeout(Exception):
+    """모든 엔진이 시간 제한을 넘김 - late_work: 제외된 엔진이 모두 끝나면 완료되는 Future"""
+
+    def __init__(self, message, late_work):
+        super().__init__(message)
+        self.late_work = late_work
+
+
+_paddle_runner = None
+_paddle_lock = threading.Lock()
+
+
+def _run_paddleocr(image_bytes, frame=None):
+    """PaddleOCR (검출/인식 단계 캐시 사용) - 인스턴스는 프로세스당 하나, 동시 호출은 직렬화"""
+    global _paddle_runner
+    from paddle_stages import PaddleStageRunner
+    from paddleocr_test import HybridScheduleProcessor
+
+    with _paddle_lock:
+        if _paddle_runner is None:
+            _paddle_runner = PaddleStageRunner(ocr_params=HybridScheduleProcessor.OCR_PARAMS)
+        result, _ = _paddle_runner.run(image_bytes, frame)
+    return OCRResult.from_paddleocr(result)
+
+
+def run_engine(engine, image_bytes, frame=None):
+    """
+    엔진 하나로 인식 - return: OCRResult (디코딩 실패 시 ValueError)
+    frame: 엔진들이 함께 쓰는 DecodedFrame
+    """
+    if engine == 'paddleocr':
+        return _run_paddleocr(image_bytes, frame)
+    from schedule_pipeline import run_ocr_bytes
+    result = run_ocr_bytes(image_bytes, engine, frame=frame)
+    if result is None:
+        raise ValueError("이미지를 디코딩할 수 없습니다")
+    return OCRResult.from_extracted_texts(result['extracted_texts'])
+
+
+def _all_done(futures):
+    """futures가 모두 끝나면 완료되는 Future (결과/예외는 버림)"""
+    combined = Future()
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def on_done(_):
+        with lock:
+            remaining[0] -= 1
+            finished = remaining[0] == 0
+        if finished:
+            combined.set_result(None)
+
+    for future in futures:
+        future.add_done_callback(on_done)
+    return combined
+
+
+def _normalize(text):
+    return ''.join(text.split())
+
+
+def vote_cells(results, weights=None, row_eps=30, col_eps=30):
+    """
+    엔진별 결과를 셀 단위로 정렬해 투표
+    results: {엔진 이름: OCRResult}
+    weights: {엔진 이름: 가중치} (없으면 DEFAULT_WEIGHTS, 목록에 없는 엔진은 1.0)
+    return: 셀 목록 [{'row', 'col', 'text', 'confidence', 'agreement', 'engines', 'bbox'}]
+        confidence: 이긴 후보의 점수 / 이긴 후보를 낸 엔진 가중치 합 (평균 신뢰도)
+        agreement: 이긴 후보 점수 / 셀 전체 점수
+    """
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    names = [name for name, result in results.items() if len(result)]
+    if not names:
+        return []
+
+    # 모든 엔진 결과를 하나로 합쳐 한 번에 셀 할당
+    merged = OCRResult(np.concatenate([results[n].boxes for n in names]),
+                       np.concatenate([results[n].confidences for n in names]),
+                       [text for n in names for text in results[n].texts])
+    engine_ids = np.repeat(np.arange(len(names)), [len(results[n]) for n in names])
+    rows, cols = assign_cells(merged, row_eps, col_eps)
+    n_cols = int(cols.max()) + 1
+    cell_keys = rows * n_cols + cols
+
+    # (셀, 엔진) 그룹: 평균 신뢰도, 왼쪽부터 이어 붙인 텍스트
+    n_engines = len(names)
+    group_keys, group_of = np.unique(cell_keys * n_engines + engine_ids, return_inverse=True)
+    counts = np.bincount(group_of)
+    group_conf = np.bincount(group_of, weights=merged.confidences) / counts
+    order = np.lexsort((merged.boxes[:, 0], group_of))
+    bounds = np.cumsum(counts)[:-1]
+    group_texts = [' '.join(merged.texts[i] for i in members).strip()
+                   for members in np.split(order, bounds)]
+
+    group_cell = group_keys // n_engines
+    group_engine = group_keys % n_engines
+    engine_weight = np.array([weights.get(n, 1.0) for n in names])[group_engine]
+    group_score = engine_weight * group_conf
+
+    # 후보(셀, 정규화 텍스트)별 점수 합산
+    candidates, text_ids = np.unique([_normalize(t) for t in group_texts], return_inverse=True)
+    pair_keys, pair_of = np.unique(group_cell * len(candidates) + text_ids, return_inverse=True)
+    pair_score = np.bincount(pair_of, weights=group_score)
+    pair_weight = np.bincount(pair_of, weights=engine_weight)
+    pair_cell = pair_keys // len(candidates)
+    pair_text = pair_keys % len(candidates)
+    # 후보마다 표시할 텍스트: 그 셀에서 같은 후보를 낸 그룹 중 점수가 가장 높은 그룹의 원문
+    by_pair = np.lexsort((-group_score, pair_of))
+    pair_group = by_pair[np.r_[True, np.diff(pair_of[by_pair]) != 0]]
+
+    # 셀별 최고 점수 후보 (동점이면 빈 텍스트가 아닌 쪽, 그다음 정렬 순서)
+    empty = np.array([not c for c in candidates])[pair_text]
+    ranked = np.lexsort((empty, -pair_score, pair_cell))
+    is_first = np.r_[True, np.diff(pair_cell[ranked]) != 0]
+    winners = ranked[is_first]
+    cells, cell_of = np.unique(group_cell, return_inverse=True)
+    cell_total = np.bincount(cell_of, weights=group_score)
+
+    # 셀 영역: 셀에 속한 모든 박스의 합집합
+    _, box_cell = np.unique(cell_keys, return_inverse=True)
+    ltrb = np.tile([np.inf, np.inf, -np.inf, -np.inf], (len(cells), 1))
+    np.minimum.at(ltrb[:, 0], box_cell, merged.boxes[:, 0])
+    np.minimum.at(ltrb[:, 1], box_cell, merged.boxes[:, 1])
+    np.maximum.at(ltrb[:, 2], box_cell, merged.boxes[:, 2])
+    np.maximum.at(ltrb[:, 3], box_cell, merged.boxes[:, 3])
+
+    engines_in_cell = defaultdict(list)
+    for cell, engine in zip(group_cell.tolist(), group_engine.tolist()):
+        engines_in_cell[cell].append(names[engine])
+
+    output = []
+    for index, pair in enumerate(winners):
+        cell = int(pair_cell[pair])
+        output.append({
+            'row': cell // n_cols,
+            'col': cell % n_cols,
+            'text': group_texts[pair_group[pair]],
+            'confidence': float(pair_score[pair] / max(pair_weight[pair], 1e-9)),
+            'agreement': float(pair_score[pair] / max(cell_total[index], 1e-9)),
+            'engines': engines_in_cell[cell],
+            'bbox': ltrb[index].tolist()
+        })
+    return output
+
+
+def ensemble_ocr(image_bytes, engines=DEFAULT_ENGINES, budget=None, weights=None, row_eps=30, col_eps=30,
+                 frame=None):
+    """
+    엔진들을 동시에 실행하고 셀 단위 투표로 합침 (이미지는 DecodedFrame으로 한 번만 디코딩해 공유)
+    budget: 전체 인식 시간 제한 (초, None이면 모든 엔진을 기다림) - 넘긴 엔진은 결과에서 제외
+        (제외된 엔진의 스레드는 끝날 때까지 백그라운드에서 계속 실행되고 결과는 버려짐)
+        모든 엔진이 시간 제한을 넘기면 EnsembleTimeout
+    return: {'grid', 'extracted_texts' (셀별 투표 결과), 'text_count', 'cache_hit',
+             'engines': {엔진: {'status': ok/late/error, 'time', 'text_count'|'error'}},
+             'timing': {'ocr', 'fusion'}, ['late_work': 제외된 엔진이 모두 끝나면 완료되는 Future]}
+    """
+    for engine in engines:
+        if engine not in ENSEMBLE_ENGINES:
+            raise ValueError(f"지원하지 않는 엔진: {engine}")
+
+    start_time = time.time()
+    finished_at = {}
+    frame = frame or DecodedFrame(image_bytes)
+
+    def run(engine):
+        try:
+            return run_engine(engine, image_bytes, frame)
+        finally:
+            finished_at[engine] = time.time()
+
+    executor = ThreadPoolExecutor(max_workers=len(engines), thread_name_prefix='ensemble')
+    futures = {engine: executor.submit(run, engine) for engine in engines}
+    done, _ = wait(futures.values(), timeout=budget)
+    executor.shutdown(wait=False, cancel_futures=True)
+    ocr_time = time.time() - start_time
+
+    late = [future for future in futures.values() if future not in done]
+    late_work = _all_done(late) if late else None
+    if late and len(late) == len(futures):
+        raise EnsembleTimeout(f"모든 엔진이 시간 제한({budget}초)을 넘었습니다: {', '.join(engines)}", late_work)
+
+    results = {}
+    engine_info = {}
+    for engine, future in futures.items():
+        if future not in done:
+            engine_info[engine] = {'status': 'late', 'time': None}
+            continue
+        elapsed = finished_at.get(engine, time.time()) - start_time
+        try:
+            results[engine] = future.result()
+        except Exception as e:
+            engine_info[engine] = {'status': 'error', 'time': elapsed, 'error': str(e)}
+            continue
+        engine_info[engine] = {'status': 'ok', 'time': elapsed, 'text_count': len(results[engine])}
+
+    if not results and any(info['status'] == 'error' for info in engine_info.values()):
+        raise ValueError("모든 엔진이 실패했습니다: " + ', '.join(
+            f"{engine}: {info['error']}" for engine, info in engine_info.items() if info['status'] == 'error'))
+
+    start_time = time.time()
+    cells = vote_cells(results, weights, row_eps, col_eps)
+    grid = defaultdict(dict)
+    extracted_texts = []
+    for cell in cells:
+        if not cell['text']:
+            continue
+        grid[cell['row']][cell['col']] = cell['text']
+        extracted_texts.append({'text': cell['text'], 'confidence': cell['confidence'], 'bbox': cell['bbox'],
+                                'agreement': cell['agreement'], 'engines': cell['engines']})
+    fusion_time = time.time() - start_time
+
+    output = {
+        'grid': grid,
+        'extracted_texts': extracted_texts,
+        'text_count': len(extracted_texts),
+        'cache_hit': False,
+        'engines': engine_info,
+        'timing': {'ocr': ocr_time, 'fusion': fusion_time}
+    }
+    if late_work is not None:
+        output['late_work'] = late_work
+    return output
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="여러 엔진 동시 실행 + 셀 단위 투표")
+    parser.add_argument('image', nargs='?', default='image5.jpg')
+    parser.add_argument('--engine', action='append', choices=ENSEMBLE_ENGINES,
+                        help="사용할 엔진 (여러 번 지정 가능, 기본: tesseract, easyocr)")
+    parser.add_argument('--budget', type=float, default=None, help="인식 시간 제한 (초)")
+    args = parser.parse_args()
+
+    with open(args.image, 'rb') as f:
+        output = ensemble_ocr(f.read(), args.engine or DEFAULT_ENGINES, args.budget)
+    for engine, info in output['engines'].items():
+        elapsed = f"{info['time']:.2f}초" if info['time'] is not None else "-"
+        print(f"   {engine:10s} {info['status']:5s} {elapsed}")
+    print(f"🗳️  셀 {output['text_count']}개 (인식 {output['timing']['ocr']:.2f}초, "
+          f"투표 {output['timing']['fusion'] * 1000:.1f}ms)")
+    for row in sorted(output['grid']):
+        print(f"   행 {row}: {[output['grid'][row][col] for col in sorted(output['grid'][row])]}")
@@ -1,80 +1,13 @@
 import json
 import re
-from collections import defaultdict
 from datetime import datetime
-import numpy as np
+from ocr_result import cluster_grid
+from result_stream import first_result
 
 def cluster_texts_to_grid(ocr_results, row_eps=30, col_eps=30):
     """bbox 중심 좌표를 기준으로 행/열 클러스터링하여 2차원 그리드로 변환"""
-    # bbox 중심 좌표 계산
-    items = []
-    for item in ocr_results:
-        bbox = item['bbox']
-        cx = (bbox[0] + bbox[2]) / 2
-        cy = (bbox[1] + bbox[3]) / 2
-        items.append({
-            'text': item['text'], 
-            'cx': cx, 
-            'cy': cy, 
-            'bbox': bbox, 
-            'confidence': item['confidence']
-        })
-
-    # y좌표(행) 클러스터링
-    ys = np.array([it['cy'] for it in items])
-    y_sorted_idx = np.argsort(ys)
-    row_clusters = []
-    for idx in y_sorted_idx:
-        y = ys[idx]
-        found = False
-        for row in row_clusters:
-            if abs(row[0] - y) < row_eps:
-                row.append(y)
-                found = True
-                break
-        if not found:
-            row_clusters.append([y])
-    
-    row_centers = [np.mean(row) for row in row_clusters]
-
-    # 각 텍스트에 행 인덱스 할당
-    for it in items:
-        it['row'] = int(np.argmin([abs(it['cy']-rc) for rc in row_centers]))
-
-    # x좌표(열) 클러스터링 (행별로)
-    grid = defaultdict(lambda: defaultdict(list))
-    for row in range(len(row_centers)):
-        row_items = [it for it in items if it['row']==row]
-        if not row_items:
-            continue
-            
-        xs = np.array([it['cx'] for it in row_items])
-        x_sorted_idx = np.argsort(xs)
-        col_clusters = []
-        for idx in x_sorted_idx:
-            x = xs[idx]
-            found = False
-            for col in col_clusters:
-                if abs(col[0] - x) < col_eps:
-                    col.append(x)
-                    found = True
-                    break
-            if not found:
-                col_clusters.append([x])
-        
-        col_centers = [np.mean(col) for col in col_clusters]
-        for it in row_items:
-            it['col'] = int(np.argmin([abs(it['cx']-cc) for cc in col_centers]))
-            grid[row][it['col']].append(it)
-    
-    # 각 셀에 텍스트 합치기
-    grid_text = defaultdict(dict)
-    for row in grid:
-        for col in grid[row]:
-            cell_text = ' '.join([it['text'] for it in grid[row][col]])
-            grid_text[row][col] = cell_text.strip()
-    
-    return grid_text
+    # 박스 중심 계산과 행/열 클러스터링은 배열 연산으로 처리 (ocr_result.cluster_grid)
+    return cluster_grid(ocr_results, row_eps, col_eps)
 
 def extract_dates_from_row(row_texts, base_year=2025, base_month=1):
     """날짜 추출"""
@@ -211,11 +144,8 @@ def main():
     print("=" * 60)
     
     # Tesseract 결과 읽기
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    # 첫 번째 이미지 사용
-    first_image = data[0]
+    # 첫 번째 이미지 사용 (.ndjson/.ocrc 결과는 첫 이미지만 읽음)
+    first_image = first_result(json_path)
     print(f"🖼️  이미지: {first_image['image_name']}")
     print(f"📝 추출된 텍스트 수: {first_image['text_count']}")
     
@@ -0,0 +1,148 @@
+"""
+미리 디코딩한 이미지 묶음 (메모리 매핑 원시 픽셀 파일 + 인덱스)
+벤치마크마다 JPEG/PNG 디코딩과 파일 읽기가 섞여 엔진 비교가 흔들리지 않도록,
+이미지들을 한 번 디코딩해 BGR 픽셀 그대로 한 파일에 이어 쓰고 위치를 인덱스(JSON)에 기록합니다.
+읽을 때는 np.memmap 뷰를 그대로 넘기므로 디코딩도 복사도 없고, 여러 워커 프로세스가 같은 페이지를 공유합니다.
+
+    corpus.frames  - 프레임별 BGR uint8 픽셀 (각 프레임은 페이지 경계에서 시작)
+    corpus.json    - {'version', 'frames_file', 'frames': [{'name', 'offset', 'shape', 'source_sha256', 'source_size'}]}
+
+사용 예:
+    python image_corpus.py pack                        # 현재 디렉터리의 이미지 → corpus.frames / corpus.json
+    python image_corpus.py pack image1.jpg image5.jpg --output bench
+    python image_corpus.py info corpus.json
+    python batch_ocr.py --corpus corpus.json --engine tesseract
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+
+CORPUS_VERSION = 1
+DEFAULT_CORPUS = 'corpus'
+# 프레임 시작 위치 정렬 (페이지 크기)
+FRAME_ALIGN = 4096
+
+
+def pack_corpus(image_paths, output=DEFAULT_CORPUS):
+    """
+    이미지들을 디코딩해 원시 픽셀 파일 + 인덱스로 저장
+    읽을 수 없는 이미지는 건너뜀
+    return: (인덱스 파일 경로, 건너뛴 이미지 목록)
+    """
+    import cv2
+
+    output = Path(output)
+    frames_path = output.with_suffix('.frames')
+    index_path = output.with_suffix('.json')
+
+    frames = []
+    skipped = []
+    offset = 0
+    with open(frames_path, 'wb') as f:
+        for path in image_paths:
+            path = Path(path)
+            data = path.read_bytes()
+            image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR) if data else None
+            if image is None:
+                skipped.append(str(path))
+                continue
+            padding = -offset % FRAME_ALIGN
+            f.write(b'\0' * padding)
+            offset += padding
+            f.write(np.ascontiguousarray(image).tobytes())
+            frames.append({
+                'name': path.name,
+                'offset': offset,
+                'shape': list(image.shape),
+                'source_sha256': hashlib.sha256(data).hexdigest(),
+                'source_size': len(data)
+            })
+            offset += image.nbytes
+
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': CORPUS_VERSION, 'frames_file': frames_path.name, 'frames': frames},
+                  f, ensure_ascii=False, indent=2)
+    return index_path, skipped
+
+
+class ImageCorpus:
+    def __init__(self, index_path):
+        """index_path: pack_corpus가 만든 인덱스 JSON (원시 픽셀 파일은 같은 디렉터리)"""
+        index_path = Path(index_path)
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') != CORPUS_VERSION:
+            raise ValueError(f"지원하지 않는 코퍼스 버전: {index.get('version')}")
+        self.index_path = index_path
+        self.frames = index['frames']
+        self._by_name = {entry['name']: i for i, entry in enumerate(self.frames)}
+        frames_path = index_path.parent / index['frames_file']
+        # 빈 파일은 매핑할 수 없음
+        self._memmap = np.memmap(frames_path, dtype=np.uint8, mode='r') if self.frames else None
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __iter__(self):
+        return (self.frame(i) for i in range(len(self)))
+
+    @property
+    def names(self):
+        return [entry['name'] for entry in self.frames]
+
+    def _position(self, key):
+        if isinstance(key, str):
+            if key not in self._by_name:
+                raise KeyError(key)
+            return self._by_name[key]
+        return key
+
+    def array(self, key):
+        """프레임 픽셀 (메모리 매핑 뷰 - 읽기 전용, 복사 없음), key: 번호 또는 이미지 이름"""
+        entry = self.frames[self._position(key)]
+        size = int(np.prod(entry['shape']))
+        return self._memmap[entry['offset']:entry['offset'] + size].reshape(entry['shape'])
+
+    def frame(self, key):
+        """프레임을 DecodedFrame으로 (엔진 함수에 frame=으로 전달, 원본 바이트가 없으므로 캐시는 사용 불가)"""
+        from decoded_frame import DecodedFrame
+        position = self._position(key)
+        return DecodedFrame.from_array(self.array(position), self.frames[position]['name'])
+
+    def total_bytes(self):
+        return sum(int(np.prod(entry['shape'])) for entry in self.frames)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="미리 디코딩한 이미지 묶음 (메모리 매핑)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    pack_parser = subparsers.add_parser('pack', help="이미지들을 원시 픽셀 파일로 묶기")
+    pack_parser.add_argument('images', nargs='*', help="이미지 파일 (기본: 현재 디렉터리의 이미지 전체)")
+    pack_parser.add_argument('--output', default=DEFAULT_CORPUS, help="출력 경로 (확장자 제외)")
+    info_parser = subparsers.add_parser('info', help="코퍼스 내용 출력")
+    info_parser.add_argument('index', nargs='?', default=DEFAULT_CORPUS + '.json')
+    args = parser.parse_args()
+
+    if args.command == 'pack':
+        from batch_ocr import find_image_files
+        image_paths = args.images or find_image_files('.')
+        index_path, skipped = pack_corpus(image_paths, args.output)
+        corpus = ImageCorpus(index_path)
+        for path in skipped:
+            print(f"   ⚠️  읽을 수 없어 건너뜀: {path}")
+        print(f"📦 {len(corpus)}개 이미지 → {index_path} ({corpus.total_bytes() / 1024 ** 2:.1f}MB 원시 픽셀)")
+    else:
+        corpus = ImageCorpus(args.index)
+        for i, entry in enumerate(corpus.frames):
+            h, w = entry['shape'][:2]
+            print(f"   [{i}] {entry['name']}: {w}x{h}, 원본 {entry['source_size'] / 1024:.0f}KB")
+        print(f"📦 {len(corpus)}개 이미지, {corpus.total_bytes() / 1024 ** 2:.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,507 @@
+"""
+OCR 입력 이미지 전처리
+해상도 정규화: 작게 디코딩한 이미지로 글자 높이를 추정한 뒤, 목표 글자 높이에 맞게 축소합니다.
+JPEG는 디코딩 단계에서 바로 1/2, 1/4, 1/8 크기로 풀기 때문에 원본 해상도 비트맵을 만들지 않습니다.
+OCR 결과 박스는 map_boxes_to_original로 원본 좌표로 되돌려 기존 파서가 그대로 동작하도록 합니다.
+
+전처리 파이프라인: 흑백 변환 → 적응형 이진화 → 투영 프로파일 기울기 보정 → 테두리 제거
+결과 이미지는 입력 바이트 해시 기준으로 디스크에 캐시되며(.preprocess_cache), 단계별 소요 시간을 함께 반환합니다.
+    python image_preprocess.py image5.jpg
+"""
+
+import io
+import time
+
+import numpy as np
+
+# 인식에 충분한 글자 높이 (픽셀)
+DEFAULT_TARGET_TEXT_HEIGHT = 20
+# 글자 높이 추정용 축소 디코딩의 목표 긴 변 길이
+PROBE_LONG_SIDE = 1200
+
+_REDUCE_FLAGS = {
+    'color': {1: 'IMREAD_COLOR', 2: 'IMREAD_REDUCED_COLOR_2', 4: 'IMREAD_REDUCED_COLOR_4', 8: 'IMREAD_REDUCED_COLOR_8'},
+    'gray': {1: 'IMREAD_GRAYSCALE', 2: 'IMREAD_REDUCED_GRAYSCALE_2', 4: 'IMREAD_REDUCED_GRAYSCALE_4', 8: 'IMREAD_REDUCED_GRAYSCALE_8'},
+}
+
+
+def _decode(image_bytes, mode, reduce_factor):
+    """축소 디코딩 (JPEG는 DCT 단계에서 축소, 그 외 형식은 OpenCV가 디코딩 후 축소)"""
+    import cv2
+    flag = getattr(cv2, _REDUCE_FLAGS[mode][reduce_factor])
+    return cv2.imdecode(np.frombuffer(image_bytes, np.uint8), flag)
+
+
+def read_image_size(image_bytes):
+    """
+    헤더만 읽어 (가로, 세로) 반환 - 픽셀 디코딩 없음
+    EXIF 회전 정보가 있으면 OpenCV 디코딩 결과와 같은 방향으로 맞춤
+    """
+    from PIL import Image
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        width, height = img.size
+        try:
+            orientation = img.getexif().get(0x0112, 1)
+        except Exception:
+            orientation = 1
+    if orientation in (5, 6, 7, 8):  # 90도 회전
+        width, height = height, width
+    return width, height
+
+
+def estimate_text_height(gray):
+    """
+    흑백 이미지에서 글자 높이(픽셀) 추정 - 연결 요소 높이의 중앙값
+    괘선처럼 가늘고 긴 요소, 점 같은 잡음은 제외
+    return: 글자 높이 (추정 실패 시 None)
+    """
+    import cv2
+
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    n, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    if n <= 1:
+        return None
+
+    widths = stats[1:, cv2.CC_STAT_WIDTH]
+    heights = stats[1:, cv2.CC_STAT_HEIGHT]
+    image_height = gray.shape[0]
+    is_glyph = ((heights >= 3) & (heights <= image_height * 0.25) &
+                (widths <= heights * 5) & (heights <= widths * 8))
+    if np.count_nonzero(is_glyph) < 5:
+        return None
+    return float(np.median(heights[is_glyph]))
+
+
+def decode_probe(image_bytes):
+    """
+    긴 변이 PROBE_LONG_SIDE 근처가 되도록 흑백으로 축소 디코딩 (글자 높이/특징 추정용)
+    return: (흑백 이미지, 원본 (가로, 세로))
+    """
+    orig_w, orig_h = read_image_size(image_bytes)
+    probe_factor = 1
+    while probe_factor < 8 and max(orig_w, orig_h) / (probe_factor * 2) >= PROBE_LONG_SIDE:
+        probe_factor *= 2
+    probe = _decode(image_bytes, 'gray', probe_factor)
+    if probe is None:
+        raise ValueError("이미지를 디코딩할 수 없습니다")
+    return probe, (orig_w, orig_h)
+
+
+def decode_normalized(image_bytes, target_text_height=DEFAULT_TARGET_TEXT_HEIGHT, allow_upscale=False):
+    """
+    글자 높이가 target_text_height가 되도록 축소 디코딩
+    image_bytes: 원본 이미지 파일 바이트
+    allow_upscale: 글자가 목표보다 작을 때 확대할지 여부
+    return: (BGR 이미지, 정보 dict)
+        정보: scale_x / scale_y (처리 이미지 / 원본 비율), original_size, text_height, reduce_factor, timing
+    """
+    import cv2
+
+    timing = {}
+    start_time = time.time()
+
+    # 1) 작게 디코딩해서 글자 높이 추정
+    probe, (orig_w, orig_h) = decode_probe(image_bytes)
+    probe_scale = probe.shape[1] / orig_w
+    probe_text_height = estimate_text_height(probe)
+    text_height = probe_text_height / probe_scale if probe_text_height else None
+    timing['estimate'] = time.time() - start_time
+
+    # 2) 목표 배율 계산
+    scale = target_text_height / text_height if text_height else 1.0
+    if not allow_upscale:
+        scale = min(scale, 1.0)
+
+    # 3) 목표 배율보다 작아지지 않는 범위에서 가장 크게 줄여서 디코딩
+    start_time = time.time()
+    reduce_factor = 1
+    while reduce_factor < 8 and 1.0 / (reduce_factor * 2) >= scale:
+        reduce_factor *= 2
+    image = _decode(image_bytes, 'color', reduce_factor)
+    if image is None:
+        raise ValueError("이미지를 디코딩할 수 없습니다")
+
+    target_w = max(1, int(round(orig_w * scale)))
+    target_h = max(1, int(round(orig_h * scale)))
+    if (target_w, target_h) != (image.shape[1], image.shape[0]):
+        interpolation = cv2.INTER_AREA if target_w < image.shape[1] else cv2.INTER_CUBIC
+        image = cv2.resize(image, (target_w, target_h), interpolation=interpolation)
+    timing['decode'] = time.time() - start_time
+
+    return image, {
+        'scale_x': image.shape[1] / orig_w,
+        'scale_y': image.shape[0] / orig_h,
+        'original_size': (orig_w, orig_h),
+        'processed_size': (image.shape[1], image.shape[0]),
+        'text_height': text_height,
+        'reduce_factor': reduce_factor,
+        'timing': timing
+    }
+
+
+def load_normalized(image_path, target_text_height=DEFAULT_TARGET_TEXT_HEIGHT, allow_upscale=False):
+    """파일 경로용 decode_normalized"""
+    with open(image_path, 'rb') as f:
+        return decode_normalized(f.read(), target_text_height, allow_upscale)
+
+
+def map_boxes_to_original(items, scale_x, scale_y):
+    """
+    처리 이미지 좌표의 OCR 결과를 원본 이미지 좌표로 변환 (새 목록 반환)
+    items: [{'text', 'confidence', 'bbox'}] - bbox는 4점 [[x,y],...] 또는 [l, t, r, b]
+    """
+    mapped = []
+    for item in items:
+        bbox = item['bbox']
+        if bbox and isinstance(bbox[0], (list, tuple)):
+            new_bbox = [[float(x) / scale_x, float(y) / scale_y] for x, y in bbox]
+        else:
+            l, t, r, b = bbox
+            new_bbox = [int(round(l / scale_x)), int(round(t / scale_y)),
+                        int(round(r / scale_x)), int(round(b / scale_y))]
+        new_item = dict(item)
+        new_item['bbox'] = new_bbox
+        mapped.append(new_item)
+    return mapped
+
+
+# ---------------------------------------------------------------------------
+# 이진화 / 기울기 보정 / 테두리 제거 파이프라인
+# ---------------------------------------------------------------------------
+
+PREPROCESS_STEPS = ('grayscale', 'threshold', 'deskew', 'crop')
+DEFAULT_PREPROCESS_CACHE_DIR = '.preprocess_cache'
+DEFAULT_PREPROCESS_CACHE_BYTES = 256 * 1024 * 1024  # 256MB
+
+
+def to_grayscale(image):
+    """BGR 이미지를 흑백으로 (이미 흑백이면 그대로)"""
+    import cv2
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+
+
+def adaptive_binarize(gray, block_size=31, c=15):
+    """조명이 고르지 않은 사진용 적응형 이진화 (글자=검정, 배경=흰색)"""
+    import cv2
+    return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY,
+                                 block_size | 1, c)
+
+
+def estimate_skew_angle(binary, max_angle=5.0, step=0.25, max_side=1000):
+    """
+    투영 프로파일로 기울기(도) 추정
+    각 후보 각도로 글자 픽셀을 기울여 행별로 세었을 때 프로파일이 가장 뾰족한 각도를 선택
+    (이미지를 각도마다 회전하지 않고, 전체 후보 각도의 히스토그램을 bincount 한 번으로 계산)
+    return: rotate_image에 그대로 넘길 각도 (양수 = 반시계 방향 회전으로 보정)
+    """
+    h, w = binary.shape
+    factor = max(1, int(np.ceil(max(h, w) / max_side)))
+    small = binary[::factor, ::factor]
+    ys, xs = np.nonzero(small < 128)
+    if len(ys) < 50:
+        return 0.0
+
+    angles = np.arange(-max_angle, max_angle + step / 2, step)
+    tans = np.tan(np.deg2rad(angles))
+    # 각도별 기울인 행 번호 (n_angles x n_pixels)
+    offset = int(np.ceil(small.shape[1] * np.abs(tans).max()))
+    n_bins = small.shape[0] + 2 * offset + 1
+    rows = np.rint(ys[None, :] - xs[None, :] * tans[:, None]).astype(np.int32) + offset
+    flat = rows + np.arange(len(angles))[:, None] * n_bins
+    profiles = np.bincount(flat.ravel(), minlength=len(angles) * n_bins).reshape(len(angles), n_bins)
+
+    # 인접 행 차이 제곱합이 클수록 글자 줄과 줄 사이가 뚜렷함
+    scores = np.square(np.diff(profiles.astype(np.float64), axis=1)).sum(axis=1)
+    return float(angles[int(np.argmax(scores))])
+
+
+def rotate_image(image, angle):
+    """
+    이미지 중심 기준 회전 (빈 영역은 흰색)
+    return: (회전된 이미지, 2x3 변환 행렬 - 원본 좌표 -> 회전 좌표)
+    """
+    import cv2
+
+    h, w = image.shape[:2]
+    matrix = cv2.getRotationMatrix2D((w / 2.0, h / 2.0), angle, 1.0)
+    border = 255 if image.ndim == 2 else (255, 255, 255)
+    rotated = cv2.warpAffine(image, matrix, (w, h), flags=cv2.INTER_LINEAR,
+                             borderMode=cv2.BORDER_CONSTANT, borderValue=border)
+    return rotated, matrix
+
+
+def find_content_box(binary, dark_border_ratio=0.8, margin=10):
+    """
+    테두리(사진 가장자리의 어두운 띠, 빈 여백)를 제외한 내용 영역
+    return: (x, y, w, h)
+    """
+    ink = binary < 128
+    h, w = ink.shape
+    row_ink = ink.mean(axis=1)
+    col_ink = ink.mean(axis=0)
+
+    def content_range(profile):
+        # 가장자리에서부터 거의 검은 줄(스캔/촬영 테두리)은 건너뜀
+        start, end = 0, len(profile)
+        while start < end and profile[start] >= dark_border_ratio:
+            start += 1
+        while end > start and profile[end - 1] >= dark_border_ratio:
+            end -= 1
+        idx = np.flatnonzero(profile[start:end] > 0)
+        if len(idx) == 0:
+            return 0, len(profile)
+        return max(start + idx[0] - margin, start), min(start + idx[-1] + 1 + margin, end)
+
+    y1, y2 = content_range(row_ink)
+    x1, x2 = content_range(col_ink)
+    return int(x1), int(y1), int(x2 - x1), int(y2 - y1)
+
+
+def preprocess_image(image, steps=PREPROCESS_STEPS, block_size=31, c=15, max_angle=5.0):
+    """
+    OCR용 전처리 파이프라인
+    image: BGR 또는 흑백 이미지
+    steps: 실행할 단계 ('grayscale', 'threshold', 'deskew', 'crop' 중 순서대로)
+    return: (처리된 이미지, 정보 dict)
+        정보: angle (보정한 기울기), crop (x, y, w, h), transform (처리 좌표 -> 입력 좌표 2x3 행렬), timing (단계별 초)
+    """
+    unknown = set(steps) - set(PREPROCESS_STEPS)
+    if unknown:
+        raise ValueError(f"지원하지 않는 전처리 단계: {', '.join(sorted(unknown))}")
+
+    timing = {}
+    angle = 0.0
+    crop = (0, 0, image.shape[1], image.shape[0])
+    # 처리 좌표 -> 입력 좌표 (3x3 동차 행렬로 누적)
+    to_input = np.eye(3)
+    binary = None
+    thresholded = False
+    out = image
+
+    for step in steps:
+        start_time = time.time()
+        if step == 'grayscale':
+            out = to_grayscale(out)
+        elif step == 'threshold':
+            out = adaptive_binarize(to_grayscale(out), block_size, c)
+            binary = out
+            thresholded = True
+        elif step == 'deskew':
+            if binary is None:
+                binary = adaptive_binarize(to_grayscale(out), block_size, c)
+            angle = estimate_skew_angle(binary, max_angle)
+            if angle != 0.0:
+                out, matrix = rotate_image(out, angle)
+                binary = out if thresholded else None
+                to_input = to_input @ np.linalg.inv(np.vstack([matrix, [0, 0, 1]]))
+        elif step == 'crop':
+            if binary is None or binary.shape != out.shape[:2]:
+                binary = adaptive_binarize(to_grayscale(out), block_size, c)
+            x, y, w, h = find_content_box(binary)
+            out = out[y:y + h, x:x + w]
+            binary = binary[y:y + h, x:x + w]
+            crop = (x, y, w, h)
+            to_input = to_input @ np.array([[1, 0, x], [0, 1, y], [0, 0, 1]], dtype=np.float64)
+        timing[step] = time.time() - start_time
+
+    return np.ascontiguousarray(out), {
+        'steps': list(steps),
+        'angle': angle,
+        'crop': crop,
+        'transform': to_input[:2].tolist(),
+        'timing': timing
+    }
+
+
+def map_boxes_through(items, transform):
+    """
+    전처리 이미지 좌표의 OCR 결과를 입력 이미지 좌표로 변환 (preprocess_image의 transform 사용)
+    bbox는 4점 [[x,y],...] 또는 [l, t, r, b] (회전이 있으면 [l, t, r, b]는 감싸는 사각형으로)
+    """
+    matrix = np.asarray(transform, dtype=np.float64)
+    mapped = []
+    for item in items:
+        bbox = item['bbox']
+        is_quad = bool(bbox) and isinstance(bbox[0], (list, tuple))
+        if is_quad:
+            points = np.asarray(bbox, dtype=np.float64)
+        else:
+            l, t, r, b = bbox
+            points = np.array([[l, t], [r, t], [r, b], [l, b]], dtype=np.float64)
+        points = points @ matrix[:, :2].T + matrix[:, 2]
+        new_item = dict(item)
+        if is_quad:
+            new_item['bbox'] = points.tolist()
+        else:
+            new_item['bbox'] = [int(round(points[:, 0].min())), int(round(points[:, 1].min())),
+                                int(round(points[:, 0].max())), int(round(points[:, 1].max()))]
+        mapped.append(new_item)
+    return mapped
+
+
+class PreprocessCache:
+    """
+    전처리 결과 디스크 캐시 (입력 이미지 바이트 해시 + 단계/파라미터 기준)
+    이미지는 무손실 PNG, 정보는 JSON으로 저장하고 용량 초과 시 오래 사용하지 않은 항목부터 삭제
+    """
+
+    def __init__(self, cache_dir=DEFAULT_PREPROCESS_CACHE_DIR, max_disk_bytes=DEFAULT_PREPROCESS_CACHE_BYTES,
+                 enabled=True):
+        from pathlib import Path
+        self.cache_dir = Path(cache_dir)
+        self.max_disk_bytes = max_disk_bytes
+        self.enabled = enabled
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    @staticmethod
+    def make_key(image_bytes, params):
+        import hashlib
+        import json
+        h = hashlib.sha256()
+        h.update(image_bytes)
+        h.update(b'\0')
+        h.update(json.dumps(params, sort_keys=True).encode('utf-8'))
+        return h.hexdigest()
+
+    def _paths(self, key):
+        base = self.cache_dir / key[:2] / key
+        return base.with_suffix('.png'), base.with_suffix('.json')
+
+    def get(self, key):
+        """캐시 조회 - return: (이미지, 정보) 또는 None"""
+        import json
+        import os
+        import cv2
+
+        if not self.enabled:
+            return None
+        image_path, info_path = self._paths(key)
+        try:
+            with open(info_path, 'r', encoding='utf-8') as f:
+                info = json.load(f)
+            image = cv2.imdecode(np.fromfile(str(image_path), np.uint8), cv2.IMREAD_UNCHANGED)
+        except (OSError, ValueError):
+            image = None
+        if image is None:
+            self.stats['misses'] += 1
+            return None
+        now = time.time()
+        try:
+            os.utime(image_path, (now, now))
+        except OSError:
+            pass
+        self.stats['hits'] += 1
+        return image, info
+
+    def put(self, key, image, info):
+        """캐시 저장 (임시 파일에 쓴 뒤 교체)"""
+        import json
+        import os
+        import cv2
+
+        if not self.enabled:
+            return
+        image_path, info_path = self._paths(key)
+        image_path.parent.mkdir(parents=True, exist_ok=True)
+        ok, encoded = cv2.imencode('.png', image)
+        if not ok:
+            return
+        tmp_image = image_path.with_suffix(f'.{os.getpid()}.png.tmp')
+        tmp_info = info_path.with_suffix(f'.{os.getpid()}.json.tmp')
+        encoded.tofile(str(tmp_image))
+        with open(tmp_info, 'w', encoding='utf-8') as f:
+            json.dump(info, f, ensure_ascii=False)
+        # 정보 파일을 나중에 교체 - 정보 파일이 보이면 이미지도 완성된 상태
+        os.replace(tmp_image, image_path)
+        os.replace(tmp_info, info_path)
+        self._evict()
+
+    def _evict(self):
+        """디스크 용량 초과 시 오래 사용하지 않은 항목부터 삭제"""
+        entries = []
+        total = 0
+        for image_path in self.cache_dir.glob('*/*.png'):
+            try:
+                st = image_path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, image_path))
+            total += st.st_size
+        for _, size, image_path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            for path in (image_path, image_path.with_suffix('.json')):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            total -= size
+            self.stats['evictions'] += 1
+
+
+_default_preprocess_cache = None
+
+
+def get_preprocess_cache():
+    """프로세스 기본 전처리 캐시 (PREPROCESS_CACHE_DIR, PREPROCESS_CACHE=0 환경변수 반영)"""
+    import os
+    global _default_preprocess_cache
+    if _default_preprocess_cache is None:
+        _default_preprocess_cache = PreprocessCache(
+            cache_dir=os.environ.get('PREPROCESS_CACHE_DIR', DEFAULT_PREPROCESS_CACHE_DIR),
+            enabled=os.environ.get('PREPROCESS_CACHE', '1') != '0'
+        )
+    return _default_preprocess_cache
+
+
+def preprocess_bytes(image_bytes, steps=PREPROCESS_STEPS, cache=None, frame=None, **params):
+    """
+    이미지 파일 바이트를 디코딩해 전처리 (캐시 적중 시 디코딩/전처리 모두 생략)
+    frame: 같은 이미지의 DecodedFrame (있으면 직접 디코딩하지 않고 공유된 BGR 배열 사용)
+    params: preprocess_image의 block_size, c, max_angle
+    return: (처리된 이미지, 정보 dict, 캐시 적중 여부)
+    """
+    import cv2
+
+    cache = cache or get_preprocess_cache()
+    key = cache.make_key(image_bytes, {'steps': list(steps), **params})
+    cached = cache.get(key)
+    if cached is not None:
+        image, info = cached
+        return image, info, True
+
+    if frame is not None:
+        image = frame.bgr
+    else:
+        image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError("이미지를 디코딩할 수 없습니다")
+    out, info = preprocess_image(image, steps, **params)
+    cache.put(key, out, info)
+    return out, info, False
+
+
+def preprocess_file(image_path, steps=PREPROCESS_STEPS, cache=None, **params):
+    """파일 경로용 preprocess_bytes"""
+    with open(image_path, 'rb') as f:
+        return preprocess_bytes(f.read(), steps, cache, **params)
+
+
+if __name__ == "__main__":
+    import sys
+    import cv2
+
+    image_path = sys.argv[1] if len(sys.argv) > 1 else "image5.jpg"
+    try:
+        out, info, hit = preprocess_file(image_path)
+    except (OSError, ValueError) as e:
+        print(f"❌ 전처리 실패: {e}")
+        sys.exit(1)
+
+    print(f"🖼️  전처리: {image_path} {'(캐시 적중)' if hit else ''}")
+    print(f"📐 기울기 {info['angle']:+.2f}도, 내용 영역 {info['crop']}")
+    for step, elapsed in info['timing'].items():
+        print(f"⏱️  {step:10s} {elapsed:.3f}초")
+    output_path = 'preprocessed_' + image_path.rsplit('/', 1)[-1].rsplit('.', 1)[0] + '.png'
+    cv2.imwrite(output_path, out)
+    print(f"💾 저장: {output_path}")
@@ -0,0 +1,372 @@
+"""
+근무표 처리 작업 큐 (SQLite, 여러 프로세스가 함께 사용 가능)
+작업 상태: queued → leased → done / failed
+    - lease: 워커가 작업을 일정 시간 동안 가져감 (워커가 죽으면 시간이 지난 뒤 다시 queued)
+             처리 중에는 heartbeat가 주기적으로 lease를 연장하므로 오래 걸리는 작업도 다시 배정되지 않음
+    - ack:   처리 완료 (결과 저장)
+    - nack:  처리 실패 - max_attempts 전까지는 지수 백오프 후 재시도, 이후 failed
+대기 작업 수(queued + leased)가 max_depth에 도달하면 enqueue가 기다리거나 QueueFullError를 발생시켜
+업로드가 몰릴 때 생산자 쪽 속도를 늦춥니다.
+
+사용 예:
+    python job_queue.py enqueue image5.jpg image6.jpg --engine easyocr
+    python job_queue.py worker --processes 2 --exit-when-empty
+    python job_queue.py status
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from schedule_pipeline import BadRequest
+
+DEFAULT_DB_PATH = 'roster_jobs.db'
+DEFAULT_MAX_DEPTH = 1000
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_DELAY = 5.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_token TEXT,
+    lease_expires REAL,
+    available_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at, id);
+"""
+
+
+class QueueFullError(Exception):
+    """대기 작업 수가 max_depth에 도달해 enqueue할 수 없음"""
+
+
+class JobQueue:
+    def __init__(self, path=DEFAULT_DB_PATH, max_depth=DEFAULT_MAX_DEPTH, lease_seconds=DEFAULT_LEASE_SECONDS,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS, retry_delay=DEFAULT_RETRY_DELAY):
+        """
+        path: SQLite 파일 경로 (프로세스마다 JobQueue를 따로 만들어 같은 파일을 공유)
+        max_depth: queued + leased 작업 수 상한 (생산자 배압)
+        lease_seconds: 작업을 가져간 워커가 이 시간 안에 ack/nack 하지 않으면 다른 워커가 다시 가져감
+        max_attempts: 최대 시도 횟수 (초과 시 failed)
+        retry_delay: 재시도 대기 시간 기본값 (시도마다 2배)
+        """
+        self.path = path
+        self.max_depth = max_depth
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+        # isolation_level=None: 트랜잭션을 BEGIN IMMEDIATE로 직접 관리
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')  # 워커가 쓰는 동안에도 읽기 가능
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        """쓰기 잠금을 먼저 잡는 트랜잭션 (조회 후 갱신 사이에 다른 프로세스가 끼어들지 못하게)"""
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+        self.conn.execute('COMMIT')
+
+    def depth(self):
+        """처리 대기 중인 작업 수 (queued + leased)"""
+        row = self.conn.execute("SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'leased')").fetchone()
+        return row[0]
+
+    def enqueue(self, payload, block=True, timeout=None, poll_interval=0.5):
+        """
+        작업 추가
+        payload: JSON으로 저장 가능한 dict (예: {'image_path': ..., 'engine': ...})
+        block: 큐가 가득 차면 자리가 날 때까지 기다림 (False면 바로 QueueFullError)
+        timeout: block=True일 때 최대 대기 시간 (None이면 무제한)
+        return: 작업 id
+        """
+        data = json.dumps(payload, ensure_ascii=False)
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            now = time.time()
+            with self._transaction() as conn:
+                if self.depth() < self.max_depth:
+                    cur = conn.execute(
+                        "INSERT INTO jobs (status, payload, available_at, created_at, updated_at) "
+                        "VALUES ('queued', ?, ?, ?, ?)", (data, now, now, now))
+                    return cur.lastrowid
+            if not block or (deadline is not None and now >= deadline):
+                raise QueueFullError(f"작업 큐가 가득 찼습니다 (최대 {self.max_depth}개)")
+            time.sleep(poll_interval)
+
+    def lease(self, worker_id=None, lease_seconds=None):
+        """
+        처리할 작업 하나 가져오기 (오래된 것부터)
+        return: {'id', 'payload', 'attempts', 'lease_token'} 또는 None (처리할 작업 없음)
+        """
+        now = time.time()
+        lease_seconds = lease_seconds or self.lease_seconds
+        with self._transaction() as conn:
+            self._reclaim_expired(conn, now)
+            row = conn.execute(
+                "SELECT id, payload, attempts FROM jobs WHERE status = 'queued' AND available_at <= ? "
+                "ORDER BY available_at, id LIMIT 1", (now,)).fetchone()
+            if row is None:
+                return None
+            token = uuid.uuid4().hex
+            conn.execute(
+                "UPDATE jobs SET status = 'leased', attempts = attempts + 1, worker = ?, lease_token = ?, "
+                "lease_expires = ?, updated_at = ? WHERE id = ?",
+                (worker_id, token, now + lease_seconds, now, row['id']))
+        return {'id': row['id'], 'payload': json.loads(row['payload']),
+                'attempts': row['attempts'] + 1, 'lease_token': token}
+
+    def _reclaim_expired(self, conn, now):
+        """시간 안에 끝나지 않은 작업 (워커 중단 등) 되돌리기 - 시도 횟수를 다 쓴 작업은 failed"""
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', error = '처리 시간 초과 (lease 만료)', lease_token = NULL, "
+            "updated_at = ? WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+            (now, now, self.max_attempts))
+        conn.execute(
+            "UPDATE jobs SET status = 'queued', lease_token = NULL, available_at = ?, updated_at = ? "
+            "WHERE status = 'leased' AND lease_expires < ?", (now, now, now))
+
+    def ack(self, job, result=None):
+        """
+        처리 완료 - job은 lease()가 반환한 dict
+        return: 성공 여부 (lease가 만료되어 다른 워커에게 넘어간 경우 False)
+        """
+        now = time.time()
+        data = json.dumps(result, ensure_ascii=False) if result is not None else None
+        with self._transaction() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, error = NULL, lease_token = NULL, updated_at = ? "
+                "WHERE id = ? AND lease_token = ?", (data, now, job['id'], job['lease_token']))
+            return cur.rowcount == 1
+
+    def nack(self, job, error, retry=True):
+        """
+        처리 실패 - 시도 횟수가 남아 있고 retry=True면 백오프 후 다시 queued, 아니면 failed
+        return: 재시도 예약 여부 (lease가 만료되어 다른 워커에게 넘어간 경우 None - 상태를 바꾸지 않음)
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute("SELECT attempts FROM jobs WHERE id = ? AND lease_token = ?",
+                               (job['id'], job['lease_token'])).fetchone()
+            if row is None:
+                return None
+            if retry and row['attempts'] < self.max_attempts:
+                delay = self.retry_delay * (2 ** (row['attempts'] - 1))
+                conn.execute(
+                    "UPDATE jobs SET status = 'queued', error = ?, lease_token = NULL, available_at = ?, "
+                    "updated_at = ? WHERE id = ?", (str(error), now + delay, now, job['id']))
+                return True
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, lease_token = NULL, updated_at = ? WHERE id = ?",
+                (str(error), now, job['id']))
+            return False
+
+    def extend_lease(self, job, lease_seconds=None):
+        """오래 걸리는 작업의 lease 연장 - return: 성공 여부"""
+        now = time.time()
+        with self._transaction() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE id = ? AND lease_token = ?",
+                (now + (lease_seconds or self.lease_seconds), now, job['id'], job['lease_token']))
+            return cur.rowcount == 1
+
+    @contextmanager
+    def heartbeat(self, job, interval=None):
+        """
+        with 블록 동안 lease를 interval초(기본: lease_seconds의 1/3)마다 연장
+        연장은 별도 스레드에서 별도 연결로 실행 (SQLite 연결은 만든 스레드에서만 사용 가능)
+        """
+        interval = interval or self.lease_seconds / 3
+        stop = threading.Event()
+
+        def beat():
+            queue = JobQueue(self.path, self.max_depth, self.lease_seconds, self.max_attempts, self.retry_delay)
+            try:
+                while not stop.wait(interval):
+                    try:
+                        if not queue.extend_lease(job):
+                            break  # 이미 다른 워커에게 넘어감
+                    except sqlite3.Error:
+                        continue  # 잠금 대기 시간 초과 등 - 다음 주기에 다시 시도
+            finally:
+                queue.close()
+
+        thread = threading.Thread(target=beat, name=f"lease-{job['id']}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def get(self, job_id):
+        """작업 정보 조회 (payload/result는 dict로)"""
+        row = self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['payload'] = json.loads(job['payload'])
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def stats(self):
+        """상태별 작업 수"""
+        counts = {'queued': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        for row in self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"):
+            counts[row[0]] = row[1]
+        return counts
+
+
+def process_job(payload):
+    """작업 하나 처리: 이미지 파일 → OCR → 그리드 → 일정 (schedule_pipeline)"""
+    from schedule_pipeline import process_roster_image
+
+    with open(payload['image_path'], 'rb') as f:
+        image_bytes = f.read()
+    output = process_roster_image(
+        image_bytes,
+        engine=payload.get('engine', 'tesseract'),
+        staff_name=payload.get('staff_name'),
+        base_year=payload.get('base_year', 2025),
+        base_month=payload.get('base_month', 1),
+        image_name=os.path.basename(payload['image_path']))
+    output_path = payload.get('output_path')
+    if output_path:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(output['events'], f, ensure_ascii=False, indent=2)
+    return output
+
+
+def run_worker(db_path=DEFAULT_DB_PATH, worker_id=None, exit_when_empty=False, poll_interval=1.0,
+               max_jobs=None, **queue_options):
+    """
+    작업을 하나씩 가져와 처리하는 워커 루프
+    exit_when_empty: 처리할 작업이 없으면 종료 (False면 새 작업을 기다림)
+    max_jobs: 처리할 최대 작업 수 (재시도 예약된 실패는 세지 않음 - 같은 작업을 다시 가져오므로)
+    return: {'done': 처리 성공 수, 'failed': 최종 실패 수, 'retried': 재시도 예약 수}
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    queue = JobQueue(db_path, **queue_options)
+    counts = {'done': 0, 'failed': 0, 'retried': 0}
+    try:
+        while max_jobs is None or counts['done'] + counts['failed'] < max_jobs:
+            job = queue.lease(worker_id)
+            if job is None:
+                if exit_when_empty and queue.stats()['queued'] == 0:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            name = os.path.basename(job['payload'].get('image_path', ''))
+            start_time = time.time()
+            try:
+                with queue.heartbeat(job):
+                    output = process_job(job['payload'])
+            except Exception as e:
+                # 파일이 없거나 잘못된 입력(디코딩할 수 없는 이미지 등)이면 다시 시도해도 소용없음
+                retrying = queue.nack(job, e, retry=not isinstance(e, (FileNotFoundError, BadRequest)))
+                if retrying is None:
+                    print(f"   ⚠️  [{worker_id}] #{job['id']} {name}: lease 만료로 실패를 기록하지 못했습니다 ({e})")
+                    continue
+                counts['retried' if retrying else 'failed'] += 1
+                print(f"   ❌ [{worker_id}] #{job['id']} {name}: {e}{' (재시도 예약)' if retrying else ''}")
+                continue
+
+            if queue.ack(job, {'events': output['events'], 'timing': output['timing']}):
+                counts['done'] += 1
+                print(f"   ✅ [{worker_id}] #{job['id']} {name}: 일정 {len(output['events'])}개, "
+                      f"{time.time() - start_time:.2f}초")
+            else:
+                print(f"   ⚠️  [{worker_id}] #{job['id']} {name}: lease 만료로 결과를 저장하지 못했습니다")
+    finally:
+        queue.close()
+    return counts
+
+
+def _worker_process(args):
+    db_path, exit_when_empty = args
+    return run_worker(db_path, exit_when_empty=exit_when_empty)
+
+
+def main():
+    import argparse
+    import multiprocessing
+
+    parser = argparse.ArgumentParser(description="근무표 처리 작업 큐")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="큐 SQLite 파일")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_enqueue = sub.add_parser('enqueue', help="이미지 작업 추가")
+    p_enqueue.add_argument('images', nargs='+')
+    p_enqueue.add_argument('--engine', choices=['tesseract', 'easyocr'], default='tesseract')
+    p_enqueue.add_argument('--staff', default=None, help="특정 직원 일정만")
+    p_enqueue.add_argument('--year', type=int, default=2025)
+    p_enqueue.add_argument('--month', type=int, default=1)
+    p_enqueue.add_argument('--no-wait', action='store_true', help="큐가 가득 차면 기다리지 않고 실패")
+
+    p_worker = sub.add_parser('worker', help="워커 실행")
+    p_worker.add_argument('--processes', type=int, default=1)
+    p_worker.add_argument('--exit-when-empty', action='store_true')
+
+    sub.add_parser('status', help="상태별 작업 수")
+    args = parser.parse_args()
+
+    if args.command == 'enqueue':
+        queue = JobQueue(args.db)
+        for image in args.images:
+            try:
+                job_id = queue.enqueue({
+                    'image_path': os.path.abspath(image),
+                    'engine': args.engine,
+                    'staff_name': args.staff,
+                    'base_year': args.year,
+                    'base_month': args.month
+                }, block=not args.no_wait)
+            except QueueFullError as e:
+                print(f"❌ {image}: {e}")
+                continue
+            print(f"📥 #{job_id} {image}")
+        print(f"📊 {queue.stats()}")
+        queue.close()
+    elif args.command == 'worker':
+        print(f"🔧 워커 {args.processes}개 시작 ({args.db})")
+        if args.processes <= 1:
+            counts = [run_worker(args.db, exit_when_empty=args.exit_when_empty)]
+        else:
+            ctx = multiprocessing.get_context('spawn')
+            with ctx.Pool(args.processes) as pool:
+                counts = pool.map(_worker_process, [(args.db, args.exit_when_empty)] * args.processes)
+        print(f"✅ 완료 {sum(c['done'] for c in counts)}개, 실패 {sum(c['failed'] for c in counts)}개, "
+              f"재시도 {sum(c['retried'] for c in counts)}회")
+    else:
+        queue = JobQueue(args.db)
+        print(f"📊 {queue.stats()} (대기 {queue.depth()}개 / 최대 {queue.max_depth}개)")
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()
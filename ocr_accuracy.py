@@ -0,0 +1,73 @@
+"""
+OCR 텍스트 정확도 점수 (정답 데이터가 있는 근무표 이미지용)
+엔진마다 척도가 다른 신뢰도 대신, 기대하는 이름/시간대/특수코드/숫자가 텍스트에 얼마나 나오는지로 점수를 매깁니다.
+app.py의 테스트/캐스케이드 품질 판정과 engine_router의 정확도 학습(라벨 이미지)에서 함께 사용합니다.
+
+expected_data (라벨): {'staff_names': [직원명, ...], 'time_patterns': ['13-17', ...]}
+"""
+
+import re
+
+
+def score_accuracy(extracted_text, expected_data):
+    """
+    정확도 신호 계산 (출력 없음)
+    return: {'score': 0-100, 이름/시간대/특수코드/숫자별 인식 수와 점수}
+    """
+    score = 0
+
+    # 스태프 이름 인식 (40점)
+    recognized_names = 0
+    for name in expected_data['staff_names']:
+        if name in extracted_text:
+            recognized_names += 1
+        elif any(char in extracted_text for char in name):  # 부분 일치
+            recognized_names += 0.5
+
+    name_score = (recognized_names / len(expected_data['staff_names'])) * 40
+    score += name_score
+
+    # 시간대 인식 (30점)
+    time_patterns_found = 0
+    for pattern in expected_data['time_patterns']:
+        if pattern in extracted_text or pattern.replace('-', '') in extracted_text:
+            time_patterns_found += 1
+
+    time_score = (time_patterns_found / len(expected_data['time_patterns'])) * 30
+    score += time_score
+
+    # 특수 코드 인식 (20점)
+    special_codes_found = 0
+    for code in ['CL', 'X']:
+        count = extracted_text.count(code)
+        if count >= 3:  # 충분히 많이 발견됨
+            special_codes_found += 1
+        elif count >= 1:  # 일부 발견됨
+            special_codes_found += 0.5
+
+    special_score = (special_codes_found / 2) * 20
+    score += special_score
+
+    # 숫자 인식 (10점)
+    numbers = re.findall(r'\d+', extracted_text)
+    if len(numbers) >= 15:
+        number_score = 10
+    elif len(numbers) >= 10:
+        number_score = 7
+    elif len(numbers) >= 5:
+        number_score = 4
+    else:
+        number_score = 1
+    score += number_score
+
+    return {
+        'score': min(score, 100),
+        'recognized_names': recognized_names,
+        'name_score': name_score,
+        'time_patterns_found': time_patterns_found,
+        'time_score': time_score,
+        'special_codes_found': special_codes_found,
+        'special_score': special_score,
+        'numbers': numbers,
+        'number_score': number_score
+    }
@@ -0,0 +1,274 @@
+"""
+OCR 결과 캐시 (이미지 내용 기반)
+키: 이미지 바이트 해시 + 엔진 + 엔진 버전 + 설정 문자열
+저장: 정규화된 결과 (text / confidence / bbox 목록 등 JSON으로 표현 가능한 dict)
+구조: 메모리 LRU (앞단) + 디스크 LRU (용량 제한, 오래 안 쓴 항목부터 삭제)
+메모리에도 직렬화한 JSON을 보관하고 조회할 때마다 새로 풀어서 돌려주므로,
+호출한 쪽이 결과를 수정해도 캐시나 다른 호출자의 결과에는 영향이 없습니다.
+디스크에 쓰지 못하면(용량 부족, 읽기 전용 등) 경고만 출력하고 메모리 캐시는 유지합니다.
+
+파서만 수정하면서 같은 이미지를 반복 처리할 때 OCR을 다시 돌리지 않도록 합니다.
+환경변수 OCR_CACHE_DIR로 위치를, OCR_CACHE=0으로 캐시 사용 여부를 바꿀 수 있습니다.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = '.ocr_cache'
+DEFAULT_MAX_DISK_BYTES = 512 * 1024 * 1024  # 512MB
+DEFAULT_MAX_MEMORY_ITEMS = 256
+
+
+class OCRResultCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_disk_bytes=DEFAULT_MAX_DISK_BYTES,
+                 max_memory_items=DEFAULT_MAX_MEMORY_ITEMS, enabled=True):
+        """
+        cache_dir: 디스크 캐시 디렉터리
+        max_disk_bytes: 디스크 캐시 최대 용량 (초과 시 가장 오래 사용하지 않은 항목부터 삭제)
+        max_memory_items: 메모리 캐시 최대 항목 수
+        enabled: False면 항상 miss 처리하고 저장하지 않음
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_items = max_memory_items
+        self.enabled = enabled
+
+        self._memory = OrderedDict()
+        self._disk_index = None  # key -> (파일 크기, 마지막 사용 시각), 첫 사용 시 로드
+        self._disk_bytes = 0
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+        # 서비스/앙상블 스레드가 같은 캐시를 함께 쓰므로 인덱스/메모리 LRU/통계는 잠금 안에서만 변경
+        # (디스크 읽기/쓰기는 잠금 밖)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(image_bytes, engine, engine_version, config=''):
+        """캐시 키 생성"""
+        h = hashlib.sha256()
+        h.update(image_bytes)
+        h.update(b'\0')
+        h.update(f"{engine}\0{engine_version}\0{config}".encode('utf-8'))
+        return h.hexdigest()
+
+    def _path(self, key):
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _load_disk_index(self):
+        """디스크 캐시 항목 목록 로드 (처음 한 번만, 잠금 안에서 호출)"""
+        if self._disk_index is not None:
+            return
+        self._disk_index = {}
+        self._disk_bytes = 0
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob('*/*.json'):
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                self._disk_index[path.stem] = (st.st_size, st.st_mtime)
+                self._disk_bytes += st.st_size
+
+    def _remember(self, key, data):
+        """직렬화한 결과를 메모리 캐시에 저장 (LRU, 잠금 안에서 호출)"""
+        self._memory[key] = data
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """캐시 조회 - 없으면 None"""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+            else:
+                self._load_disk_index()
+                on_disk = key in self._disk_index
+        if data is not None:
+            return json.loads(data)
+
+        if on_disk:
+            # 파일 읽기는 잠금 밖에서 (다른 스레드가 그 사이 삭제하면 읽기 실패로 처리)
+            path = self._path(key)
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+                payload = json.loads(data)
+            except (OSError, ValueError):
+                self._discard([key])
+            else:
+                # 사용 시각 갱신 (LRU 순서 = mtime 순서)
+                now = time.time()
+                try:
+                    os.utime(path, (now, now))
+                except OSError:
+                    pass
+                with self._lock:
+                    if key in self._disk_index:
+                        self._disk_index[key] = (self._disk_index[key][0], now)
+                    self._remember(key, data)
+                    self.stats['disk_hits'] += 1
+                return payload
+
+        with self._lock:
+            self.stats['misses'] += 1
+        return None
+
+    def put(self, key, payload):
+        """
+        캐시 저장 (메모리 + 디스크)
+        디스크 쓰기 실패는 OCR 결과를 버릴 이유가 아니므로 경고만 출력 (메모리 캐시는 유지)
+        """
+        if not self.enabled:
+            return
+        data = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        with self._lock:
+            self._remember(key, data)
+            self._load_disk_index()
+
+        path = self._path(key)
+        # 같은 키를 여러 프로세스/스레드가 동시에 써도 임시 파일이 겹치지 않도록
+        tmp_path = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)  # 여러 프로세스가 동시에 써도 깨진 파일이 보이지 않도록
+        except OSError as e:
+            print(f"⚠️  OCR 캐시를 디스크에 저장하지 못했습니다 ({self.cache_dir}): {e}")
+            self._unlink_path(tmp_path)
+            return
+        # 크기는 stat 대신 기록한 바이트로 (다른 스레드의 정리로 그 사이 삭제될 수 있음)
+        size = len(data)
+
+        with self._lock:
+            if key in self._disk_index:
+                self._disk_bytes -= self._disk_index[key][0]
+            self._disk_index[key] = (size, time.time())
+            self._disk_bytes += size
+            evicted = self._evict()
+        self._unlink(evicted)
+
+    def _forget_disk(self, key):
+        """디스크 인덱스에서 제거 (잠금 안에서 호출, 파일 삭제는 _unlink로)"""
+        size, _ = self._disk_index.pop(key, (0, 0))
+        self._disk_bytes -= size
+
+    @staticmethod
+    def _unlink_path(path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+    def _unlink(self, keys):
+        for key in keys:
+            self._unlink_path(self._path(key))
+
+    def _discard(self, keys):
+        """인덱스에서 제거 후 파일 삭제"""
+        with self._lock:
+            for key in keys:
+                self._forget_disk(key)
+        self._unlink(keys)
+
+    def _evict(self):
+        """
+        디스크 용량 초과 시 오래 사용하지 않은 항목부터 인덱스에서 제거 (잠금 안에서 호출)
+        return: 제거한 키 목록 (파일은 호출한 쪽에서 잠금 밖에서 삭제)
+        """
+        evicted = []
+        if self._disk_bytes <= self.max_disk_bytes:
+            return evicted
+        for key, _ in sorted(self._disk_index.items(), key=lambda kv: kv[1][1]):
+            if self._disk_bytes <= self.max_disk_bytes:
+                break
+            self._forget_disk(key)
+            self._memory.pop(key, None)
+            self.stats['evictions'] += 1
+            evicted.append(key)
+        return evicted
+
+    def clear(self):
+        """메모리/디스크 캐시 모두 삭제"""
+        with self._lock:
+            self._memory.clear()
+            self._load_disk_index()
+            keys = list(self._disk_index)
+            for key in keys:
+                self._forget_disk(key)
+        self._unlink(keys)
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    """프로세스 기본 캐시 (환경변수 설정 반영)"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = OCRResultCache(
+                cache_dir=os.environ.get('OCR_CACHE_DIR', DEFAULT_CACHE_DIR),
+                enabled=os.environ.get('OCR_CACHE', '1') != '0'
+            )
+        return _default_cache
+
+
+def cached_ocr(image_bytes, engine, engine_version, config, run_ocr, cache=None):
+    """
+    캐시를 먼저 확인하고, 없으면 run_ocr()을 실행해 결과를 저장
+    image_bytes: 원본 이미지 파일 바이트
+    run_ocr: 인자 없이 호출되어 정규화된 결과 dict를 반환하는 함수 (None이면 저장하지 않음)
+    return: (결과 dict, 캐시 적중 여부) - 결과 dict는 호출한 쪽 소유 (수정해도 캐시에 영향 없음)
+    """
+    cache = cache or get_default_cache()
+    key = cache.make_key(image_bytes, engine, engine_version, config)
+    payload = cache.get(key)
+    if payload is not None:
+        return payload, True
+    payload = run_ocr()
+    if payload is not None:
+        cache.put(key, payload)
+    return payload, False
+
+
+_ENGINE_VERSIONS = {}
+
+
+def engine_version(engine):
+    """
+    엔진 버전 문자열 (캐시 키용, 성공한 조회만 기억)
+    엔진이 아직 설치/설정되지 않아 조회에 실패하면 'unknown'을 돌려주되 기억하지 않음
+    (나중에 설치되면 다음 호출에서 실제 버전을 조회)
+    """
+    if engine in _ENGINE_VERSIONS:
+        return _ENGINE_VERSIONS[engine]
+
+    version = 'unknown'
+    try:
+        if engine == 'tesseract':
+            import pytesseract
+            version = f"{pytesseract.get_tesseract_version()}/{getattr(pytesseract, '__version__', '')}"
+        elif engine == 'easyocr':
+            import easyocr
+            version = getattr(easyocr, '__version__', 'unknown')
+        elif engine == 'paddleocr':
+            import paddleocr
+            version = getattr(paddleocr, '__version__', None) or getattr(paddleocr, 'VERSION', 'unknown')
+    except Exception:
+        return version
+
+    _ENGINE_VERSIONS[engine] = str(version)
+    return _ENGINE_VERSIONS[engine]
+
@@ -0,0 +1,157 @@
+"""
+OCR 엔진 레지스트리
+프로세스 당 한 번만 모델을 로드하고, 모든 호출부가 같은 (워밍된) 인스턴스를 공유합니다.
+"""
+
+import contextlib
+import os
+import threading
+import time
+
+# (엔진, 언어, 장치, 모델 파라미터) -> 로드된 인스턴스
+_ENGINE_CACHE = {}
+# 같은 키 -> 로드 시간/메모리 정보
+_ENGINE_STATS = {}
+# 여러 스레드가 동시에 같은 모델을 로드하지 않도록 (조회는 잠금 없이)
+_REGISTRY_LOCK = threading.Lock()
+# 한 프로세스 안에서 같은 EasyOCR 모델을 여러 스레드가 동시에 쓰지 않도록 (tesseract는 호출마다 별도 프로세스)
+ENGINE_LOCKS = {'easyocr': threading.Lock()}
+
+
+def engine_lock(engine):
+    """엔진 사용 잠금 (동시에 써도 되는 엔진은 아무 것도 하지 않는 컨텍스트)"""
+    return ENGINE_LOCKS.get(engine) or contextlib.nullcontext()
+
+
+def _current_rss_mb():
+    """현재 프로세스의 상주 메모리(RSS)를 MB 단위로 반환 (측정 불가 시 None)"""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        return None
+
+
+def _make_key(engine, lang_list, device, model_params):
+    """레지스트리 키 생성 (언어 순서는 그대로 유지 - EasyOCR은 순서에 따라 모델이 달라질 수 있음)"""
+    return (engine, tuple(lang_list), device, tuple(sorted(model_params.items())))
+
+
+def _resolve_device(gpu):
+    """
+    gpu 인자를 EasyOCR이 실제로 쓸 장치로 변환 (easyocr.Reader와 같은 규칙)
+    GPU가 없는 환경의 gpu=True와 gpu=False가 같은 키가 되어 모델을 두 번 로드하지 않도록
+    """
+    if gpu is False or gpu is None:
+        return 'cpu'
+    if gpu is not True:
+        return str(gpu)  # 'cuda:0' 등 장치 이름
+    import torch
+    if torch.cuda.is_available():
+        return 'cuda'
+    mps = getattr(torch.backends, 'mps', None)
+    if mps is not None and mps.is_available():
+        return 'mps'
+    return 'cpu'
+
+
+def get_easyocr_reader(lang_list=('ko', 'en'), gpu=False, **model_params):
+    """
+    EasyOCR Reader를 프로세스 전역 캐시에서 가져오기
+    lang_list: 인식 언어 목록
+    gpu: GPU 사용 여부 (True/False 또는 'cuda:0' 같은 장치 이름 - 실제 장치로 바꿔 키에 사용)
+    model_params: easyocr.Reader에 그대로 전달되는 추가 파라미터 (model_storage_directory 등)
+    return: easyocr.Reader (같은 키로는 항상 같은 인스턴스)
+    """
+    device = _resolve_device(gpu)
+    key = _make_key('easyocr', lang_list, device, model_params)
+    reader = _ENGINE_CACHE.get(key)
+    if reader is not None:
+        _ENGINE_STATS[key]['hits'] += 1
+        return reader
+
+    with _REGISTRY_LOCK:
+        # 잠금을 기다리는 동안 다른 스레드가 로드했으면 그대로 사용
+        reader = _ENGINE_CACHE.get(key)
+        if reader is not None:
+            _ENGINE_STATS[key]['hits'] += 1
+            return reader
+        return _load_easyocr_reader(key, lang_list, device, model_params)
+
+
+def _load_easyocr_reader(key, lang_list, device, model_params):
+    import easyocr
+
+    rss_before = _current_rss_mb()
+    start_time = time.time()
+    reader = easyocr.Reader(list(lang_list), gpu=False if device == 'cpu' else device, **model_params)
+    load_time = time.time() - start_time
+    rss_after = _current_rss_mb()
+
+    _ENGINE_CACHE[key] = reader
+    _ENGINE_STATS[key] = {
+        'engine': 'easyocr',
+        'lang_list': list(lang_list),
+        'gpu': device != 'cpu',
+        'device': device,
+        'model_params': dict(model_params),
+        'load_time': load_time,
+        'rss_before_mb': rss_before,
+        'rss_after_mb': rss_after,
+        'rss_delta_mb': (rss_after - rss_before) if rss_before is not None and rss_after is not None else None,
+        'hits': 0
+    }
+    print(f"✅ EasyOCR 모델 로드 완료 ({', '.join(lang_list)}, {device}): {load_time:.2f}초")
+    return reader
+
+
+def reader_model_params(reader):
+    """
+    레지스트리에서 로드한 reader의 model_params (캐시 키 등에 사용)
+    return: dict (레지스트리에서 로드하지 않은 reader면 None)
+    """
+    for key, cached in list(_ENGINE_CACHE.items()):
+        if cached is reader:
+            return dict(_ENGINE_STATS[key]['model_params'])
+    return None
+
+
+def get_engine_stats():
+    """로드된 엔진별 로드 시간/메모리/재사용 횟수 목록 반환"""
+    stats = []
+    for info in _ENGINE_STATS.values():
+        entry = dict(info)
+        entry['current_rss_mb'] = _current_rss_mb()
+        stats.append(entry)
+    return stats
+
+
+def print_engine_stats():
+    """로드된 엔진 정보 출력"""
+    stats = get_engine_stats()
+    if not stats:
+        print("ℹ️  로드된 OCR 엔진이 없습니다.")
+        return
+
+    print("\n🧠 로드된 OCR 엔진:")
+    for info in stats:
+        delta = f"{info['rss_delta_mb']:.0f}MB" if info['rss_delta_mb'] is not None else "측정 불가"
+        print(f"   - {info['engine']} {info['lang_list']} {info['device']}: "
+              f"로드 {info['load_time']:.2f}초, 메모리 +{delta}, 재사용 {info['hits']}회")
+    current = stats[0]['current_rss_mb']
+    if current is not None:
+        print(f"   현재 프로세스 메모리: {current:.0f}MB")
+
+
+def clear_engine_cache():
+    """캐시된 엔진 모두 해제 (테스트/메모리 회수용)"""
+    with _REGISTRY_LOCK:
+        _ENGINE_CACHE.clear()
+        _ENGINE_STATS.clear()
@@ -0,0 +1,205 @@
+"""
+엔진 공통 OCR 결과 형식 (배열 기반)
+박스/신뢰도/텍스트를 항목별 dict 대신 배열로 보관해 파서가 좌표 계산을 한 번에 처리할 수 있게 합니다.
+
+    boxes       (N, 4) float32 [left, top, right, bottom]
+    confidences (N,)   float64 0-1
+    texts       [str] * N
+    quads       (N, 4, 2) float32 4점 좌표 (EasyOCR/PaddleOCR처럼 기울어진 박스가 있는 경우만, 없으면 None)
+
+엔진별 변환:
+    OCRResult.from_tesseract_data(pytesseract.image_to_data(..., output_type=DICT))
+    OCRResult.from_easyocr(reader.readtext(...))
+    OCRResult.from_paddleocr(ocr.ocr(...))
+    OCRResult.from_extracted_texts(result['extracted_texts'])   # 저장된 *_results.json
+"""
+
+from collections import defaultdict
+
+import numpy as np
+
+
+class OCRResult:
+    __slots__ = ('boxes', 'confidences', 'texts', 'quads')
+
+    def __init__(self, boxes, confidences, texts, quads=None):
+        self.boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        self.confidences = np.asarray(confidences, dtype=np.float64).reshape(-1)
+        self.texts = list(texts)
+        self.quads = None if quads is None else np.asarray(quads, dtype=np.float32).reshape(-1, 4, 2)
+        if not (len(self.boxes) == len(self.confidences) == len(self.texts)):
+            raise ValueError("boxes, confidences, texts의 길이가 같아야 합니다")
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __repr__(self):
+        return f"OCRResult({len(self)}개)"
+
+    @classmethod
+    def empty(cls):
+        return cls(np.zeros((0, 4)), np.zeros(0), [])
+
+    @classmethod
+    def _from_quads(cls, quads, confidences, texts):
+        quads = np.asarray(quads, dtype=np.float32).reshape(-1, 4, 2)
+        boxes = np.concatenate([quads.min(axis=1), quads.max(axis=1)], axis=1)
+        return cls(boxes, confidences, texts, quads)
+
+    @classmethod
+    def from_tesseract_data(cls, data, min_conf=0):
+        """
+        pytesseract.image_to_data(output_type=DICT) 결과에서 변환
+        빈 텍스트와 신뢰도 min_conf 이하 항목은 제외 (conf 0-100 → 0-1)
+        """
+        conf = np.asarray(data['conf'], dtype=np.float32)
+        texts = [t.strip() for t in data['text']]
+        keep = (conf > min_conf) & np.array([bool(t) for t in texts], dtype=bool)
+        left = np.asarray(data['left'], dtype=np.float32)[keep]
+        top = np.asarray(data['top'], dtype=np.float32)[keep]
+        boxes = np.stack([left, top,
+                          left + np.asarray(data['width'], dtype=np.float32)[keep],
+                          top + np.asarray(data['height'], dtype=np.float32)[keep]], axis=1)
+        return cls(boxes, conf[keep] / 100.0, [t for t, k in zip(texts, keep) if k])
+
+    @classmethod
+    def from_easyocr(cls, results):
+        """reader.readtext(detail=1) 결과 [(4점 bbox, text, conf), ...]에서 변환"""
+        if not results:
+            return cls.empty()
+        quads = [bbox for bbox, _, _ in results]
+        return cls._from_quads(quads, [conf for _, _, conf in results], [text for _, text, _ in results])
+
+    @classmethod
+    def from_paddleocr(cls, ocr_result):
+        """PaddleOCR ocr() 결과 [[ [4점 bbox, (text, conf)], ... ]]에서 변환 (유효한 줄만)"""
+        lines = []
+        if ocr_result and ocr_result[0]:
+            for line in ocr_result[0]:
+                if (len(line) >= 2 and isinstance(line[1], (tuple, list)) and len(line[1]) >= 2 and
+                        line[1][0] and line[1][1] is not None):
+                    lines.append(line)
+        if not lines:
+            return cls.empty()
+        return cls._from_quads([line[0] for line in lines], [line[1][1] for line in lines],
+                               [line[1][0] for line in lines])
+
+    @classmethod
+    def from_extracted_texts(cls, items):
+        """[{'text', 'confidence', 'bbox'}] 목록에서 변환 - bbox는 4점 또는 [l, t, r, b]"""
+        if not items:
+            return cls.empty()
+        texts = [item['text'] for item in items]
+        confidences = [item['confidence'] for item in items]
+        first = items[0]['bbox']
+        if first and isinstance(first[0], (list, tuple)):
+            return cls._from_quads([item['bbox'] for item in items], confidences, texts)
+        return cls([item['bbox'] for item in items], confidences, texts)
+
+    @classmethod
+    def coerce(cls, ocr_results):
+        """OCRResult면 그대로, dict 목록이면 변환"""
+        if isinstance(ocr_results, cls):
+            return ocr_results
+        return cls.from_extracted_texts(list(ocr_results))
+
+    def to_extracted_texts(self, quad=True):
+        """
+        기존 형식의 dict 목록으로 변환 (JSON 저장용)
+        quad: True면 4점 bbox, False면 [l, t, r, b]
+        """
+        items = []
+        for i, text in enumerate(self.texts):
+            if quad:
+                if self.quads is not None:
+                    bbox = self.quads[i].tolist()
+                else:
+                    l, t, r, b = self.boxes[i].tolist()
+                    bbox = [[l, t], [r, t], [r, b], [l, b]]
+            else:
+                bbox = self.boxes[i].tolist()
+            items.append({'text': text, 'confidence': float(self.confidences[i]), 'bbox': bbox})
+        return items
+
+    def centers(self):
+        """박스 중심 (N, 2) - 4점 좌표가 있으면 네 점의 평균"""
+        if self.quads is not None:
+            return self.quads.astype(np.float64).mean(axis=1)
+        boxes = self.boxes.astype(np.float64)
+        return np.stack([(boxes[:, 0] + boxes[:, 2]) / 2, (boxes[:, 1] + boxes[:, 3]) / 2], axis=1)
+
+    def select(self, mask):
+        """불리언 마스크 또는 인덱스 배열로 일부만 선택"""
+        index = np.flatnonzero(mask) if np.asarray(mask).dtype == bool else np.asarray(mask, dtype=np.int64)
+        return OCRResult(self.boxes[index], self.confidences[index], [self.texts[i] for i in index],
+                         None if self.quads is None else self.quads[index])
+
+
+def _greedy_clusters(values, eps):
+    """
+    정렬한 값들을 앞에서부터 묶기: 각 값은 첫 값과의 차이가 eps 미만인 가장 앞선 클러스터에 들어감
+    (기존 파서의 이중 for 루프와 같은 결과를 searchsorted로 계산)
+    return: (클러스터 중심 배열, 각 값의 클러스터 번호)
+    """
+    sorted_values = np.sort(values)
+    firsts = []
+    i = 0
+    while i < len(sorted_values):
+        firsts.append(sorted_values[i])
+        i = int(np.searchsorted(sorted_values, sorted_values[i] + eps, side='left'))
+    firsts = np.array(firsts)
+    labels = np.searchsorted(firsts, values - eps, side='right')
+    counts = np.bincount(labels, minlength=len(firsts))
+    centers = np.bincount(labels, weights=values, minlength=len(firsts)) / np.maximum(counts, 1)
+    return centers, labels
+
+
+def assign_cells(ocr_results, row_eps=30, col_eps=30):
+    """
+    bbox 중심 좌표로 행/열 클러스터링하여 항목별 (행, 열) 번호 계산
+    return: (rows, cols) - 길이 N의 정수 배열
+    """
+    result = OCRResult.coerce(ocr_results)
+    rows = np.zeros(len(result), dtype=np.int64)
+    cols = np.zeros(len(result), dtype=np.int64)
+    if len(result) == 0:
+        return rows, cols
+
+    centers = result.centers()
+    cx, cy = centers[:, 0], centers[:, 1]
+
+    # 행 클러스터링 후 가장 가까운 행 중심에 할당 (같으면 앞 행)
+    row_centers, _ = _greedy_clusters(cy, row_eps)
+    rows = np.abs(cy[:, None] - row_centers[None, :]).argmin(axis=1)
+
+    # 행별 열 클러스터링
+    for row in range(len(row_centers)):
+        members = np.flatnonzero(rows == row)
+        if len(members) == 0:
+            continue
+        col_centers, _ = _greedy_clusters(cx[members], col_eps)
+        cols[members] = np.abs(cx[members][:, None] - col_centers[None, :]).argmin(axis=1)
+    return rows, cols
+
+
+def cluster_grid(ocr_results, row_eps=30, col_eps=30):
+    """
+    bbox 중심 좌표로 행/열 클러스터링하여 2차원 그리드로 변환 (파서들의 cluster_texts_to_grid 공용 구현)
+    ocr_results: OCRResult 또는 [{'text', 'confidence', 'bbox'}] (4점 / [l, t, r, b] 모두 가능)
+    return: grid[row][col] = cell_text
+    """
+    result = OCRResult.coerce(ocr_results)
+    grid_text = defaultdict(dict)
+    if len(result) == 0:
+        return grid_text
+
+    rows, cols = assign_cells(result, row_eps, col_eps)
+
+    # 각 셀 텍스트 합치기 (행 순서, 행 안에서는 입력 순서)
+    cells = defaultdict(lambda: defaultdict(list))
+    for i in np.lexsort((np.arange(len(result)), rows)):
+        cells[int(rows[i])][int(cols[i])].append(result.texts[i])
+    for row, row_cells in cells.items():
+        for col, texts in row_cells.items():
+            grid_text[row][col] = ' '.join(texts).strip()
+    return grid_text
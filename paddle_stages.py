@@ -0,0 +1,236 @@
+"""
+PaddleOCR 검출/인식 단계 분리 실행
+검출 결과(글자 영역 박스)를 이미지 + 검출 파라미터별로 캐시해 두고, 인식은 그 박스에 대해서만 따로 실행합니다.
+    - 인식 모델/파라미터만 바꿔 볼 때: 검출을 다시 하지 않음
+    - 검출 파라미터만 바꿔 볼 때: 이전 인식 결과 중 박스가 (거의) 그대로인 영역은 다시 인식하지 않음
+
+캐시는 ocr_cache.OCRResultCache를 그대로 사용합니다.
+    검출: 엔진 'paddleocr-det', 설정 = 검출 파라미터      → {'boxes': [4점 bbox, ...]}
+    인식: 엔진 'paddleocr-rec', 설정 = 인식 파라미터      → {'regions': [{'bbox', 'text', 'confidence'}, ...]}
+"""
+
+import json
+
+import numpy as np
+
+from ocr_cache import engine_version, get_default_cache
+
+# 검출 전용 파라미터 - 인식 캐시 키에서 제외
+DET_PARAM_PREFIXES = ('det',)
+# 인식/방향 분류 전용 파라미터 - 검출 캐시 키에서 제외
+# 나머지(lang, ocr_version, use_gpu 등 모델을 고르는 공통 파라미터)는 두 키 모두에 포함
+REC_PARAM_PREFIXES = ('rec', 'cls', 'use_angle_cls', 'label_list', 'drop_score', 'use_space_char',
+                      'max_text_length')
+# 이전 인식 결과를 재사용할 박스 IoU 기준
+DEFAULT_REUSE_IOU = 0.9
+# PaddleOCR 기본 인식 점수 하한 (TextSystem.drop_score)
+DEFAULT_DROP_SCORE = 0.5
+
+
+def split_params(ocr_params):
+    """PaddleOCR 파라미터를 (검출 캐시 키용, 인식 캐시 키용)으로 분리 - 공통 파라미터는 양쪽에 모두 들어감"""
+    det = {k: v for k, v in ocr_params.items() if not k.startswith(REC_PARAM_PREFIXES)}
+    rec = {k: v for k, v in ocr_params.items() if not k.startswith(DET_PARAM_PREFIXES)}
+    return det, rec
+
+
+def sorted_quads(quads):
+    """PaddleOCR과 같은 순서로 정렬 (위→아래, 같은 줄(10px 이내)은 왼쪽→오른쪽)"""
+    quads = sorted(quads, key=lambda q: (q[0][1], q[0][0]))
+    for i in range(len(quads) - 1):
+        for j in range(i, -1, -1):
+            if abs(quads[j + 1][0][1] - quads[j][0][1]) < 10 and quads[j + 1][0][0] < quads[j][0][0]:
+                quads[j], quads[j + 1] = quads[j + 1], quads[j]
+            else:
+                break
+    return quads
+
+
+def rotate_crop(image, quad):
+    """4점 영역을 펴서 잘라냄 (세로로 긴 영역은 90도 회전) - PaddleOCR get_rotate_crop_image와 같은 방식"""
+    import cv2
+
+    points = np.asarray(quad, dtype=np.float32)
+    width = int(max(np.linalg.norm(points[0] - points[1]), np.linalg.norm(points[2] - points[3])))
+    height = int(max(np.linalg.norm(points[0] - points[3]), np.linalg.norm(points[1] - points[2])))
+    width, height = max(width, 1), max(height, 1)
+    target = np.float32([[0, 0], [width, 0], [width, height], [0, height]])
+    crop = cv2.warpPerspective(image, cv2.getPerspectiveTransform(points, target), (width, height),
+                               borderMode=cv2.BORDER_REPLICATE, flags=cv2.INTER_CUBIC)
+    if crop.shape[0] / crop.shape[1] >= 1.5:
+        crop = np.rot90(crop)
+    return crop
+
+
+def rec_lines(result, count):
+    """
+    ocr(crops, det=False) 결과를 crop 순서대로 [(text, confidence)]로 정리
+    PaddleOCR 2.7+: crop마다 리스트 [[(text, conf)], [(text, conf)], ...] (인식 못한 crop은 빈 리스트/None)
+    이전 버전: [(text, conf), ...] 또는 한 번 더 감싼 [[(text, conf), ...]]
+    count: 넘긴 crop 수 - 결과 수가 다르면 ValueError (zip으로 잘려 빈 결과가 되지 않도록)
+    """
+    result = list(result or [])
+    if count != 1 and len(result) == 1 and isinstance(result[0], list):
+        result = result[0]
+    lines = []
+    for item in result:
+        if isinstance(item, list) and (not item or isinstance(item[0], (list, tuple))):
+            item = item[0] if item else None  # crop별 리스트
+        lines.append((item[0], float(item[1])) if item else ('', 0.0))
+    if len(lines) != count:
+        raise ValueError(f"인식 결과 수({len(lines)})가 영역 수({count})와 다릅니다")
+    return lines
+
+
+def _quads_to_ltrb(quads):
+    quads = np.asarray(quads, dtype=np.float64).reshape(-1, 4, 2)
+    return np.concatenate([quads.min(axis=1), quads.max(axis=1)], axis=1)
+
+
+def match_regions(new_quads, old_quads, min_iou=DEFAULT_REUSE_IOU):
+    """
+    새 박스마다 IoU가 min_iou 이상인 이전 박스 번호 (없으면 -1) - 전체 쌍을 한 번에 계산
+    """
+    if len(new_quads) == 0 or len(old_quads) == 0:
+        return np.full(len(new_quads), -1, dtype=np.int64)
+    a = _quads_to_ltrb(new_quads)[:, None, :]
+    b = _quads_to_ltrb(old_quads)[None, :, :]
+    iw = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    ih = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = iw * ih
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    iou = inter / np.maximum(area_a + area_b - inter, 1e-6)
+    best = iou.argmax(axis=1)
+    return np.where(iou[np.arange(len(best)), best] >= min_iou, best, -1)
+
+
+class PaddleStageRunner:
+    def __init__(self, ocr=None, ocr_params=None, cache=None, reuse_iou=DEFAULT_REUSE_IOU):
+        """
+        ocr: PaddleOCR 인스턴스 (None이면 ocr_params로 처음 사용할 때 생성)
+        ocr_params: PaddleOCR 초기화 파라미터 (캐시 키에 사용 - ocr 인스턴스와 같은 값이어야 함)
+        cache: OCRResultCache (None이면 기본 캐시)
+        reuse_iou: 재검출 후 이전 인식 결과를 재사용할 박스 IoU 기준
+        """
+        self._ocr = ocr
+        self.ocr_params = dict(ocr_params or {})
+        self.det_params, self.rec_params = split_params(self.ocr_params)
+        self.cache = cache or get_default_cache()
+        self.reuse_iou = reuse_iou
+        self.drop_score = self.ocr_params.get('drop_score', DEFAULT_DROP_SCORE)
+        self.stats = {'det_runs': 0, 'det_hits': 0, 'regions_recognized': 0, 'regions_reused': 0}
+
+    @property
+    def ocr(self):
+        if self._ocr is None:
+            import paddleocr
+            self._ocr = paddleocr.PaddleOCR(**self.ocr_params)
+        return self._ocr
+
+    def _key(self, image_bytes, stage, params):
+        return self.cache.make_key(image_bytes, f'paddleocr-{stage}', engine_version('paddleocr'),
+                                   json.dumps(params, sort_keys=True))
+
+    @staticmethod
+    def _decode(image_bytes):
+        import cv2
+        image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError("이미지를 디코딩할 수 없습니다")
+        return image
+
+    def detect(self, image_bytes, frame=None):
+        """
+        글자 영역 검출 (캐시 우선)
+        frame: 같은 이미지의 DecodedFrame (있으면 직접 디코딩하지 않음)
+        return: (4점 bbox 목록 - 인식 순서로 정렬됨, 캐시 적중 여부)
+        """
+        key = self._key(image_bytes, 'det', self.det_params)
+        payload = self.cache.get(key)
+        if payload is not None:
+            self.stats['det_hits'] += 1
+            return payload['boxes'], True
+
+        image = self._decode(image_bytes) if frame is None else frame.bgr
+        result = self.ocr.ocr(image, det=True, rec=False, cls=False)
+        boxes = result[0] if result and result[0] else []
+        quads = sorted_quads([[[float(x), float(y)] for x, y in box] for box in boxes])
+        self.cache.put(key, {'boxes': quads})
+        self.stats['det_runs'] += 1
+        return quads, False
+
+    def recognize(self, image_bytes, quads, frame=None):
+        """
+        주어진 박스들만 인식 (같은 인식 파라미터로 이미 인식한 영역은 재사용)
+        return: 박스 순서대로 [(text, confidence)]
+        """
+        key = self._key(image_bytes, 'rec', self.rec_params)
+        payload = self.cache.get(key) or {'regions': []}
+        regions = payload['regions']
+
+        matches = match_regions(quads, [r['bbox'] for r in regions], self.reuse_iou)
+        todo = np.flatnonzero(matches < 0)
+        recognized = {}
+        if len(todo):
+            image = self._decode(image_bytes) if frame is None else frame.bgr
+            crops = [rotate_crop(image, quads[i]) for i in todo]
+            result = self.ocr.ocr(crops, det=False, rec=True, cls=bool(self.ocr_params.get('use_angle_cls')))
+            for i, line in zip(todo, rec_lines(result, len(crops))):
+                recognized[int(i)] = line
+
+        outputs = []
+        for i, match in enumerate(matches):
+            if match >= 0:
+                region = regions[match]
+                outputs.append((region['text'], region['confidence']))
+            else:
+                outputs.append(recognized.get(i, ('', 0.0)))
+        self.stats['regions_reused'] += int(np.count_nonzero(matches >= 0))
+        self.stats['regions_recognized'] += len(todo)
+
+        if len(todo):
+            # 새로 인식한 영역을 추가 (복사본으로 저장 - 캐시 객체는 공유되므로 직접 수정하지 않음)
+            new_regions = list(regions) + [
+                {'bbox': quads[i], 'text': recognized[int(i)][0], 'confidence': recognized[int(i)][1]}
+                for i in todo if int(i) in recognized]
+            self.cache.put(key, {'regions': new_regions})
+        return outputs
+
+    def run(self, image_bytes, frame=None):
+        """
+        검출 → 인식 (각 단계 캐시 사용)
+        return: (PaddleOCR 형식 결과 [[ [bbox, (text, conf)], ... ]], 정보 dict)
+        """
+        quads, det_hit = self.detect(image_bytes, frame)
+        before = self.stats['regions_recognized']
+        # 모든 영역을 재사용하면 이미지 디코딩도 하지 않음
+        outputs = self.recognize(image_bytes, quads, frame) if quads else []
+        recognized = self.stats['regions_recognized'] - before
+        lines = [[quad, (text, confidence)] for quad, (text, confidence) in zip(quads, outputs)
+                 if text and confidence >= self.drop_score]
+        return [lines], {
+            'det_cache_hit': det_hit,
+            'boxes': len(quads),
+            'recognized': recognized,
+            'reused': len(quads) - recognized
+        }
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from paddleocr_test import HybridScheduleProcessor, paddle_result_to_texts
+
+    image_path = sys.argv[1] if len(sys.argv) > 1 else "image5.jpg"
+    with open(image_path, 'rb') as f:
+        image_bytes = f.read()
+
+    runner = PaddleStageRunner(ocr_params=HybridScheduleProcessor.OCR_PARAMS)
+    for label in ['첫 실행', '재실행']:
+        start_time = time.time()
+        result, info = runner.run(image_bytes)
+        print(f"🔍 {label}: {time.time() - start_time:.2f}초, 박스 {info['boxes']}개 "
+              f"(검출 캐시 {'적중' if info['det_cache_hit'] else '미적중'}, "
+              f"인식 {info['recognized']}개 / 재사용 {info['reused']}개)")
+    print(f"📝 텍스트 {len(paddle_result_to_texts(result))}개")
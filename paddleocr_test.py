@@ -3,16 +3,15 @@ PaddleOCR + 표 구조 분석 방식 Phase 2: 표 구조 분석 및 데이터 
 목표: OCR 결과를 2차원 그리드로 변환하여 구조화된 근무표 데이터 추출
 """
 
-import paddleocr
-import openai
 import json
+import os
 import time
-from PIL import Image
-import cv2
 import numpy as np
 from typing import List, Dict, Tuple, Optional
 import re
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from ocr_cache import cached_ocr, engine_version
 
 class TableStructureAnalyzer:
     def __init__(self):
@@ -323,28 +322,122 @@ class TableStructureAnalyzer:
                 for shift in schedule['shifts']:
                     print(f"     - {shift['date']}: {shift['work_type']} ({shift['start_time']}-{shift['end_time']})")
 
+def paddle_result_to_texts(ocr_result):
+    """
+    PaddleOCR 결과를 정규화된 목록으로 변환 (유효한 줄만)
+    return: [{'text': str, 'confidence': float, 'bbox': [[x1,y1],...]}]
+    """
+    texts = []
+    if ocr_result and ocr_result[0]:
+        for line in ocr_result[0]:
+            if (
+                len(line) >= 2 and 
+                isinstance(line[1], (tuple, list)) and 
+                len(line[1]) >= 2 and 
+                line[1][0] and line[1][1] is not None
+            ):
+                texts.append({
+                    'text': line[1][0],
+                    'confidence': float(line[1][1]),
+                    'bbox': [[float(x) for x in point] for point in line[0]]
+                })
+    return texts
+
+def texts_to_paddle_result(texts):
+    """
+    정규화된 목록을 PaddleOCR 결과 형식으로 되돌림
+    return: [[ [bbox, (text, confidence)], ... ]]
+    """
+    return [[[item['bbox'], (item['text'], item['confidence'])] for item in texts]]
+
 class HybridScheduleProcessor:
-    def __init__(self, openai_api_key):
+    # PaddleOCR 초기화 파라미터 (한국어 + 영어) - OCR 결과 캐시 키에도 사용
+    OCR_PARAMS = {
+        'use_angle_cls': True,
+        'lang': 'korean',
+        'det_db_thresh': 0.1,  # 감지 임계값을 낮춤 (기본값: 0.3)
+        'det_db_box_thresh': 0.3,  # 박스 감지 임계값도 낮춤 (기본값: 0.5)
+        'det_db_unclip_ratio': 1.6  # 텍스트 영역 확장 비율
+    }
+    # 이미지별 OCR 결과 저장소 최대 항목 수 (한 이미지를 여러 단계가 연달아 쓰는 용도라 몇 개면 충분)
+    OCR_STORE_SIZE = 4
+    
+    def __init__(self, openai_api_key, staged=False, cpu_threads=None):
         """
         하이브리드 프로세서 초기화
+        staged: True면 검출/인식을 나눠 단계별로 캐시 (paddle_stages.PaddleStageRunner)
+        cpu_threads: PaddleOCR 추론 스레드 수 (None이면 PaddleOCR 기본값, cpu_budget.plan_budget('paddleocr') 참고)
         """
+        # 엔진은 실제로 사용할 때 로드 (표 분석/캘린더 변환만 쓰는 경우 import가 즉시 끝나도록)
+        import openai
+        import paddleocr
+        
         # OpenAI API 설정
         openai.api_key = openai_api_key
         
         # PaddleOCR 초기화 (한국어 + 영어)
-        self.ocr = paddleocr.PaddleOCR(
-            use_angle_cls=True, 
-            lang='korean',
-            det_db_thresh=0.1,  # 감지 임계값을 낮춤 (기본값: 0.3)
-            det_db_box_thresh=0.3,  # 박스 감지 임계값도 낮춤 (기본값: 0.5)
-            det_db_unclip_ratio=1.6  # 텍스트 영역 확장 비율
-        )
+        # 스레드 수는 결과에 영향이 없으므로 캐시 키(OCR_PARAMS)에는 넣지 않음
+        thread_params = {}
+        if cpu_threads:
+            from cpu_budget import paddle_params
+            thread_params = paddle_params(cpu_threads)
+        self.ocr = paddleocr.PaddleOCR(**self.OCR_PARAMS, **thread_params)
         
         # 표 구조 분석기 초기화
         self.table_analyzer = TableStructureAnalyzer()
         
+        # 이미지별 OCR 결과 저장소: (절대경로, 수정시각, 파일크기) -> PaddleOCR 결과
+        # 기본 테스트/표 분석/캘린더 생성이 한 번의 추론 결과를 함께 사용
+        # 여러 이미지를 처리하는 장시간 실행에서 계속 쌓이지 않도록 최근 OCR_STORE_SIZE개만 유지 (LRU)
+        self.ocr_store = OrderedDict()
+        self.ocr_store_stats = {'hits': 0, 'misses': 0}
+        
+        # 검출 박스 캐시 + 영역별 인식 재사용
+        self.stages = None
+        if staged:
+            from paddle_stages import PaddleStageRunner
+            self.stages = PaddleStageRunner(self.ocr, self.OCR_PARAMS)
+        
         print("✅ PaddleOCR + 표 구조 분석 시스템 초기화 완료")
     
+    def run_ocr(self, image_path):
+        """
+        PaddleOCR 실행 (이미지별 저장소 → 디스크 캐시 → 실제 추론 순으로 확인)
+        return: (PaddleOCR 형식 결과, 재사용 여부)
+        """
+        stat = os.stat(image_path)
+        store_key = (os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size)
+        if store_key in self.ocr_store:
+            self.ocr_store.move_to_end(store_key)
+            self.ocr_store_stats['hits'] += 1
+            print(f"♻️  저장된 OCR 결과 재사용: {image_path}")
+            return self.ocr_store[store_key], True
+        self.ocr_store_stats['misses'] += 1
+        
+        with open(image_path, 'rb') as f:
+            image_bytes = f.read()
+        
+        if self.stages is not None:
+            result, info = self.stages.run(image_bytes)
+            self._store_result(store_key, result)
+            return result, info['det_cache_hit'] and info['recognized'] == 0
+        
+        payload, cache_hit = cached_ocr(
+            image_bytes, 'paddleocr', engine_version('paddleocr'),
+            json.dumps(self.OCR_PARAMS, sort_keys=True),
+            lambda: {'extracted_texts': paddle_result_to_texts(self.ocr.ocr(image_path))}
+        )
+        result = texts_to_paddle_result(payload['extracted_texts'])
+        self._store_result(store_key, result)
+        return result, cache_hit
+    
+    def _store_result(self, store_key, result):
+        """OCR 결과 저장소에 추가 (가장 오래 쓰지 않은 항목부터 제거)"""
+        self.ocr_store[store_key] = result
+        self.ocr_store.move_to_end(store_key)
+        while len(self.ocr_store) > self.OCR_STORE_SIZE:
+            self.ocr_store.popitem(last=False)
+    
     def test_paddleocr_basic(self, image_path):
         """
         Phase 1-1: PaddleOCR 기본 테스트
@@ -356,33 +449,21 @@ class HybridScheduleProcessor:
             start_time = time.time()
             
             # OCR 실행
-            result = self.ocr.ocr(image_path)
+            result, cache_hit = self.run_ocr(image_path)
             
             processing_time = time.time() - start_time
             
             # 텍스트 추출
-            extracted_texts = []
-            confidence_scores = []
-            
-            if result and result[0]:
-                for line in result[0]:
-                    if (
-                        len(line) >= 2 and 
-                        isinstance(line[1], (tuple, list)) and 
-                        len(line[1]) >= 2 and 
-                        line[1][0] and line[1][1] is not None
-                    ):
-                        text = line[1][0]
-                        confidence = line[1][1]
-                        extracted_texts.append(text)
-                        confidence_scores.append(confidence)
+            texts = paddle_result_to_texts(result)
+            extracted_texts = [item['text'] for item in texts]
+            confidence_scores = [item['confidence'] for item in texts]
             
             # 결과 분석
             total_text = " ".join(extracted_texts)
             avg_confidence = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0
             
             print(f"✅ OCR 처리 완료:")
-            print(f"   처리 시간: {processing_time:.2f}초")
+            print(f"   처리 시간: {processing_time:.2f}초{' (캐시)' if cache_hit else ''}")
             print(f"   추출된 텍스트 수: {len(extracted_texts)}개")
             print(f"   평균 신뢰도: {avg_confidence:.2f}")
             print(f"   총 텍스트 길이: {len(total_text)}자")
@@ -395,7 +476,8 @@ class HybridScheduleProcessor:
                 'extracted_text': total_text,
                 'confidence': avg_confidence,
                 'processing_time': processing_time,
-                'text_count': len(extracted_texts)
+                'text_count': len(extracted_texts),
+                'cache_hit': cache_hit
             }
             
         except Exception as e:
@@ -413,7 +495,7 @@ class HybridScheduleProcessor:
             start_time = time.time()
             
             # OCR 실행
-            ocr_result = self.ocr.ocr(image_path)
+            ocr_result, cache_hit = self.run_ocr(image_path)
             
             if not ocr_result or not ocr_result[0]:
                 return {'success': False, 'error': 'OCR 결과가 비어있습니다'}
@@ -427,14 +509,15 @@ class HybridScheduleProcessor:
                 return {'success': False, 'error': analysis_result['error']}
             
             print(f"\n✅ 표 구조 분석 완료:")
-            print(f"   처리 시간: {processing_time:.2f}초")
+            print(f"   처리 시간: {processing_time:.2f}초{' (OCR 결과 재사용)' if cache_hit else ''}")
             print(f"   분석된 직원 수: {len(analysis_result['employee_schedules'])}명")
             print(f"   추출된 근무 일정: {sum(len(schedule['shifts']) for schedule in analysis_result['employee_schedules'].values())}개")
             
             return {
                 'success': True,
                 'analysis_result': analysis_result,
-                'processing_time': processing_time
+                'processing_time': processing_time,
+                'cache_hit': cache_hit
             }
             
         except Exception as e:
@@ -0,0 +1,194 @@
+"""
+신뢰도 낮은 영역만 다시 인식 (전체 이미지 재실행 대신)
+OCR 결과(extracted_texts) 중 신뢰도가 기준 미만인 박스만 잘라서 확대한 뒤,
+같은 엔진 또는 다른 엔진으로 다시 인식해 더 나은 항목만 교체합니다.
+    같은 엔진: 신뢰도가 올라간 경우
+    다른 엔진: 엔진마다 신뢰도 척도가 달라 직접 비교할 수 없으므로, 재인식 엔진 기준 ACCEPT_CONFIDENCE 이상인 경우
+
+지원 재인식 엔진:
+    tesseract - 영역마다 한 줄 모드(--psm 7)로 인식
+    easyocr   - 잘라낸 영역들을 인식기에 배치로 넘겨 인식 (batched_easyocr.recognize_crops)
+    paddleocr - PaddleOCR 인식기만으로 배치 인식 (det=False)
+
+    refined = refine_result(result, image, engine='tesseract')
+"""
+
+import time
+
+import numpy as np
+
+DEFAULT_MIN_CONFIDENCE = 0.6
+DEFAULT_UPSCALE = 2.0
+# 박스 바깥으로 더 잘라낼 여백 (픽셀, 원본 기준) - 글자 끝이 잘리지 않도록
+CROP_PADDING = 4
+REFINE_ENGINES = ('tesseract', 'easyocr', 'paddleocr')
+TESSERACT_LINE_CONFIG = '--oem 3 --psm 7 -l kor+eng'
+# 다른 엔진 결과를 교체할 때 재인식 결과가 넘어야 하는 신뢰도 (각 엔진의 척도 기준)
+# Tesseract는 단어 conf / 100, EasyOCR/PaddleOCR는 인식 확률 (PaddleOCR는 대체로 높게 나옴)
+ACCEPT_CONFIDENCE = {'tesseract': 0.8, 'easyocr': 0.7, 'paddleocr': 0.9}
+
+
+def select_weak(extracted_texts, min_confidence=DEFAULT_MIN_CONFIDENCE):
+    """신뢰도가 min_confidence 미만인 항목 번호"""
+    confidences = np.array([item['confidence'] for item in extracted_texts], dtype=np.float64)
+    return np.flatnonzero(confidences < min_confidence)
+
+
+def _bbox_ltrb(bbox):
+    """4점 bbox 또는 [l, t, r, b] → (l, t, r, b)"""
+    if bbox and isinstance(bbox[0], (list, tuple)):
+        points = np.asarray(bbox, dtype=np.float64)
+        return (*points.min(axis=0), *points.max(axis=0))
+    return tuple(float(v) for v in bbox)
+
+
+def crop_regions(image, extracted_texts, indices, padding=CROP_PADDING, upscale=DEFAULT_UPSCALE):
+    """
+    지정한 항목들의 영역을 흑백으로 잘라 확대
+    image: BGR/흑백 배열 또는 DecodedFrame (흑백 변환을 다른 단계와 공유)
+    return: indices 순서대로 흑백 이미지 목록 (영역이 비어 있으면 None)
+    """
+    import cv2
+    from decoded_frame import as_frame
+
+    gray = as_frame(image).gray
+    h, w = gray.shape
+    crops = []
+    for i in indices:
+        l, t, r, b = _bbox_ltrb(extracted_texts[i]['bbox'])
+        x1, y1 = max(0, int(l) - padding), max(0, int(t) - padding)
+        x2, y2 = min(w, int(np.ceil(r)) + padding), min(h, int(np.ceil(b)) + padding)
+        if x2 <= x1 or y2 <= y1:
+            crops.append(None)
+            continue
+        crop = gray[y1:y2, x1:x2]
+        if upscale != 1.0:
+            crop = cv2.resize(crop, None, fx=upscale, fy=upscale, interpolation=cv2.INTER_CUBIC)
+        crops.append(crop)
+    return crops
+
+
+def _recognize_tesseract(crops):
+    from PIL import Image
+    from tesseract_test import extract_text_and_data
+
+    outputs = []
+    for crop in crops:
+        _, data = extract_text_and_data(Image.fromarray(crop), TESSERACT_LINE_CONFIG)
+        words = [(t.strip(), c) for t, c in zip(data['text'], data['conf']) if t.strip() and c > 0]
+        if words:
+            outputs.append((' '.join(t for t, _ in words), sum(c for _, c in words) / len(words) / 100.0))
+        else:
+            outputs.append(('', 0.0))
+    return outputs
+
+
+def _recognize_easyocr(reader, crops):
+    from batched_easyocr import auto_batch_size, recognize_crops
+    return recognize_crops(reader, crops, auto_batch_size())
+
+
+def _recognize_paddleocr(ocr, crops):
+    import cv2
+    from paddle_stages import rec_lines
+
+    # 인식기는 컬러 입력을 기대하므로 3채널로 변환
+    result = ocr.ocr([cv2.cvtColor(crop, cv2.COLOR_GRAY2BGR) for crop in crops], det=False, cls=False)
+    return rec_lines(result, len(crops))
+
+
+def recognize_regions(crops, engine='tesseract', recognizer=None):
+    """
+    잘라낸 영역들을 인식
+    recognizer: easyocr.Reader 또는 PaddleOCR 인스턴스 (tesseract는 불필요, easyocr는 없으면 레지스트리에서 가져옴)
+    return: crops 순서대로 [(text, confidence)]
+    """
+    if not crops:
+        return []
+    if engine == 'tesseract':
+        return _recognize_tesseract(crops)
+    if engine == 'easyocr':
+        if recognizer is None:
+            from ocr_engines import get_easyocr_reader
+            recognizer = get_easyocr_reader(['ko', 'en'], gpu=False)
+        return _recognize_easyocr(recognizer, crops)
+    if engine == 'paddleocr':
+        if recognizer is None:
+            raise ValueError("paddleocr 재인식에는 PaddleOCR 인스턴스가 필요합니다")
+        return _recognize_paddleocr(recognizer, crops)
+    raise ValueError(f"지원하지 않는 엔진: {engine}")
+
+
+def refine_texts(extracted_texts, image, engine='tesseract', recognizer=None,
+                 min_confidence=DEFAULT_MIN_CONFIDENCE, upscale=DEFAULT_UPSCALE, source_engine=None):
+    """
+    신뢰도 낮은 항목만 다시 인식해 교체한 새 목록을 반환
+    원본 목록/항목은 수정하지 않음 (캐시된 결과를 여러 곳에서 공유하므로)
+    image: OCR에 사용한 원본 이미지 (bbox와 같은 좌표계의 BGR/흑백 배열 또는 DecodedFrame)
+    source_engine: extracted_texts를 만든 엔진 - engine과 같으면 신뢰도를 직접 비교,
+        다르거나 모르면(None) 재인식 신뢰도가 ACCEPT_CONFIDENCE[engine] 이상일 때만 교체
+    return: (새 extracted_texts, {'weak', 'improved', 'time'})
+    """
+    start_time = time.time()
+    weak = select_weak(extracted_texts, min_confidence)
+    refined = list(extracted_texts)
+    improved = 0
+    if len(weak):
+        crops = crop_regions(image, extracted_texts, weak, upscale=upscale)
+        valid = [(i, crop) for i, crop in zip(weak, crops) if crop is not None]
+        outputs = recognize_regions([crop for _, crop in valid], engine, recognizer)
+        for (i, _), (text, confidence) in zip(valid, outputs):
+            text = text.strip()
+            if source_engine == engine:
+                better = confidence > extracted_texts[i]['confidence']
+            else:
+                better = confidence >= ACCEPT_CONFIDENCE[engine]
+            if text and better:
+                refined[i] = dict(extracted_texts[i], text=text, confidence=confidence, refined_by=engine)
+                improved += 1
+    return refined, {'weak': int(len(weak)), 'improved': improved, 'time': time.time() - start_time}
+
+
+def refine_result(result, image, engine='tesseract', recognizer=None,
+                  min_confidence=DEFAULT_MIN_CONFIDENCE, upscale=DEFAULT_UPSCALE, source_engine=None):
+    """
+    ocr_image_* 결과 dict의 신뢰도 낮은 항목을 재인식해 교체 (요약 값도 다시 계산)
+    result는 그 자리에서 갱신되며, extracted_texts는 새 목록으로 바뀜
+    교체한 항목이 있으면 Tesseract raw_data는 더 이상 extracted_texts와 맞지 않으므로 제거
+    return: result (result['refine']에 재인식 정보)
+    """
+    extracted_texts, info = refine_texts(result['extracted_texts'], image, engine, recognizer,
+                                         min_confidence, upscale, source_engine)
+    if info['improved']:
+        result.pop('raw_data', None)
+        result['extracted_texts'] = extracted_texts
+        result['avg_confidence'] = sum(item['confidence'] for item in extracted_texts) / len(extracted_texts)
+        result['total_length'] = sum(len(item['text']) for item in extracted_texts)
+        result['full_text'] = ' '.join(item['text'] for item in extracted_texts)
+    result['refine'] = info
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+    import cv2
+    from tesseract_test import ocr_image_tesseract
+
+    parser = argparse.ArgumentParser(description="신뢰도 낮은 영역만 재인식")
+    parser.add_argument('image', nargs='?', default='image5.jpg')
+    parser.add_argument('--engine', choices=REFINE_ENGINES, default='tesseract', help="재인식 엔진")
+    parser.add_argument('--min-confidence', type=float, default=DEFAULT_MIN_CONFIDENCE)
+    parser.add_argument('--upscale', type=float, default=DEFAULT_UPSCALE)
+    args = parser.parse_args()
+
+    result = ocr_image_tesseract(args.image)
+    if result is None:
+        print(f"❌ 이미지를 읽을 수 없습니다: {args.image}")
+    else:
+        before = result['avg_confidence']
+        refine_result(result, cv2.imread(args.image), args.engine,
+                      min_confidence=args.min_confidence, upscale=args.upscale, source_engine='tesseract')
+        info = result['refine']
+        print(f"🔍 전체 {result['text_count']}개 중 신뢰도 {args.min_confidence} 미만 {info['weak']}개 재인식 "
+              f"→ {info['improved']}개 개선 ({info['time']:.2f}초, 전체 OCR {result['processing_time']:.2f}초)")
+        print(f"📊 평균 신뢰도: {before:.3f} → {result['avg_confidence']:.3f}")
@@ -0,0 +1,273 @@
+"""
+이미지별 OCR 결과 스트리밍 저장 (NDJSON: 한 줄에 결과 하나)
+전체 결과를 메모리에 모았다가 마지막에 json.dump 하는 대신, 이미지 하나가 끝날 때마다 한 줄씩 추가 기록합니다.
+    - 메모리 사용량이 이미지 수와 무관
+    - 중간에 죽어도 그때까지의 결과는 남고, 같은 파일로 다시 실행하면 끝난 이미지는 건너뜀
+    - 요약 통계(RunningSummary)는 결과를 보관하지 않고 누적 계산
+
+읽기는 read_results로 한 줄씩 (기존 *_test_results.json 배열 파일도 같은 함수로 읽을 수 있음):
+    for result in read_results('tesseract_test_results.ndjson'):
+        ...
+    first = first_result('tesseract_test_results.ndjson')   # 첫 줄만 읽음
+열 기반 바이너리(.ocrc, columnar_results.py)도 같은 함수들로 기록/읽기가 됩니다.
+"""
+
+import json
+import os
+
+STREAM_SUFFIXES = ('.ndjson', '.jsonl')
+# 요약에 남길 텍스트 미리보기 길이
+PREVIEW_LENGTH = 100
+
+
+def is_stream_path(path):
+    return str(path).lower().endswith(STREAM_SUFFIXES)
+
+
+class RunningSummary:
+    """결과를 보관하지 않고 누적하는 요약 통계 (test_*_on_images의 전체 결과 요약과 같은 항목)"""
+
+    def __init__(self):
+        self.success_count = 0
+        self.failure_count = 0
+        self.total_processing_time = 0.0
+        self.total_texts = 0
+        self.total_confidence = 0.0
+        self.best = None  # {'image_name', 'text_count', 'avg_confidence', 'preview'}
+
+    def add(self, result):
+        if 'error' in result or result.get('text_count', 0) == 0:
+            self.failure_count += 1
+            return
+        self.success_count += 1
+        self.total_processing_time += result['processing_time']
+        self.total_texts += result['text_count']
+        self.total_confidence += result['avg_confidence']
+        # 텍스트 수가 같으면 먼저 나온 이미지 유지 (max()와 같은 기준)
+        if self.best is None or result['text_count'] > self.best['text_count']:
+            self.best = {
+                'image_name': result['image_name'],
+                'text_count': result['text_count'],
+                'avg_confidence': result['avg_confidence'],
+                'preview': result.get('full_text', '')[:PREVIEW_LENGTH]
+            }
+
+    @property
+    def avg_processing_time(self):
+        return self.total_processing_time / self.success_count if self.success_count else 0.0
+
+    @property
+    def avg_confidence(self):
+        return self.total_confidence / self.success_count if self.success_count else 0.0
+
+    def print_summary(self):
+        """test_*_on_images와 같은 형식으로 요약 출력"""
+        print(f"\n{'='*60}")
+        print("📊 전체 결과 요약")
+        print(f"{'='*60}")
+        print(f"✅ 성공: {self.success_count}개 이미지에서 텍스트 추출")
+        print(f"❌ 실패: {self.failure_count}개 이미지")
+        if self.success_count:
+            print(f"⏱️  평균 처리 시간: {self.avg_processing_time:.2f}초")
+            print(f"📝 총 추출된 텍스트: {self.total_texts}개")
+            print(f"🎯 평균 신뢰도: {self.avg_confidence:.2f}")
+
+    def print_best(self):
+        if self.best:
+            print(f"\n🏆 가장 많은 텍스트가 추출된 이미지: {self.best['image_name']}")
+            print(f"   📝 추출된 텍스트: {self.best['text_count']}개")
+            print(f"   🎯 평균 신뢰도: {self.best['avg_confidence']:.2f}")
+            print(f"   📄 텍스트 미리보기: {self.best['preview']}...")
+
+
+class NDJSONResultWriter:
+    def __init__(self, path, append=True, fsync=False):
+        """
+        path: 결과 파일 (.ndjson)
+        append: True면 기존 파일 뒤에 이어서 기록 (중단된 실행 재개)
+        fsync: True면 한 줄마다 디스크까지 기록 (느리지만 전원 장애에도 안전)
+        """
+        self.path = path
+        self.fsync = fsync
+        self.summary = RunningSummary()
+        if append:
+            _drop_partial_line(path)
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+
+    def write(self, result):
+        """결과 한 줄 기록 후 바로 flush, 요약에 반영"""
+        self._file.write(json.dumps(result, ensure_ascii=False, separators=(',', ':')) + '\n')
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.summary.add(result)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class JSONArrayResultWriter:
+    """NDJSONResultWriter와 같은 사용법으로 기존 JSON 배열 형식(*_test_results.json)에 한 장씩 기록 (이어 쓰기 불가)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.summary = RunningSummary()
+        self._file = open(path, 'w', encoding='utf-8')
+        self._file.write('[\n')
+        self._count = 0
+
+    def write(self, result):
+        if self._count:
+            self._file.write(',\n')
+        json.dump(result, self._file, ensure_ascii=False)
+        self._count += 1
+        self.summary.add(result)
+
+    def close(self):
+        self._file.write('\n]\n')
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_result_writer(path):
+    """확장자에 맞는 결과 기록기 (.ndjson/.jsonl은 이어 쓰기 NDJSON, .ocrc는 열 기반 바이너리, 그 외는 JSON 배열)"""
+    if is_stream_path(path):
+        return NDJSONResultWriter(path)
+    from columnar_results import ColumnarResultWriter, is_columnar_path
+    if is_columnar_path(path):
+        return ColumnarResultWriter(path)
+    return JSONArrayResultWriter(path)
+
+
+def _drop_partial_line(path):
+    """기록 도중 중단되어 줄바꿈 없이 끝난 마지막 줄을 잘라냄 (이어 쓸 때 앞 줄과 붙지 않도록)"""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    with open(path, 'rb+') as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) == b'\n':
+            return
+        # 마지막 줄바꿈 위치를 뒤에서부터 찾음
+        position = f.seek(0, os.SEEK_END)
+        chunk_size = 64 * 1024
+        while position > 0:
+            start = max(0, position - chunk_size)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b'\n')
+            if newline >= 0:
+                f.truncate(start + newline + 1)
+                return
+            position = start
+        f.truncate(0)
+
+
+class ResultSink:
+    """
+    test_*_on_images의 결과 저장
+    stream_path가 있으면 한 장씩 바로 기록 (.ndjson은 이미 기록된 이미지는 건너뛰고 이어서 실행, .ocrc는 열 기반 바이너리),
+    없으면 기존처럼 모아서 마지막에 JSON 배열(indent=2)로 저장
+    """
+
+    def __init__(self, output_file, stream_path=None):
+        self.output_file = output_file
+        self.stream_path = stream_path
+        self.results = []
+        self.summary = RunningSummary()
+        self.done = completed_names(stream_path) if stream_path and is_stream_path(stream_path) else set()
+        self.writer = open_result_writer(stream_path) if stream_path else None
+
+    def pending(self, image_files):
+        """아직 기록되지 않은 이미지만"""
+        return [p for p in image_files if p.name not in self.done]
+
+    def add(self, result):
+        if self.writer:
+            self.writer.write(result)
+        else:
+            self.results.append(result)
+        self.summary.add(result)
+
+    def close(self):
+        """
+        저장 마무리 - return: 전체 요약 (스트리밍 재개 시에는 이전 실행 결과 포함)
+        """
+        if self.writer:
+            self.writer.close()
+            return load_summary(self.stream_path) if self.done else self.writer.summary
+        with open(self.output_file, 'w', encoding='utf-8') as f:
+            json.dump(self.results, f, ensure_ascii=False, indent=2)
+        return self.summary
+
+    @property
+    def saved_path(self):
+        return self.stream_path or self.output_file
+
+
+def read_results(path):
+    """
+    결과 파일을 한 줄씩 읽기 (NDJSON/.ocrc는 지연 읽기, 기존 JSON 배열 파일은 한 번에 읽어서 하나씩 반환)
+    중단된 실행으로 마지막 줄이 잘렸으면 그 줄은 건너뜀
+    """
+    from columnar_results import ColumnarResults, is_columnar_path
+    if is_columnar_path(path):
+        yield from ColumnarResults(path)
+        return
+    if not is_stream_path(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from json.load(f)
+        return
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                if not line.endswith('\n'):
+                    return  # 기록 도중 중단된 마지막 줄
+                raise
+            yield result
+
+
+def first_result(path):
+    """첫 번째 이미지 결과 (NDJSON은 첫 줄만 읽음) - 결과가 없으면 ValueError"""
+    for result in read_results(path):
+        return result
+    raise ValueError(f"결과가 없습니다: {path}")
+
+
+def completed_names(path):
+    """이미 기록된 이미지 이름 집합 (파일이 없으면 빈 집합) - 재개 시 건너뛸 이미지"""
+    if not os.path.exists(path):
+        return set()
+    return {result['image_name'] for result in read_results(path)}
+
+
+def load_summary(path):
+    """결과 파일 전체를 한 줄씩 읽으며 요약 계산 (결과는 보관하지 않음)"""
+    summary = RunningSummary()
+    for result in read_results(path):
+        summary.add(result)
+    return summary
+
+
+if __name__ == "__main__":
+    import sys
+
+    path = sys.argv[1] if len(sys.argv) > 1 else 'tesseract_test_results.ndjson'
+    summary = load_summary(path)
+    print(f"📄 {path}")
+    summary.print_summary()
+    summary.print_best()
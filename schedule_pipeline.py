@@ -0,0 +1,240 @@
+"""
+근무표 이미지 → OCR → 그리드 → Google Calendar 일정 파이프라인
+__main__ 스크립트들(test_image5.py → improved_schedule_parser.py)이 파일을 주고받으며 하던 과정을
+이미지 바이트 하나로 한 번에 처리합니다 (출력 없음, 단계별 소요 시간 반환).
+
+    python schedule_pipeline.py image5.jpg --engine easyocr --staff 임민지
+"""
+
+import re
+import time
+
+ENGINES = ('tesseract', 'easyocr', 'ensemble', 'auto')
+
+
+class BadRequest(ValueError):
+    """요청 자체가 잘못됨 (지원하지 않는 엔진/옵션 조합, 디코딩할 수 없는 이미지) - 다시 시도해도 같은 결과"""
+
+
+def warm_engine(engine):
+    """엔진 모델/버전 정보를 미리 로드 (서비스 시작 시 첫 요청 지연 방지)"""
+    from ocr_cache import engine_version
+    if engine == 'ensemble':
+        from ensemble_ocr import DEFAULT_ENGINES
+        for name in DEFAULT_ENGINES:
+            warm_engine(name)
+        return
+    if engine == 'auto':
+        from engine_router import ROUTES, get_default_router
+        router = get_default_router()
+        for name in {ROUTES[route][0] for route in router.routes}:
+            warm_engine(name)
+        return
+    if engine == 'easyocr':
+        from ocr_engines import get_easyocr_reader
+        get_easyocr_reader(['ko', 'en'], gpu=False)
+    elif engine != 'tesseract':
+        raise ValueError(f"지원하지 않는 엔진: {engine}")
+    engine_version(engine)
+
+
+def run_ocr_bytes(image_bytes, engine='tesseract', image_name='', tile_pixels=None, **options):
+    """
+    이미지 바이트를 OCR (엔진별 캐시/옵션은 ocr_bytes_* 와 같음)
+    tile_pixels: 가로x세로가 이 값보다 큰 이미지는 타일로 나눠 OCR (tiled_ocr.ocr_bytes_tiled)
+        tesseract/easyocr만 적용, 이때 옵션은 config/use_cache/frame만 사용
+    return: ocr_image_* 결과 dict (이미지를 디코딩할 수 없으면 None)
+        ensemble은 ensemble_ocr.ensemble_ocr 결과 (셀별 투표 결과 + 'grid')
+        auto는 engine_router가 이미지별로 고른 엔진/옵션의 결과 (+ 'route')
+    """
+    if engine == 'ensemble':
+        from ensemble_ocr import ensemble_ocr
+        return ensemble_ocr(image_bytes, **options)
+    if engine == 'auto':
+        from engine_router import get_default_router
+        return get_default_router().run(image_bytes, image_name, **options)
+    if tile_pixels and _exceeds_pixels(image_bytes, tile_pixels):
+        from tiled_ocr import TILE_ENGINES, ocr_bytes_tiled
+        if engine in TILE_ENGINES:
+            # EasyOCR 잠금은 타일마다 잡음 (여기서 잡으면 타일 처리 함수와 교착)
+            return ocr_bytes_tiled(image_bytes, engine, image_name, config=options.get('config'),
+                                   use_cache=options.get('use_cache', True), frame=options.get('frame'))
+    if engine == 'easyocr':
+        from easyocr_test import ocr_bytes_easyocr
+        from ocr_engines import engine_lock, get_easyocr_reader
+        reader = get_easyocr_reader(['ko', 'en'], gpu=False)
+        with engine_lock('easyocr'):
+            return ocr_bytes_easyocr(reader, image_bytes, image_name, **options)
+    if engine == 'tesseract':
+        from tesseract_test import ocr_bytes_tesseract
+        return ocr_bytes_tesseract(image_bytes, image_name, **options)
+    raise BadRequest(f"지원하지 않는 엔진: {engine}")
+
+
+def _exceeds_pixels(image_bytes, max_pixels):
+    """헤더의 이미지 크기가 max_pixels(가로x세로)보다 큰지 - 픽셀 디코딩 없음"""
+    from image_preprocess import read_image_size
+    try:
+        width, height = read_image_size(image_bytes)
+    except Exception:
+        return False  # 헤더를 읽지 못하면 일반 경로에서 디코딩 실패로 처리
+    return width * height > max_pixels
+
+
+def _decodable(frame):
+    try:
+        frame.bgr
+    except ValueError:
+        return False
+    return True
+
+
+def _is_staff_cell(text, staff_names):
+    """행 첫 칸이 직원명인지 (목록이 있으면 글자 부분 일치, 없으면 한글 2자 이상)"""
+    if not text:
+        return False
+    if staff_names:
+        return any(name in text or sum(ch in text for ch in name) >= 2 for name in staff_names)
+    return len(re.findall(r'[가-힣]', text)) >= 2
+
+
+def extract_schedules(grid, base_year=2025, base_month=1, staff_names=None, min_dates=3):
+    """
+    그리드에서 일정 추출 (날짜 헤더 행이 여러 번 나오는 주차별 표도 처리)
+    날짜가 min_dates개 이상인 행을 헤더로 보고, 다음 헤더 전까지 첫 칸이 직원명인 행을 근무 행으로 처리
+    return: improved_schedule_parser.schedules_to_gcal_json에 넣을 일정 목록
+    """
+    from fixed_tesseract_parser import extract_dates_from_row
+    from improved_schedule_parser import parse_time_range
+
+    # 행은 있어도 모든 행이 비어 있으면(텍스트가 하나도 배치되지 않음) 열이 없음
+    n_cols = max((max(cols) for cols in grid.values() if cols), default=-1) + 1
+    if not n_cols:
+        return []
+    n_rows = max(grid) + 1
+
+    schedules = []
+    dates = []
+    week = 0
+    for row in range(n_rows):
+        row_texts = [grid.get(row, {}).get(col, '') for col in range(n_cols)]
+        row_dates = extract_dates_from_row(row_texts, base_year, base_month)
+        if sum(1 for d in row_dates if d) >= min_dates:
+            dates = row_dates
+            week += 1
+            continue
+        if not dates or not _is_staff_cell(row_texts[0], staff_names):
+            continue
+
+        staff_name = row_texts[0].strip()
+        for col in range(1, min(len(row_texts), len(dates))):
+            cell_text = row_texts[col]
+            date = dates[col]
+            if not cell_text or not date:
+                continue
+            start, end = parse_time_range(cell_text)
+            if start and end:
+                schedules.append({'staff_name': staff_name, 'date': date, 'start_time': start,
+                                  'end_time': end, 'cell_text': cell_text, 'week': week})
+            elif 'CL' in cell_text or 'X' in cell_text:
+                schedules.append({'staff_name': staff_name, 'date': date, 'start_time': None,
+                                  'end_time': None, 'cell_text': cell_text, 'week': week,
+                                  'special_duty': True})
+    return schedules
+
+
+def process_roster_image(image_bytes, engine='tesseract', staff_name=None, base_year=2025, base_month=1,
+                         staff_names=None, image_name='', refine=None, **ocr_options):
+    """
+    근무표 이미지 한 장을 Google Calendar 일정으로 변환
+    staff_name: 지정하면 해당 직원 일정만 반환
+    staff_names: 직원명 목록 (행 첫 칸 판정용, 없으면 한글 이름 형태로 판정)
+    refine: 재인식 엔진 이름 - 지정하면 신뢰도 낮은 영역만 다시 인식 (refine_ocr, ensemble과는 함께 쓸 수 없음)
+    return: {'events', 'schedule_count', 'text_count', 'cache_hit', 'timing': {'ocr', ['refine'], 'grid', 'calendar'},
+             ['late_work']: ensemble에서 시간 제한을 넘겨 아직 실행 중인 엔진이 모두 끝나면 완료되는 Future}
+    """
+    from decoded_frame import DecodedFrame
+    from improved_schedule_parser import schedules_to_gcal_json
+    from ocr_result import OCRResult, cluster_grid
+
+    if refine and engine == 'ensemble':
+        # ensemble은 투표로 만든 grid를 그대로 쓰므로 재인식 결과가 반영되지 않음
+        raise BadRequest("ensemble 엔진에는 refine을 사용할 수 없습니다")
+
+    # OCR/재인식이 같은 디코딩 결과를 공유 (캐시 적중 시에는 디코딩하지 않음)
+    frame = ocr_options.setdefault('frame', DecodedFrame(image_bytes, image_name))
+
+    timing = {}
+    start_time = time.time()
+    try:
+        result = run_ocr_bytes(image_bytes, engine, image_name, **ocr_options)
+    except ValueError as e:
+        # ensemble 등은 디코딩 실패를 엔진 오류로 전달하므로, 실패했을 때만 이미지 자체를 확인
+        if not isinstance(e, BadRequest) and not _decodable(frame):
+            raise BadRequest("이미지를 디코딩할 수 없습니다") from e
+        raise
+    timing['ocr'] = time.time() - start_time
+    if result is None:
+        raise BadRequest("이미지를 디코딩할 수 없습니다")
+
+    if refine:
+        from ocr_engines import engine_lock
+        from refine_ocr import refine_result
+        source_engine = engine
+        if engine == 'auto':
+            from engine_router import ROUTES
+            source_engine = ROUTES[result['route']['name']][0]
+        start_time = time.time()
+        # 공유 EasyOCR Reader를 다른 요청과 동시에 쓰지 않도록 OCR과 같은 잠금 사용
+        with engine_lock(refine):
+            refine_result(result, frame, refine, source_engine=source_engine)
+        timing['refine'] = time.time() - start_time
+
+    start_time = time.time()
+    if 'grid' in result:
+        grid = result['grid']
+    else:
+        grid = cluster_grid(OCRResult.from_extracted_texts(result['extracted_texts']))
+    schedules = extract_schedules(grid, base_year, base_month, staff_names)
+    timing['grid'] = time.time() - start_time
+
+    start_time = time.time()
+    events = schedules_to_gcal_json(schedules, staff_name)
+    timing['calendar'] = time.time() - start_time
+
+    output = {
+        'events': events,
+        'schedule_count': len(schedules),
+        'text_count': result['text_count'],
+        'cache_hit': result.get('cache_hit', False),
+        'timing': timing
+    }
+    if 'late_work' in result:
+        output['late_work'] = result['late_work']
+    return output
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="근무표 이미지 → Google Calendar 일정 JSON")
+    parser.add_argument('image', nargs='?', default='image5.jpg')
+    parser.add_argument('--engine', choices=ENGINES, default='tesseract')
+    parser.add_argument('--staff', default=None, help="특정 직원 일정만 출력")
+    parser.add_argument('--year', type=int, default=2025)
+    parser.add_argument('--month', type=int, default=1)
+    # 재인식 엔진 (paddleocr는 PaddleOCR 인스턴스를 넘겨야 해서 CLI에서는 제외)
+    from refine_ocr import REFINE_ENGINES
+    parser.add_argument('--refine', choices=[e for e in REFINE_ENGINES if e != 'paddleocr'], default=None,
+                        help="신뢰도 낮은 영역만 이 엔진으로 재인식")
+    parser.add_argument('--tile-pixels', type=int, default=None,
+                        help="가로x세로가 이 값보다 큰 이미지는 타일로 나눠 OCR (tesseract/easyocr)")
+    args = parser.parse_args()
+
+    with open(args.image, 'rb') as f:
+        output = process_roster_image(f.read(), args.engine, args.staff, args.year, args.month,
+                                      image_name=args.image, refine=args.refine, tile_pixels=args.tile_pixels)
+    timing = ', '.join(f"{k} {v:.2f}초" for k, v in output['timing'].items())
+    print(f"📅 일정 {len(output['events'])}개 ({timing})")
+    print(json.dumps(output['events'], ensure_ascii=False, indent=2))
@@ -0,0 +1,310 @@
+"""
+근무표 → Google Calendar 일정 변환 HTTP 서비스 (asyncio, 표준 라이브러리만 사용)
+엔진은 시작할 때 한 번 로드해 두고, OCR은 이벤트 루프 밖의 제한된 스레드 풀에서 실행합니다.
+시작할 때 로드하지 않은 엔진을 요청하면 (요청 처리 중에 모델을 로드하지 않도록) 400을 돌려줍니다.
+동시에 처리하는 요청 수와 대기 요청 수에 상한이 있으며, 초과 시 503을 바로 돌려줍니다.
+
+    python schedule_service.py --engine easyocr --port 8080
+
+    curl -X POST --data-binary @image5.jpg "http://127.0.0.1:8080/schedule?engine=easyocr&staff=임민지"
+    curl -F image=@image5.jpg "http://127.0.0.1:8080/schedule"      (multipart 업로드도 가능)
+    curl http://127.0.0.1:8080/health
+
+응답 헤더:
+    Server-Timing: queue;dur=..., ocr;dur=..., grid;dur=..., calendar;dur=..., total;dur=... (밀리초)
+    X-Processing-Time: 전체 처리 시간 (초)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from email.parser import BytesParser
+from email.policy import HTTP
+from urllib.parse import parse_qs, urlsplit
+
+from ensemble_ocr import EnsembleTimeout
+from schedule_pipeline import ENGINES, BadRequest, process_roster_image, warm_engine
+
+MAX_UPLOAD_BYTES = 20 * 1024 * 1024  # 20MB
+MAX_HEADER_BYTES = 64 * 1024
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable',
+            504: 'Gateway Timeout'}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def extract_upload(content_type, body):
+    """
+    요청 본문에서 이미지 바이트 추출
+    multipart/form-data면 'image' 필드(없으면 첫 파일), 그 외에는 본문 전체를 이미지로 간주
+    return: (이미지 바이트, 파일명)
+    """
+    if not content_type.startswith('multipart/form-data'):
+        return body, ''
+    message = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode('latin-1') + body)
+    fallback = None
+    for part in message.iter_parts():
+        if part.get_param('name', header='content-disposition') == 'image':
+            return part.get_payload(decode=True), part.get_filename() or ''
+        if fallback is None and part.get_filename():
+            fallback = part
+    if fallback is None:
+        raise HTTPError(400, "업로드된 이미지가 없습니다 (필드 이름: image)")
+    return fallback.get_payload(decode=True), fallback.get_filename() or ''
+
+
+class ScheduleService:
+    def __init__(self, engines=('tesseract',), max_concurrency=None, max_pending=16, timeout=60.0):
+        """
+        engines: 시작 시 미리 로드할 엔진 - 요청에서는 이 엔진들만 사용 가능 (engine을 지정하지 않으면 첫 번째 엔진)
+        max_concurrency: 동시에 OCR을 실행할 요청 수 (기본: CPU 수)
+        max_pending: 실행을 기다릴 수 있는 요청 수 (초과 시 503)
+        timeout: 요청당 처리 시간 제한 (초)
+        """
+        self.engines = tuple(engines)
+        self.max_concurrency = max_concurrency or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                           thread_name_prefix='ocr')
+        self._slots = None
+        self.in_flight = 0
+        self.pending = 0
+        # 시간 초과로 응답은 포기했지만 아직 스레드에서 실행 중인 작업 수 (슬롯을 계속 차지함)
+        self.abandoned = 0
+        self.stats = {'requests': 0, 'errors': 0, 'rejected': 0, 'timeouts': 0}
+
+    async def warm_up(self):
+        """엔진 로드 (스레드 풀에서 실행)"""
+        loop = asyncio.get_running_loop()
+        for engine in self.engines:
+            start_time = time.time()
+            await loop.run_in_executor(self.executor, warm_engine, engine)
+            print(f"🔥 {engine} 준비 완료 ({time.time() - start_time:.2f}초)")
+
+    async def handle_schedule(self, query, content_type, body):
+        """POST /schedule - return: (응답 dict, Server-Timing 항목)"""
+        engine = query.get('engine', [self.engines[0]])[0]
+        if engine not in ENGINES:
+            raise HTTPError(400, f"지원하지 않는 엔진: {engine}")
+        if engine not in self.engines:
+            raise HTTPError(400, f"로드하지 않은 엔진: {engine} (사용 가능: {', '.join(self.engines)})")
+        try:
+            base_year = int(query.get('year', ['2025'])[0])
+            base_month = int(query.get('month', ['1'])[0])
+        except ValueError:
+            raise HTTPError(400, "year/month는 숫자여야 합니다")
+        staff_name = query.get('staff', [None])[0]
+        staff_names = [name for names in query.get('staff_names', []) for name in names.split(',') if name] or None
+
+        image_bytes, filename = extract_upload(content_type, body)
+        if not image_bytes:
+            raise HTTPError(400, "이미지 본문이 비어 있습니다")
+
+        # 동시 처리 수 제한 - 대기열도 가득 차면 바로 거절
+        if self._slots.locked() and self.pending >= self.max_pending:
+            self.stats['rejected'] += 1
+            raise HTTPError(503, "요청이 많습니다. 잠시 후 다시 시도해주세요")
+        queued_at = time.time()
+        self.pending += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.pending -= 1
+        queue_time = time.time() - queued_at
+
+        self.in_flight += 1
+        loop = asyncio.get_running_loop()
+        try:
+            job = self.executor.submit(process_roster_image, image_bytes, engine, staff_name, base_year,
+                                       base_month, staff_names, image_name=filename)
+        except BaseException:
+            self._finish_job()
+            raise
+        # 슬롯은 응답이 아니라 작업이 끝날 때 반납 - 시간 초과로 응답을 포기해도 스레드는 계속 실행되므로,
+        # 바로 반납하면 새 요청이 남은 작업 뒤에 줄을 서서 연달아 시간 초과되고 동시 처리 제한이 무의미해짐
+        job.add_done_callback(lambda job: self._release_when_done(job, loop))
+        result = asyncio.wrap_future(job)
+        try:
+            # shield: 시간 초과 시 결과 대기만 취소하고 작업(과 슬롯 반납 콜백)은 그대로 둠
+            output = await asyncio.wait_for(asyncio.shield(result), self.timeout)
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            self.abandoned += 1
+            result.add_done_callback(self._forget_abandoned)
+            raise HTTPError(504, f"처리 시간 제한({self.timeout:.0f}초)을 넘었습니다")
+        except EnsembleTimeout as e:
+            self.stats['timeouts'] += 1
+            raise HTTPError(504, str(e))
+        except BadRequest as e:
+            raise HTTPError(400, str(e))
+
+        timing = dict(queue=queue_time, **output['timing'])
+        return {
+            'engine': engine,
+            'image_name': filename,
+            'events': output['events'],
+            'schedule_count': output['schedule_count'],
+            'text_count': output['text_count'],
+            'cache_hit': output['cache_hit']
+        }, timing
+
+    def _release_when_done(self, job, loop):
+        """
+        작업 종료 콜백 (작업 스레드에서 실행)
+        ensemble에서 시간 제한을 넘긴 엔진 스레드가 남아 있으면(late_work) 그것까지 끝난 뒤 슬롯 반납
+        """
+        late_work = None
+        if not job.cancelled():
+            error = job.exception()
+            late_work = getattr(error, 'late_work', None) if error else job.result().get('late_work')
+        if late_work is not None:
+            late_work.add_done_callback(lambda _: loop.call_soon_threadsafe(self._finish_job))
+        else:
+            loop.call_soon_threadsafe(self._finish_job)
+
+    def _finish_job(self):
+        """작업 종료 (이벤트 루프 스레드에서 실행) - 슬롯 반납"""
+        self.in_flight -= 1
+        self._slots.release()
+
+    def _forget_abandoned(self, result):
+        """응답을 포기한 작업이 끝남 (예외는 여기서 확인해 미확인 예외 경고가 나지 않도록)"""
+        self.abandoned -= 1
+        if not result.cancelled():
+            result.exception()
+
+    def health(self):
+        return {
+            'status': 'ok',
+            'engines': list(self.engines),
+            'max_concurrency': self.max_concurrency,
+            'in_flight': self.in_flight,
+            'abandoned': self.abandoned,
+            'pending': self.pending,
+            **self.stats
+        }
+
+    async def handle_connection(self, reader, writer):
+        """요청 하나 처리 후 연결 종료 (Connection: close)"""
+        start_time = time.time()
+        timing = {}
+        try:
+            try:
+                method, target, headers, body = await self._read_request(reader)
+                url = urlsplit(target)
+                query = parse_qs(url.query)
+                if url.path == '/health':
+                    if method != 'GET':
+                        raise HTTPError(405, "GET만 지원합니다")
+                    status, payload = 200, self.health()
+                elif url.path == '/schedule':
+                    if method != 'POST':
+                        raise HTTPError(405, "POST만 지원합니다")
+                    self.stats['requests'] += 1
+                    payload, timing = await self.handle_schedule(query, headers.get('content-type', ''), body)
+                    status = 200
+                else:
+                    raise HTTPError(404, f"없는 경로: {url.path}")
+            except HTTPError as e:
+                status, payload = e.status, {'error': e.message}
+                if e.status != 503:
+                    self.stats['errors'] += 1
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"❌ 요청 처리 오류: {e!r}")
+                traceback.print_exception(e)
+                status, payload = 500, {'error': str(e)}
+            await self._write_response(writer, status, payload, timing, time.time() - start_time)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.LimitOverrunError:
+            raise HTTPError(400, "헤더가 너무 깁니다")
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, _ = lines[0].split(' ', 2)
+        except ValueError:
+            raise HTTPError(400, "잘못된 요청 줄")
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                key, value = line.split(':', 1)
+                headers[key.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length', '0'))
+        except ValueError:
+            raise HTTPError(400, "잘못된 Content-Length")
+        if length > MAX_UPLOAD_BYTES:
+            raise HTTPError(413, f"업로드 크기 제한({MAX_UPLOAD_BYTES // (1024 * 1024)}MB)을 넘었습니다")
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), target, headers, body
+
+    async def _write_response(self, writer, status, payload, timing, total_time):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        server_timing = ', '.join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timing.items())
+        server_timing = f"{server_timing}, total;dur={total_time * 1000:.1f}" if server_timing \
+            else f"total;dur={total_time * 1000:.1f}"
+        headers = [
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            f"Server-Timing: {server_timing}",
+            f"X-Processing-Time: {total_time:.3f}",
+            "Connection: close",
+        ]
+        if status == 503:
+            headers.append("Retry-After: 1")
+        writer.write(('\r\n'.join(headers) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+    async def serve(self, host='127.0.0.1', port=8080):
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        await self.warm_up()
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_HEADER_BYTES)
+        print(f"🚀 근무표 서비스 시작: http://{host}:{port} "
+              f"(동시 처리 {self.max_concurrency}개, 대기 {self.max_pending}개)")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="근무표 → Google Calendar 일정 변환 HTTP 서비스")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--engine', action='append', choices=ENGINES,
+                        help="미리 로드할 엔진 (여러 번 지정 가능, 기본: tesseract)")
+    parser.add_argument('--max-concurrency', type=int, default=None, help="동시 OCR 요청 수 (기본: CPU 수)")
+    parser.add_argument('--max-pending', type=int, default=16, help="대기 가능한 요청 수")
+    parser.add_argument('--timeout', type=float, default=60.0, help="요청당 처리 시간 제한 (초)")
+    args = parser.parse_args()
+
+    service = ScheduleService(args.engine or ['tesseract'], args.max_concurrency, args.max_pending, args.timeout)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n👋 서비스 종료")
+    finally:
+        service.executor.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    main()
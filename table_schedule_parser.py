@@ -1,72 +1,18 @@
 import json
 import re
-from collections import defaultdict
 from datetime import datetime, timedelta
-import numpy as np
+from ocr_result import cluster_grid
+from result_stream import first_result
 
 # --- 1. OCR 결과를 2차원 그리드로 변환 ---
 def cluster_texts_to_grid(ocr_results, row_eps=30, col_eps=30):
     """
     bbox 중심 좌표를 기준으로 행/열 클러스터링하여 2차원 그리드로 변환
-    ocr_results: [{'text': str, 'confidence': float, 'bbox': [[x1,y1],...]}]
+    ocr_results: [{'text': str, 'confidence': float, 'bbox': [[x1,y1],...]}] 또는 OCRResult
     return: grid[row][col] = {'text': ..., ...}
     """
-    # bbox 중심 좌표 계산
-    items = []
-    for item in ocr_results:
-        bbox = item['bbox']
-        cx = np.mean([p[0] for p in bbox])
-        cy = np.mean([p[1] for p in bbox])
-        items.append({'text': item['text'], 'cx': cx, 'cy': cy, 'bbox': bbox, 'confidence': item['confidence']})
-
-    # y좌표(행) 클러스터링
-    ys = np.array([it['cy'] for it in items])
-    y_sorted_idx = np.argsort(ys)
-    row_clusters = []
-    for idx in y_sorted_idx:
-        y = ys[idx]
-        found = False
-        for row in row_clusters:
-            if abs(row[0] - y) < row_eps:
-                row.append(y)
-                found = True
-                break
-        if not found:
-            row_clusters.append([y])
-    row_centers = [np.mean(row) for row in row_clusters]
-
-    # 각 텍스트에 행 인덱스 할당
-    for it in items:
-        it['row'] = int(np.argmin([abs(it['cy']-rc) for rc in row_centers]))
-
-    # x좌표(열) 클러스터링 (행별로)
-    grid = defaultdict(lambda: defaultdict(list))
-    for row in range(len(row_centers)):
-        row_items = [it for it in items if it['row']==row]
-        xs = np.array([it['cx'] for it in row_items])
-        x_sorted_idx = np.argsort(xs)
-        col_clusters = []
-        for idx in x_sorted_idx:
-            x = xs[idx]
-            found = False
-            for col in col_clusters:
-                if abs(col[0] - x) < col_eps:
-                    col.append(x)
-                    found = True
-                    break
-            if not found:
-                col_clusters.append([x])
-        col_centers = [np.mean(col) for col in col_clusters]
-        for it in row_items:
-            it['col'] = int(np.argmin([abs(it['cx']-cc) for cc in col_centers]))
-            grid[row][it['col']].append(it)
-    # 각 셀에 텍스트 합치기
-    grid_text = defaultdict(dict)
-    for row in grid:
-        for col in grid[row]:
-            cell_text = ' '.join([it['text'] for it in grid[row][col]])
-            grid_text[row][col] = cell_text.strip()
-    return grid_text
+    # 박스 중심 계산과 행/열 클러스터링은 배열 연산으로 처리 (ocr_result.cluster_grid)
+    return cluster_grid(ocr_results, row_eps, col_eps)
 
 # --- 2. 날짜 매핑 ---
 def extract_dates_from_row(row_texts, base_year=None, base_month=None):
@@ -193,13 +139,12 @@ def schedules_to_gcal_json(schedules, staff_name):
 # --- 메인 파이프라인 함수 ---
 def parse_schedule_from_ocr_result(ocr_result_json_path, staff_name, date_row=0, pos_row=1, time_row=2, data_start_row=3):
     """
-    ocr_result_json_path: easyocr_test_results.json 등
+    ocr_result_json_path: easyocr_test_results.json 등 (스트리밍 결과 .ndjson, 열 기반 .ocrc도 가능)
     staff_name: 찾을 직원명
     row 인덱스는 표 구조에 따라 조정
     return: Google Calendar events JSON
     """
-    with open(ocr_result_json_path, encoding='utf-8') as f:
-        ocr_results = json.load(f)[0]['extracted_texts']  # 첫 번째 이미지 기준
+    ocr_results = first_result(ocr_result_json_path)['extracted_texts']  # 첫 번째 이미지 기준 (.ndjson/.ocrc는 첫 이미지만 읽음)
     grid = cluster_texts_to_grid(ocr_results)
     # 행별 텍스트 추출
     n_rows = max(grid.keys())+1
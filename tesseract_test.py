@@ -6,12 +6,241 @@ import numpy as np
 from pathlib import Path
 from PIL import Image
 import re
+from ocr_cache import cached_ocr, engine_version
+from image_preprocess import decode_normalized, preprocess_bytes, map_boxes_through
+from result_stream import ResultSink
 
 # Tesseract 경로 설정 (Windows)
 pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 
-def test_tesseract_on_images():
-    """TesseractOCR을 사용하여 모든 이미지에서 텍스트를 추출하고 분석합니다."""
+def data_to_text(data):
+    """
+    image_to_data(TSV) 결과에서 image_to_string과 같은 형태의 텍스트 재구성
+    단어는 공백, 줄은 줄바꿈, 문단/블록은 빈 줄로 구분하고 마지막에 페이지 구분자(form feed)를 붙임
+    """
+    paragraphs = []
+    current_par = None
+    current_line = None
+    for i in range(len(data['text'])):
+        if data['level'][i] != 5:  # 단어 레벨만 사용
+            continue
+        word = data['text'][i].strip()
+        if not word:
+            continue
+        par_key = (data['page_num'][i], data['block_num'][i], data['par_num'][i])
+        line_key = par_key + (data['line_num'][i],)
+        if par_key != current_par:
+            paragraphs.append([])
+            current_par = par_key
+            current_line = None
+        if line_key != current_line:
+            paragraphs[-1].append([])
+            current_line = line_key
+        paragraphs[-1][-1].append(word)
+    
+    text = ''
+    for lines in paragraphs:
+        for words in lines:
+            text += ' '.join(words) + '\n'
+        text += '\n'
+    return text + '\f'
+
+def extract_text_and_data(image_pil, config, single_pass=True):
+    """
+    Tesseract로 (전체 텍스트, 상세 데이터) 추출
+    single_pass=True면 image_to_data 한 번만 실행하고 텍스트는 TSV 구조에서 재구성
+    """
+    data = pytesseract.image_to_data(image_pil, config=config, output_type=pytesseract.Output.DICT)
+    if single_pass:
+        text = data_to_text(data)
+    else:
+        text = pytesseract.image_to_string(image_pil, config=config)
+    return text, data
+
+# 한글 + 영어 인식 기본 설정
+DEFAULT_CONFIG = '--oem 3 --psm 6 -l kor+eng'
+
+def ocr_image_tesseract(img_path, config=DEFAULT_CONFIG, single_pass=True, use_cache=True, normalize=False,
+                        preprocess=False):
+    """
+    이미지 한 장을 Tesseract로 처리하여 결과 dict 반환
+    use_cache: True면 같은 이미지+설정의 이전 OCR 결과를 재사용 (ocr_cache.py)
+    normalize: True면 글자 높이 기준으로 축소 디코딩 후 인식 (image_preprocess.py), 좌표는 원본 기준으로 복원
+    preprocess: True면 이진화/기울기 보정/테두리 제거한 이미지로 인식 (전처리 결과도 캐시), 좌표는 원본 기준으로 복원
+    return: test_tesseract_on_images 결과 항목과 같은 구조 (이미지를 읽을 수 없으면 None)
+    """
+    img_path = Path(img_path)
+    try:
+        image_bytes = img_path.read_bytes()
+    except OSError:
+        return None
+    return ocr_bytes_tesseract(image_bytes, img_path.name, config, single_pass, use_cache, normalize, preprocess)
+
+def ocr_bytes_tesseract(image_bytes, image_name='', config=DEFAULT_CONFIG, single_pass=True, use_cache=True,
+                        normalize=False, preprocess=False, frame=None):
+    """
+    이미지 파일 바이트(업로드 등)를 Tesseract로 처리 - 옵션과 반환값은 ocr_image_tesseract와 같음
+    frame: 같은 이미지의 DecodedFrame (여러 엔진/설정이 디코딩 결과를 공유, normalize는 축소 디코딩이라 사용하지 않음)
+    """
+    def run_ocr():
+        # 이미지 디코딩 (OpenCV) - 캐시 적중 시에는 디코딩도 하지 않음
+        scale_x = scale_y = 1.0
+        transform = None
+        image_pil = None
+        if preprocess:
+            try:
+                image_cv, info, _ = preprocess_bytes(image_bytes, frame=frame)
+            except Exception:
+                return None
+            transform = info['transform']
+        elif normalize:
+            try:
+                image_cv, info = decode_normalized(image_bytes)
+            except Exception:
+                return None
+            scale_x, scale_y = info['scale_x'], info['scale_y']
+        elif frame is not None:
+            try:
+                image_pil = frame.pil()
+            except ValueError:
+                return None
+        else:
+            image_cv = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+            if image_cv is None:
+                return None
+        
+        # PIL Image로 변환 (Tesseract는 PIL Image를 선호) - frame은 변환 결과를 공유
+        if image_pil is None:
+            if image_cv.ndim == 2:
+                image_pil = Image.fromarray(image_cv)
+            else:
+                image_pil = Image.fromarray(cv2.cvtColor(image_cv, cv2.COLOR_BGR2RGB))
+        
+        # 텍스트 + 상세 정보(bbox 포함) 추출
+        text, data = extract_text_and_data(image_pil, config, single_pass=single_pass)
+        
+        # 축소/전처리한 경우 좌표를 원본 이미지 기준으로 복원
+        if (scale_x, scale_y) != (1.0, 1.0):
+            for key, scale in (('left', scale_x), ('width', scale_x), ('top', scale_y), ('height', scale_y)):
+                data[key] = [int(round(v / scale)) for v in data[key]]
+        elif transform is not None:
+            boxes = [{'bbox': [l, t, l + w, t + h]}
+                     for l, t, w, h in zip(data['left'], data['top'], data['width'], data['height'])]
+            boxes = map_boxes_through(boxes, transform)
+            data['left'] = [b['bbox'][0] for b in boxes]
+            data['top'] = [b['bbox'][1] for b in boxes]
+            data['width'] = [b['bbox'][2] - b['bbox'][0] for b in boxes]
+            data['height'] = [b['bbox'][3] - b['bbox'][1] for b in boxes]
+        
+        # data에서 유효한 텍스트 추출
+        extracted_texts = []
+        for i in range(len(data['text'])):
+            text_item = data['text'][i].strip()
+            conf = data['conf'][i]
+            
+            if text_item and conf > 0:  # 유효한 텍스트만
+                extracted_texts.append({
+                    'text': text_item,
+                    'confidence': conf / 100.0,  # 0-100을 0-1로 변환
+                    'bbox': [
+                        data['left'][i],
+                        data['top'][i],
+                        data['left'][i] + data['width'][i],
+                        data['top'][i] + data['height'][i]
+                    ]
+                })
+        
+        return {
+            'extracted_texts': extracted_texts,
+            'full_text': text,
+            'raw_data': {
+                'text': data['text'],
+                'conf': data['conf'],
+                'left': data['left'],
+                'top': data['top'],
+                'width': data['width'],
+                'height': data['height']
+            }
+        }
+    
+    # Tesseract OCR 실행 (또는 캐시 조회)
+    start_time = time.time()
+    if use_cache:
+        cache_config = f"{config}|single_pass={single_pass}"
+        if preprocess:
+            cache_config += "|preprocess"
+        elif normalize:
+            cache_config += "|normalize"
+        ocr_output, cache_hit = cached_ocr(image_bytes, 'tesseract', engine_version('tesseract'),
+                                           cache_config, run_ocr)
+    else:
+        ocr_output, cache_hit = run_ocr(), False
+    processing_time = time.time() - start_time
+    
+    if ocr_output is None:
+        return None
+    
+    # 결과 분석
+    extracted_texts = ocr_output['extracted_texts']
+    valid_text_count = len(extracted_texts)
+    total_confidence = sum(item['confidence'] for item in extracted_texts)
+    total_length = sum(len(item['text']) for item in extracted_texts)
+    avg_confidence = total_confidence / valid_text_count if valid_text_count > 0 else 0
+    
+    return {
+        'image_name': image_name,
+        'processing_time': processing_time,
+        'cache_hit': cache_hit,
+        'text_count': valid_text_count,
+        'avg_confidence': avg_confidence,  # 0-1
+        'total_length': total_length,
+        'extracted_texts': extracted_texts,
+        'full_text': ocr_output['full_text'],
+        'raw_data': ocr_output['raw_data']
+    }
+
+def error_result(image_name, error):
+    """처리 실패한 이미지의 결과 항목"""
+    return {
+        'image_name': image_name,
+        'error': str(error),
+        'processing_time': 0,
+        'text_count': 0,
+        'avg_confidence': 0,
+        'total_length': 0,
+        'extracted_texts': [],
+        'full_text': ''
+    }
+
+def print_image_result(result):
+    """이미지 한 장의 처리 결과 출력"""
+    extracted_texts = result['extracted_texts']
+    text = result['full_text']
+    
+    print(f"   ⏱️  처리 시간: {result['processing_time']:.2f}초{' (캐시)' if result.get('cache_hit') else ''}")
+    print(f"   📝 추출된 텍스트 수: {result['text_count']}개")
+    print(f"   🎯 평균 신뢰도: {result['avg_confidence']:.2f}")
+    print(f"   📏 총 텍스트 길이: {result['total_length']}자")
+    
+    if extracted_texts:
+        print(f"   📄 추출된 텍스트 미리보기:")
+        for i, item in enumerate(extracted_texts[:10]):  # 처음 10개만 표시
+            print(f"      {i+1}. '{item['text']}' (신뢰도: {item['confidence']:.2f})")
+        if len(extracted_texts) > 10:
+            print(f"      ... 외 {len(extracted_texts)-10}개 더")
+        
+        # 전체 텍스트 미리보기
+        print(f"   📄 전체 텍스트 미리보기 (첫 200자):")
+        print(f"      {text[:200]}...")
+    else:
+        print("   ❌ 텍스트를 추출하지 못했습니다.")
+
+def test_tesseract_on_images(single_pass=True, stream_path=None):
+    """
+    TesseractOCR을 사용하여 모든 이미지에서 텍스트를 추출하고 분석합니다.
+    single_pass: True면 이미지당 Tesseract를 한 번만 실행 (full_text는 image_to_data 결과에서 재구성)
+    stream_path: 지정하면 결과를 모으지 않고 이미지마다 바로 기록 (.ndjson: 한 줄씩, 이미 기록된 이미지는 건너뜀 / .ocrc: 열 기반 바이너리)
+    """
     
     print("🔧 TesseractOCR 초기화 중...")
     
@@ -38,152 +267,35 @@ def test_tesseract_on_images():
     
     print(f"📁 발견된 이미지 파일: {len(image_files)}개")
     
-    results = []
+    sink = ResultSink('tesseract_test_results.json', stream_path)
+    if sink.done:
+        print(f"♻️  이미 기록된 {len(sink.done)}개 이미지는 건너뜁니다: {stream_path}")
     
-    for img_path in image_files:
+    for img_path in sink.pending(image_files):
         print(f"\n🖼️  처리 중: {img_path.name}")
         
         try:
-            # 이미지 읽기 (OpenCV)
-            image_cv = cv2.imread(str(img_path))
-            if image_cv is None:
+            result = ocr_image_tesseract(img_path, single_pass=single_pass)
+            if result is None:
                 print(f"❌ 이미지를 읽을 수 없습니다: {img_path}")
                 continue
             
-            # PIL Image로 변환 (Tesseract는 PIL Image를 선호)
-            image_pil = Image.fromarray(cv2.cvtColor(image_cv, cv2.COLOR_BGR2RGB))
-            
-            # Tesseract OCR 실행
-            start_time = time.time()
-            
-            # 한글 + 영어 인식 설정
-            config = '--oem 3 --psm 6 -l kor+eng'
-            
-            # 텍스트 추출
-            text = pytesseract.image_to_string(image_pil, config=config)
-            
-            # 상세 정보 추출 (bbox 포함)
-            data = pytesseract.image_to_data(image_pil, config=config, output_type=pytesseract.Output.DICT)
-            
-            processing_time = time.time() - start_time
-            
-            # 결과 분석
-            extracted_texts = []
-            total_confidence = 0
-            total_length = 0
-            valid_text_count = 0
-            
-            # data에서 유효한 텍스트 추출
-            for i in range(len(data['text'])):
-                text_item = data['text'][i].strip()
-                conf = data['conf'][i]
-                
-                if text_item and conf > 0:  # 유효한 텍스트만
-                    extracted_texts.append({
-                        'text': text_item,
-                        'confidence': conf / 100.0,  # 0-100을 0-1로 변환
-                        'bbox': [
-                            data['left'][i],
-                            data['top'][i],
-                            data['left'][i] + data['width'][i],
-                            data['top'][i] + data['height'][i]
-                        ]
-                    })
-                    total_confidence += conf
-                    total_length += len(text_item)
-                    valid_text_count += 1
-            
-            avg_confidence = total_confidence / valid_text_count if valid_text_count > 0 else 0
-            
-            # 결과 저장
-            result = {
-                'image_name': img_path.name,
-                'processing_time': processing_time,
-                'text_count': valid_text_count,
-                'avg_confidence': avg_confidence / 100.0,  # 0-1로 변환
-                'total_length': total_length,
-                'extracted_texts': extracted_texts,
-                'full_text': text,
-                'raw_data': {
-                    'text': data['text'],
-                    'conf': data['conf'],
-                    'left': data['left'],
-                    'top': data['top'],
-                    'width': data['width'],
-                    'height': data['height']
-                }
-            }
-            
-            results.append(result)
-            
-            # 결과 출력
-            print(f"   ⏱️  처리 시간: {processing_time:.2f}초")
-            print(f"   📝 추출된 텍스트 수: {valid_text_count}개")
-            print(f"   🎯 평균 신뢰도: {avg_confidence/100:.2f}")
-            print(f"   📏 총 텍스트 길이: {total_length}자")
-            
-            if extracted_texts:
-                print(f"   📄 추출된 텍스트 미리보기:")
-                for i, item in enumerate(extracted_texts[:10]):  # 처음 10개만 표시
-                    print(f"      {i+1}. '{item['text']}' (신뢰도: {item['confidence']:.2f})")
-                if len(extracted_texts) > 10:
-                    print(f"      ... 외 {len(extracted_texts)-10}개 더")
-                
-                # 전체 텍스트 미리보기
-                print(f"   📄 전체 텍스트 미리보기 (첫 200자):")
-                print(f"      {text[:200]}...")
-            else:
-                print("   ❌ 텍스트를 추출하지 못했습니다.")
+            sink.add(result)
+            print_image_result(result)
                 
         except Exception as e:
             print(f"❌ 오류 발생: {e}")
-            results.append({
-                'image_name': img_path.name,
-                'error': str(e),
-                'processing_time': 0,
-                'text_count': 0,
-                'avg_confidence': 0,
-                'total_length': 0,
-                'extracted_texts': [],
-                'full_text': ''
-            })
-    
-    # 전체 결과 요약
-    print(f"\n{'='*60}")
-    print("📊 전체 결과 요약")
-    print(f"{'='*60}")
-    
-    successful_images = [r for r in results if 'error' not in r and r['text_count'] > 0]
-    failed_images = [r for r in results if 'error' in r or r['text_count'] == 0]
-    
-    print(f"✅ 성공: {len(successful_images)}개 이미지에서 텍스트 추출")
-    print(f"❌ 실패: {len(failed_images)}개 이미지")
-    
-    if successful_images:
-        avg_processing_time = sum(r['processing_time'] for r in successful_images) / len(successful_images)
-        total_texts = sum(r['text_count'] for r in successful_images)
-        avg_confidence = sum(r['avg_confidence'] for r in successful_images) / len(successful_images)
-        
-        print(f"⏱️  평균 처리 시간: {avg_processing_time:.2f}초")
-        print(f"📝 총 추출된 텍스트: {total_texts}개")
-        print(f"🎯 평균 신뢰도: {avg_confidence:.2f}")
-    
-    # 결과를 JSON 파일로 저장
-    output_file = 'tesseract_test_results.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+            sink.add(error_result(img_path.name, e))
     
-    print(f"\n💾 결과가 '{output_file}'에 저장되었습니다.")
+    # 전체 결과 요약 (결과 파일 저장 후)
+    summary = sink.close()
+    summary.print_summary()
+    print(f"\n💾 결과가 '{sink.saved_path}'에 저장되었습니다.")
     
     # 가장 성공적인 이미지 표시
-    if successful_images:
-        best_image = max(successful_images, key=lambda x: x['text_count'])
-        print(f"\n🏆 가장 많은 텍스트가 추출된 이미지: {best_image['image_name']}")
-        print(f"   📝 추출된 텍스트: {best_image['text_count']}개")
-        print(f"   🎯 평균 신뢰도: {best_image['avg_confidence']:.2f}")
-        print(f"   📄 텍스트 미리보기: {best_image['full_text'][:100]}...")
+    summary.print_best()
 
-def test_tesseract_on_single_image(image_path):
+def test_tesseract_on_single_image(image_path, single_pass=True):
     """단일 이미지에 대해 TesseractOCR을 테스트합니다."""
     
     print(f"🔧 TesseractOCR로 {image_path} 테스트 중...")
@@ -211,11 +323,8 @@ def test_tesseract_on_single_image(image_path):
             print(f"\n📋 {config_name} 테스트:")
             start_time = time.time()
             
-            # 텍스트 추출
-            text = pytesseract.image_to_string(image_pil, config=config)
-            
-            # 상세 정보 추출
-            data = pytesseract.image_to_data(image_pil, config=config, output_type=pytesseract.Output.DICT)
+            # 텍스트 + 상세 정보 추출
+            text, data = extract_text_and_data(image_pil, config, single_pass=single_pass)
             
             processing_time = time.time() - start_time
             
@@ -0,0 +1,71 @@
+"""
+괘선 기반 셀 검출/셀 단위 인식 테스트 - 합성 표 이미지 사용 (OCR 엔진 없이 가짜 인식기로 확인)
+    python -m pytest test_cell_ocr.py
+"""
+
+import cv2
+import numpy as np
+
+import batched_easyocr
+from cell_ocr import detect_table_cells, ocr_table_cells
+
+# 가로/세로 괘선 위치 (3행 x 3열 표)
+ROW_LINES = [20, 80, 140, 200]
+COL_LINES = [20, 140, 260, 380]
+# 글자를 넣을 셀 (행, 열) - 괘선으로 오인되지 않도록 긴 직선 획이 없는 글자
+FILLED = {(0, 0): 'ox', (1, 1): 'so', (2, 2): 'xs', (2, 0): 'co'}
+
+
+def ruled_grid():
+    image = np.full((220, 400, 3), 255, dtype=np.uint8)
+    for y in ROW_LINES:
+        cv2.line(image, (COL_LINES[0], y), (COL_LINES[-1], y), (0, 0, 0), 2)
+    for x in COL_LINES:
+        cv2.line(image, (x, ROW_LINES[0]), (x, ROW_LINES[-1]), (0, 0, 0), 2)
+    for (r, c), text in FILLED.items():
+        cv2.putText(image, text, (COL_LINES[c] + 35, ROW_LINES[r] + 42), cv2.FONT_HERSHEY_SIMPLEX, 1.0,
+                    (0, 0, 0), 2)
+    return image
+
+
+def test_detect_table_cells():
+    table = detect_table_cells(ruled_grid())
+    assert len(table['row_bounds']) == 3
+    assert len(table['col_bounds']) == 3
+    for (y1, y2), top, bottom in zip(table['row_bounds'], ROW_LINES, ROW_LINES[1:]):
+        assert top < y1 < y2 <= bottom
+    for (x1, x2), left, right in zip(table['col_bounds'], COL_LINES, COL_LINES[1:]):
+        assert left < x1 < x2 <= right
+    filled = {(r, c) for r in range(3) for c in range(3) if table['ink'][r, c] > 0.004}
+    assert filled == set(FILLED)
+
+
+def test_ocr_table_cells_easyocr(monkeypatch):
+    calls = []
+
+    def fake_recognize_crops(reader, crops, batch_size):
+        calls.append((crops, batch_size))
+        return [(f'cell{i}', 0.9) for i in range(len(crops))]
+
+    monkeypatch.setattr(batched_easyocr, 'recognize_crops', fake_recognize_crops)
+    result = ocr_table_cells(ruled_grid(), engine='easyocr', recognizer=object(), batch_size=16)
+
+    (crops, batch_size), = calls
+    assert batch_size == 16
+    assert all(crop.ndim == 2 for crop in crops)  # 인식기에는 흑백으로 넘김
+    assert (result['n_rows'], result['n_cols']) == (3, 3)
+    positions = [(cell['row'], cell['col']) for cell in result['cells']]
+    assert set(positions) == set(FILLED)
+    for i, (r, c) in enumerate(positions):
+        assert result['grid'][r][c] == f'cell{i}'
+
+
+def test_ocr_table_cells_paddleocr_keeps_every_cell():
+    class FakePaddle:
+        def ocr(self, crops, det=False, cls=False):
+            # PaddleOCR 2.7+ 형식: crop마다 리스트, 인식 못한 crop은 None
+            return [None if i == 0 else [(f'p{i}', 0.8)] for i in range(len(crops))]
+
+    result = ocr_table_cells(ruled_grid(), engine='paddleocr', recognizer=FakePaddle())
+    assert len(result['cells']) == len(FILLED)
+    assert sum(1 for cell in result['cells'] if cell['text']) == len(FILLED) - 1
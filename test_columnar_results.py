@@ -0,0 +1,124 @@
+"""
+열 기반 결과 파일(.ocrc) 왕복 테스트 - 기록한 결과 dict가 키 순서/값 그대로 복원되는지 확인
+    python -m pytest test_columnar_results.py
+"""
+
+import json
+
+import numpy as np
+
+from columnar_results import ColumnarResults, ColumnarResultWriter, texts_from_raw_data
+
+
+# pytesseract 0.3.10 이하/직접 만든 표는 conf가 실수, 0.3.13은 숫자 열을 모두 int(float(...))로 변환해 정수
+FLOAT_CONF = [-1.0, -1.0, -1.0, -1.0, 96.5, 0.0, 88.25]
+INT_CONF = [-1, -1, -1, -1, 96, 0, 88]
+
+
+def tesseract_result(image_name, conf=FLOAT_CONF):
+    """pytesseract.image_to_data(output_type=DICT)의 모든 열을 가진 raw_data"""
+    raw_data = {
+        'level': [1, 2, 3, 4, 5, 5, 5],
+        'page_num': [1, 1, 1, 1, 1, 1, 1],
+        'block_num': [0, 1, 1, 1, 1, 1, 1],
+        'par_num': [0, 0, 1, 1, 1, 1, 1],
+        'line_num': [0, 0, 0, 1, 1, 1, 1],
+        'word_num': [0, 0, 0, 0, 1, 2, 3],
+        'left': [0, 10, 10, 10, 10, 60, 120],
+        'top': [0, 12, 12, 12, 12, 12, 14],
+        'width': [800, 300, 300, 300, 40, 50, 70],
+        'height': [600, 30, 30, 30, 20, 20, 22],
+        'conf': list(conf),
+        'text': ['', '', '', '', '홍길동', ' ', '09:00-18:00'],
+    }
+    extracted_texts = texts_from_raw_data(raw_data)
+    return {
+        'image_name': image_name,
+        'processing_time': 1.25,
+        'cache_hit': False,
+        'text_count': len(extracted_texts),
+        'avg_confidence': 0.92,
+        'total_length': 14,
+        'extracted_texts': extracted_texts,
+        'full_text': '홍길동 09:00-18:00\n\n\f',
+        'raw_data': raw_data,
+    }
+
+
+def easyocr_result(image_name):
+    extracted_texts = [
+        {'text': '오픈', 'confidence': 0.8731, 'bbox': [[10.0, 5.0], [50.0, 5.0], [50.0, 25.0], [10.0, 25.0]]},
+        {'text': '마감', 'confidence': 0.51, 'bbox': [[60.5, 5.25], [99.1, 6.0], [99.1, 26.0], [60.5, 25.0]]},
+    ]
+    return {
+        'image_name': image_name,
+        'processing_time': 2.5,
+        'cache_hit': True,
+        'text_count': 2,
+        'avg_confidence': 0.69155,
+        'total_length': 4,
+        'extracted_texts': extracted_texts,
+        'full_text': '오픈 마감',
+    }
+
+
+def error_result(image_name):
+    return {
+        'image_name': image_name,
+        'error': '이미지를 읽을 수 없습니다',
+        'processing_time': 0,
+        'text_count': 0,
+        'avg_confidence': 0,
+        'total_length': 0,
+        'extracted_texts': [],
+        'full_text': '',
+    }
+
+
+def refined_tesseract_result(image_name):
+    """재인식 등으로 extracted_texts가 raw_data와 달라진 경우 (둘 다 저장)"""
+    result = tesseract_result(image_name)
+    result['extracted_texts'] = [dict(result['extracted_texts'][0], text='홍길순', confidence=0.99)]
+    result['refine'] = {'engine': 'easyocr', 'refined': 1}
+    return result
+
+
+def test_round_trip(tmp_path):
+    results = [tesseract_result('t.jpg'), easyocr_result('e.jpg'), error_result('bad.jpg'),
+               refined_tesseract_result('r.jpg'), tesseract_result('int.jpg', INT_CONF)]
+    path = tmp_path / 'results.ocrc'
+    with ColumnarResultWriter(path) as writer:
+        for result in results:
+            writer.write(result)
+
+    loaded = ColumnarResults(path)
+    assert loaded.names == ['t.jpg', 'e.jpg', 'bad.jpg', 'r.jpg', 'int.jpg']
+    for original, restored in zip(results, loaded):
+        # 값뿐 아니라 키 순서와 int/float 구분까지 같아야 JSON으로 다시 저장해도 같은 파일이 됨
+        assert json.dumps(restored, ensure_ascii=False) == json.dumps(original, ensure_ascii=False)
+    assert loaded.images[0]['extracted'] == 'raw'
+    assert list(loaded.result('t.jpg')['raw_data']) == list(results[0]['raw_data'])
+    # 정수 conf 열도 extracted_texts를 raw_data에서 다시 계산 (정수로 복원되어야 confidence가 같음)
+    assert loaded.images[4]['extracted'] == 'raw'
+    assert loaded.result('int.jpg')['raw_data']['conf'] == INT_CONF
+
+
+def test_ocr_result_matches_extracted_texts(tmp_path):
+    results = [tesseract_result('t.jpg'), easyocr_result('e.jpg'), tesseract_result('int.jpg', INT_CONF)]
+    path = tmp_path / 'results.ocrc'
+    with ColumnarResultWriter(path) as writer:
+        for result in results:
+            writer.write(result)
+
+    loaded = ColumnarResults(path)
+    tesseract = loaded.ocr_result('t.jpg')
+    assert tesseract.texts == ['홍길동', '09:00-18:00']
+    assert tesseract.boxes.tolist() == [[10, 12, 50, 32], [120, 14, 190, 36]]
+    easyocr = loaded.ocr_result('e.jpg')
+    assert easyocr.quads.shape == (2, 4, 2)
+    assert easyocr.texts == ['오픈', '마감']
+    integer = loaded.ocr_result('int.jpg')
+    assert integer.texts == ['홍길동', '09:00-18:00']
+    # OCRResult는 float32
+    assert np.allclose(integer.confidences, [item['confidence'] for item in results[2]['extracted_texts']])
+    assert integer.boxes.tolist() == tesseract.boxes.tolist()
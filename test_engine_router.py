@@ -0,0 +1,56 @@
+"""
+엔진 라우터 학습 테스트 - 임시 기록 파일 사용 (OCR 실행 없이 기록만으로 확인)
+    python -m pytest test_engine_router.py
+"""
+
+import json
+
+from engine_router import MIN_SAMPLES, PRIOR_ACCURACY, EngineRouter
+from ocr_accuracy import score_accuracy
+
+
+def features(i):
+    return {'megapixels': 1.0 + i * 0.1, 'file_mb': 0.5, 'edge_density': 0.1, 'text_height': 20.0}
+
+
+def make_router(tmp_path):
+    return EngineRouter(routes=['tesseract', 'easyocr'], explore_rate=0, model_path=str(tmp_path / 'router.json'),
+                        log_path=str(tmp_path / 'timings.jsonl'))
+
+
+def test_accuracy_is_learned_only_from_labelled_records(tmp_path):
+    router = make_router(tmp_path)
+    for i in range(MIN_SAMPLES):
+        # tesseract: 라벨 점수가 높음, easyocr: 신뢰도만 높고 라벨 없음
+        router.record('tesseract', features(i), 1.0, confidence=0.4, accuracy=0.9)
+        router.record('easyocr', features(i), 3.0, confidence=0.95)
+
+    assert router.fit() == {'tesseract': (MIN_SAMPLES, MIN_SAMPLES), 'easyocr': (MIN_SAMPLES, 0),
+                            'tesseract-preprocess': (0, 0), 'easyocr-normalize': (0, 0)}
+    assert set(router.models['tesseract']) >= {'seconds', 'accuracy'}
+    assert 'accuracy' not in router.models['easyocr']
+
+    predictions = router.predict(features(0))
+    assert abs(predictions['tesseract']['accuracy'] - 0.9) < 0.05
+    assert predictions['tesseract']['accuracy_learned']
+    # 신뢰도 0.95는 정확도로 쓰지 않고 대략값 유지
+    assert predictions['easyocr']['accuracy'] == PRIOR_ACCURACY['easyocr']
+    assert predictions['easyocr']['learned'] and not predictions['easyocr']['accuracy_learned']
+    assert router.choose(features(0))[0] == 'tesseract'
+
+
+def test_old_records_are_treated_as_unlabelled(tmp_path):
+    router = make_router(tmp_path)
+    with open(router.log_path, 'w', encoding='utf-8') as f:
+        for i in range(MIN_SAMPLES):
+            # 예전 형식: 'accuracy'에 평균 신뢰도를 저장
+            f.write(json.dumps({'route': 'easyocr', 'features': features(i), 'seconds': 2.0, 'accuracy': 0.99}) + '\n')
+    assert router.fit()['easyocr'] == (MIN_SAMPLES, 0)
+    assert 'accuracy' not in router.models['easyocr']
+
+
+def test_score_accuracy_uses_label():
+    label = {'staff_names': ['임미지', '박서영'], 'time_patterns': ['13-17', '9-13']}
+    full = score_accuracy('임미지 박서영 13-17 9-13 CL CL CL X X X 1 2 3 4 5 6 7 8 9 10 11 12 13 14 15', label)
+    assert full['score'] == 100
+    assert score_accuracy('', label)['score'] < 10
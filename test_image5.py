@@ -1,15 +1,14 @@
-import easyocr
 import json
-import time
-import cv2
 from pathlib import Path
+from ocr_engines import get_easyocr_reader
+from easyocr_test import ocr_image_easyocr
 from table_schedule_parser import parse_schedule_from_ocr_result, cluster_texts_to_grid, extract_dates_from_row, extract_positions_from_row, extract_time_ranges_from_row, generate_schedules
 
 def test_image5_ocr():
     """image5.jpg에 대해 EasyOCR을 실행하고 결과를 분석합니다."""
     
     print("🔧 EasyOCR 초기화 중...")
-    reader = easyocr.Reader(['ko', 'en'], gpu=False)
+    reader = get_easyocr_reader(['ko', 'en'], gpu=False)
     print("✅ EasyOCR 초기화 완료!")
     
     # image5.jpg 읽기
@@ -21,32 +20,16 @@ def test_image5_ocr():
     print(f"\n🖼️  처리 중: {image_path}")
     
     try:
-        # 이미지 읽기
-        image = cv2.imread(image_path)
-        if image is None:
+        # EasyOCR로 텍스트 추출 (같은 이미지의 이전 결과가 있으면 캐시 사용)
+        result = ocr_image_easyocr(reader, image_path)
+        if result is None:
             print(f"❌ 이미지를 읽을 수 없습니다: {image_path}")
             return
         
-        # EasyOCR로 텍스트 추출
-        start_time = time.time()
-        ocr_results = reader.readtext(image)
-        processing_time = time.time() - start_time
-        
-        # 결과 분석
-        extracted_texts = []
-        total_confidence = 0
-        total_length = 0
-        
-        for (bbox, text, confidence) in ocr_results:
-            extracted_texts.append({
-                'text': text,
-                'confidence': float(confidence),
-                'bbox': [[float(x) for x in point] for point in bbox]
-            })
-            total_confidence += confidence
-            total_length += len(text)
-        
-        avg_confidence = total_confidence / len(extracted_texts) if extracted_texts else 0
+        processing_time = result['processing_time']
+        extracted_texts = result['extracted_texts']
+        avg_confidence = result['avg_confidence']
+        total_length = result['total_length']
         
         # 결과 출력
         print(f"   ⏱️  처리 시간: {processing_time:.2f}초")
@@ -65,15 +48,8 @@ def test_image5_ocr():
             return
         
         # 결과를 JSON 파일로 저장
-        result = {
-            'image_name': image_path,
-            'processing_time': processing_time,
-            'text_count': len(extracted_texts),
-            'avg_confidence': avg_confidence,
-            'total_length': total_length,
-            'extracted_texts': extracted_texts,
-            'full_text': ' '.join([item['text'] for item in extracted_texts])
-        }
+        result['image_name'] = image_path
+        result.pop('cache_hit', None)
         
         output_file = 'image5_ocr_results.json'
         with open(output_file, 'w', encoding='utf-8') as f:
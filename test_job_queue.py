@@ -0,0 +1,148 @@
+"""
+SQLite 작업 큐 테스트 - 임시 DB 파일 사용 (OCR 엔진 없이 process_job을 가짜 함수로 교체)
+    python -m pytest test_job_queue.py
+"""
+
+import time
+
+import pytest
+
+import job_queue
+from job_queue import JobQueue, QueueFullError, run_worker
+from schedule_pipeline import BadRequest
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'jobs.db')
+
+
+def make_queue(db_path, **options):
+    options.setdefault('retry_delay', 0)
+    return JobQueue(db_path, **options)
+
+
+def test_enqueue_lease_ack(db_path):
+    queue = make_queue(db_path)
+    first = queue.enqueue({'image_path': 'a.jpg'})
+    second = queue.enqueue({'image_path': 'b.jpg'})
+    assert queue.stats() == {'queued': 2, 'leased': 0, 'done': 0, 'failed': 0}
+
+    job = queue.lease('w1')
+    assert (job['id'], job['payload'], job['attempts']) == (first, {'image_path': 'a.jpg'}, 1)
+    assert queue.depth() == 2
+    assert queue.ack(job, {'events': []})
+    assert queue.get(first)['status'] == 'done'
+    assert queue.get(first)['result'] == {'events': []}
+
+    assert queue.lease('w1')['id'] == second
+    assert queue.lease('w1') is None
+    queue.close()
+
+
+def test_expired_lease_is_reclaimed(db_path):
+    queue = make_queue(db_path)
+    job_id = queue.enqueue({'image_path': 'a.jpg'})
+    stale = queue.lease('w1', lease_seconds=0.05)
+    assert queue.lease('w2') is None
+    time.sleep(0.1)
+
+    job = queue.lease('w2')
+    assert (job['id'], job['attempts']) == (job_id, 2)
+    # 만료된 lease로는 결과를 저장하거나 실패를 기록할 수 없음
+    assert not queue.ack(stale, {'events': []})
+    assert queue.nack(stale, 'late') is None
+    assert queue.get(job_id)['status'] == 'leased'
+    assert queue.ack(job, {'events': []})
+    queue.close()
+
+
+def test_expired_lease_after_last_attempt_fails(db_path):
+    queue = make_queue(db_path, max_attempts=1)
+    job_id = queue.enqueue({'image_path': 'a.jpg'})
+    queue.lease('w1', lease_seconds=0.05)
+    time.sleep(0.1)
+    assert queue.lease('w2') is None
+    assert queue.get(job_id)['status'] == 'failed'
+    queue.close()
+
+
+def test_nack_retries_until_max_attempts(db_path):
+    queue = make_queue(db_path, max_attempts=2)
+    job_id = queue.enqueue({'image_path': 'a.jpg'})
+
+    assert queue.nack(queue.lease('w1'), 'boom') is True
+    assert queue.get(job_id)['status'] == 'queued'
+    assert queue.nack(queue.lease('w1'), 'boom') is False
+    failed = queue.get(job_id)
+    assert (failed['status'], failed['attempts'], failed['error']) == ('failed', 2, 'boom')
+    assert queue.lease('w1') is None
+    queue.close()
+
+
+def test_nack_without_retry_fails_immediately(db_path):
+    queue = make_queue(db_path, max_attempts=3)
+    job_id = queue.enqueue({'image_path': 'a.jpg'})
+    assert queue.nack(queue.lease('w1'), 'missing', retry=False) is False
+    assert queue.get(job_id)['status'] == 'failed'
+    queue.close()
+
+
+def test_retry_waits_for_backoff(db_path):
+    queue = make_queue(db_path, retry_delay=0.2)
+    queue.enqueue({'image_path': 'a.jpg'})
+    assert queue.nack(queue.lease('w1'), 'boom') is True
+    assert queue.lease('w1') is None
+    time.sleep(0.25)
+    assert queue.lease('w1') is not None
+    queue.close()
+
+
+def test_enqueue_backpressure(db_path):
+    queue = make_queue(db_path, max_depth=1)
+    queue.enqueue({'image_path': 'a.jpg'})
+    with pytest.raises(QueueFullError):
+        queue.enqueue({'image_path': 'b.jpg'}, block=False)
+    start_time = time.time()
+    with pytest.raises(QueueFullError):
+        queue.enqueue({'image_path': 'b.jpg'}, timeout=0.2, poll_interval=0.05)
+    assert time.time() - start_time >= 0.2
+
+    # 처리가 끝나 자리가 나면 다시 받음
+    queue.ack(queue.lease('w1'))
+    assert queue.enqueue({'image_path': 'b.jpg'}, block=False)
+    queue.close()
+
+
+def test_heartbeat_keeps_long_job_leased(db_path):
+    queue = make_queue(db_path, lease_seconds=0.2)
+    queue.enqueue({'image_path': 'a.jpg'})
+    job = queue.lease('w1')
+    other = make_queue(db_path, lease_seconds=0.2)
+    with queue.heartbeat(job, interval=0.05):
+        time.sleep(0.5)
+        assert other.lease('w2') is None
+    assert queue.ack(job)
+    other.close()
+    queue.close()
+
+
+def test_run_worker_counts(db_path, monkeypatch):
+    def fake_process_job(payload):
+        if payload['image_path'] == 'missing.jpg':
+            raise FileNotFoundError(payload['image_path'])
+        if payload['image_path'] == 'broken.jpg':
+            raise BadRequest("이미지를 디코딩할 수 없습니다")
+        if payload['image_path'] == 'flaky.jpg':
+            raise RuntimeError('boom')
+        return {'events': [], 'timing': {}}
+
+    monkeypatch.setattr(job_queue, 'process_job', fake_process_job)
+    queue = make_queue(db_path)
+    for name in ('ok.jpg', 'missing.jpg', 'broken.jpg', 'flaky.jpg'):
+        queue.enqueue({'image_path': name})
+    queue.close()
+
+    counts = run_worker(db_path, worker_id='w1', exit_when_empty=True, poll_interval=0.01,
+                        max_attempts=2, retry_delay=0)
+    assert counts == {'done': 1, 'failed': 3, 'retried': 1}
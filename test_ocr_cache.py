@@ -0,0 +1,56 @@
+"""
+OCR 결과 캐시 테스트 - 임시 디렉터리 사용 (OCR 엔진 없이 가짜 결과로 확인)
+    python -m pytest test_ocr_cache.py
+"""
+
+import sys
+
+import ocr_cache
+from ocr_cache import OCRResultCache, cached_ocr
+
+PAYLOAD = {'extracted_texts': [{'text': '주간', 'confidence': 0.9, 'bbox': [1, 2, 3, 4]}]}
+
+
+def test_memory_and_disk_hits_return_copies(tmp_path):
+    cache = OCRResultCache(tmp_path / 'cache')
+    fresh = {'extracted_texts': list(PAYLOAD['extracted_texts'])}
+    first, hit = cached_ocr(b'img', 'tesseract', 'v1', '', lambda: fresh, cache=cache)
+    assert not hit
+    first['extracted_texts'].append({'text': '수정'})
+
+    second, hit = cached_ocr(b'img', 'tesseract', 'v1', '', lambda: None, cache=cache)
+    assert hit and second == PAYLOAD
+    second['extracted_texts'][0]['text'] = '수정'
+    assert cache.get(cache.make_key(b'img', 'tesseract', 'v1')) == PAYLOAD
+
+    # 새 인스턴스 = 디스크에서 읽음
+    other = OCRResultCache(tmp_path / 'cache')
+    assert other.get(other.make_key(b'img', 'tesseract', 'v1')) == PAYLOAD
+    assert other.stats['disk_hits'] == 1
+
+
+def test_disk_write_failure_keeps_memory_entry(tmp_path):
+    blocker = tmp_path / 'cache'
+    blocker.write_text('')  # 디렉터리 자리에 파일 - 하위 디렉터리를 만들 수 없음
+    cache = OCRResultCache(blocker)
+    payload, hit = cached_ocr(b'img', 'tesseract', 'v1', '', lambda: PAYLOAD, cache=cache)
+    assert payload == PAYLOAD and not hit
+    assert cached_ocr(b'img', 'tesseract', 'v1', '', lambda: None, cache=cache) == (PAYLOAD, True)
+
+
+def test_engine_version_failure_is_not_cached(monkeypatch):
+    class FakeTesseract:
+        __version__ = '0.3.13'
+        installed = False
+
+        @classmethod
+        def get_tesseract_version(cls):
+            if not cls.installed:
+                raise OSError('tesseract is not installed')
+            return '5.3.0'
+
+    monkeypatch.setitem(sys.modules, 'pytesseract', FakeTesseract)
+    monkeypatch.setattr(ocr_cache, '_ENGINE_VERSIONS', {})
+    assert ocr_cache.engine_version('tesseract') == 'unknown'
+    FakeTesseract.installed = True
+    assert ocr_cache.engine_version('tesseract') == '5.3.0/0.3.13'
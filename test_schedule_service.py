@@ -0,0 +1,83 @@
+"""
+근무표 HTTP 서비스 테스트 - 실제 소켓 없이 스트림으로 요청을 넣고 응답 상태 확인 (OCR은 가짜 함수로 교체)
+    python -m pytest test_schedule_service.py
+"""
+
+import asyncio
+import json
+
+import schedule_service
+from schedule_pipeline import BadRequest
+from schedule_service import ScheduleService
+
+
+class FakeWriter:
+    def __init__(self):
+        self.data = b''
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def request(service, target, body=b'image'):
+    """요청 하나를 처리하고 (상태 코드, 응답 dict) 반환"""
+    async def run():
+        service._slots = asyncio.Semaphore(service.max_concurrency)
+        reader = asyncio.StreamReader()
+        reader.feed_data(f"POST {target} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode('latin-1') + body)
+        reader.feed_eof()
+        writer = FakeWriter()
+        await service.handle_connection(reader, writer)
+        return writer.data
+
+    head, _, payload = asyncio.run(run()).partition(b'\r\n\r\n')
+    return int(head.split(b' ', 2)[1]), json.loads(payload)
+
+
+def make_service(monkeypatch, process):
+    monkeypatch.setattr(schedule_service, 'process_roster_image', process)
+    return ScheduleService(engines=('tesseract',), max_concurrency=1)
+
+
+def test_schedule_ok(monkeypatch):
+    def process(image_bytes, engine, *args, **kwargs):
+        return {'events': [], 'schedule_count': 0, 'text_count': 3, 'cache_hit': False, 'timing': {'ocr': 0.1}}
+
+    service = make_service(monkeypatch, process)
+    status, payload = request(service, '/schedule')
+    assert status == 200
+    assert (payload['engine'], payload['text_count']) == ('tesseract', 3)
+
+
+def test_engine_not_warmed_is_rejected(monkeypatch):
+    def process(*args, **kwargs):
+        raise AssertionError("로드하지 않은 엔진으로 처리하면 안 됨")
+
+    service = make_service(monkeypatch, process)
+    status, payload = request(service, '/schedule?engine=easyocr')
+    assert status == 400 and 'easyocr' in payload['error']
+
+
+def test_bad_request_is_400(monkeypatch):
+    def process(*args, **kwargs):
+        raise BadRequest("이미지를 디코딩할 수 없습니다")
+
+    service = make_service(monkeypatch, process)
+    assert request(service, '/schedule') == (400, {'error': "이미지를 디코딩할 수 없습니다"})
+
+
+def test_internal_error_is_500(monkeypatch, capsys):
+    def process(*args, **kwargs):
+        raise ValueError("parser bug")
+
+    service = make_service(monkeypatch, process)
+    status, _ = request(service, '/schedule')
+    assert status == 500
+    assert service.stats['errors'] == 1
+    assert 'Traceback' in capsys.readouterr().err
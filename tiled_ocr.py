@@ -0,0 +1,253 @@
+"""
+큰 근무표 사진용 타일 분할 OCR
+이미지를 겹치는 타일로 나눠 병렬로 OCR하고, 타일 경계에서 중복/잘린 박스를 정리해 합칩니다.
+결과는 table_schedule_parser.cluster_texts_to_grid에 그대로 넣을 수 있는 형식입니다.
+    [{'text': str, 'confidence': float, 'bbox': [[x1,y1],[x2,y1],[x2,y2],[x1,y2]]}]
+
+타일 크기보다 작은 이미지는 분할하지 않고 한 번에 처리합니다.
+ocr_bytes_tiled는 이미지 바이트를 받아 ocr_bytes_* 와 같은 형식의 결과 dict를 반환합니다
+(schedule_pipeline.run_ocr_bytes의 tile_pixels 옵션에서 사용).
+타일마다 따로 나온 Tesseract 단어 표는 병합한 박스와 행이 맞지 않으므로 raw_data는 만들지 않고,
+대신 결과에 'tiled' 표시를 남깁니다 (raw_data는 result.get('raw_data')로 읽고, 없으면 extracted_texts 사용).
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+DEFAULT_TILE_SIZE = 1280
+DEFAULT_OVERLAP = 160  # 가장 긴 글자 박스보다 커야 경계에 걸친 단어가 한 타일 안에 온전히 들어감
+# 타일 분할 OCR을 지원하는 엔진
+TILE_ENGINES = ('tesseract', 'easyocr')
+
+
+def make_tiles(height, width, tile_size=DEFAULT_TILE_SIZE, overlap=DEFAULT_OVERLAP):
+    """
+    겹치는 타일 좌표 목록 생성
+    return: [(x, y, w, h), ...] - 마지막 타일은 이미지 끝에 맞춰 당겨서 크기를 유지
+    """
+    if overlap >= tile_size:
+        raise ValueError("overlap은 tile_size보다 작아야 합니다")
+
+    def starts(length):
+        if length <= tile_size:
+            return [0]
+        step = tile_size - overlap
+        positions = list(range(0, length - tile_size, step))
+        positions.append(length - tile_size)
+        return positions
+
+    return [(x, y, min(tile_size, width), min(tile_size, height))
+            for y in starts(height) for x in starts(width)]
+
+
+def _boxes_to_array(items):
+    """quad/[l,t,r,b] bbox 목록을 (N, 4) [l, t, r, b] 배열로 변환"""
+    boxes = np.zeros((len(items), 4), dtype=np.float32)
+    for i, item in enumerate(items):
+        bbox = np.asarray(item['bbox'], dtype=np.float32)
+        if bbox.ndim == 2:
+            boxes[i] = [bbox[:, 0].min(), bbox[:, 1].min(), bbox[:, 0].max(), bbox[:, 1].max()]
+        else:
+            boxes[i] = bbox[:4]
+    return boxes
+
+
+def merge_tile_results(tile_items, tiles, image_shape, containment_threshold=0.6, edge_margin=2):
+    """
+    타일별 OCR 결과를 원본 좌표로 옮기고 경계 중복 제거
+    tile_items: 타일별 결과 목록 (타일 좌표 기준)
+    tiles: make_tiles 결과
+    containment_threshold: 작은 박스 면적 대비 겹치는 면적이 이 값 이상이면 같은 글자로 간주
+    edge_margin: 타일 내부 경계(이미지 가장자리가 아닌 쪽)에 이만큼 붙은 박스는 잘린 것으로 보고 우선순위를 낮춤
+    return: 병합된 결과 목록 (원본 이미지 좌표)
+    """
+    height, width = image_shape[:2]
+    items = []
+    tile_ids = []
+    truncated = []
+    for tile_id, ((tx, ty, tw, th), results) in enumerate(zip(tiles, tile_items)):
+        boxes = _boxes_to_array(results)
+        for item, (l, t, r, b) in zip(results, boxes):
+            # 이미지 가장자리가 아닌 타일 경계에 닿은 박스는 잘렸을 가능성이 있음
+            cut = ((l <= edge_margin and tx > 0) or
+                   (t <= edge_margin and ty > 0) or
+                   (r >= tw - edge_margin and tx + tw < width) or
+                   (b >= th - edge_margin and ty + th < height))
+            gl, gt, gr, gb = float(l + tx), float(t + ty), float(r + tx), float(b + ty)
+            items.append({
+                'text': item['text'],
+                'confidence': float(item['confidence']),
+                'bbox': [[gl, gt], [gr, gt], [gr, gb], [gl, gb]]
+            })
+            tile_ids.append(tile_id)
+            truncated.append(cut)
+
+    if len(tiles) <= 1 or not items:
+        return items
+
+    boxes = _boxes_to_array(items)
+    tile_ids = np.array(tile_ids)
+    # 잘리지 않은 박스 > 신뢰도 높은 박스 순으로 남김
+    scores = np.array([it['confidence'] for it in items]) - np.array(truncated, dtype=np.float32)
+    order = np.argsort(-scores, kind='stable')
+
+    areas = np.maximum(boxes[:, 2] - boxes[:, 0], 0) * np.maximum(boxes[:, 3] - boxes[:, 1], 0)
+    keep = np.ones(len(items), dtype=bool)
+    for i in order:
+        if not keep[i]:
+            continue
+        # i와 겹치는 다른 타일의 박스들을 한 번에 계산
+        iw = np.minimum(boxes[i, 2], boxes[:, 2]) - np.maximum(boxes[i, 0], boxes[:, 0])
+        ih = np.minimum(boxes[i, 3], boxes[:, 3]) - np.maximum(boxes[i, 1], boxes[:, 1])
+        inter = np.clip(iw, 0, None) * np.clip(ih, 0, None)
+        containment = inter / np.maximum(np.minimum(areas[i], areas), 1e-6)
+        duplicate = (containment >= containment_threshold) & (tile_ids != tile_ids[i]) & keep
+        duplicate[i] = False
+        keep &= ~duplicate
+
+    return [item for item, k in zip(items, keep) if k]
+
+
+def ocr_tiled(image, ocr_tile, tile_size=DEFAULT_TILE_SIZE, overlap=DEFAULT_OVERLAP, workers=None):
+    """
+    타일 분할 OCR
+    image: BGR 이미지 (numpy 배열)
+    ocr_tile: 타일 이미지(numpy 배열) -> [{'text', 'confidence', 'bbox'}] 함수
+    tile_size, overlap: 타일 크기/겹침 (픽셀)
+    workers: 동시에 처리할 타일 수 (None이면 타일 수와 CPU 수 중 작은 값)
+    return: (병합된 결과 목록, 정보 dict)
+    """
+    height, width = image.shape[:2]
+    tiles = make_tiles(height, width, tile_size, overlap)
+    workers = workers or min(len(tiles), os.cpu_count() or 1)
+
+    start_time = time.time()
+    # 슬라이스는 복사 없이 원본을 참조 (엔진이 연속 메모리를 요구하면 내부에서 복사)
+    crops = [image[y:y + h, x:x + w] for (x, y, w, h) in tiles]
+    if workers <= 1 or len(tiles) == 1:
+        tile_items = [ocr_tile(crop) for crop in crops]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            tile_items = list(executor.map(ocr_tile, crops))
+    ocr_time = time.time() - start_time
+
+    start_time = time.time()
+    merged = merge_tile_results(tile_items, tiles, image.shape)
+    merge_time = time.time() - start_time
+
+    return merged, {
+        'tiles': len(tiles),
+        'tile_size': tile_size,
+        'overlap': overlap,
+        'raw_boxes': sum(len(items) for items in tile_items),
+        'merged_boxes': len(merged),
+        'ocr_time': ocr_time,
+        'merge_time': merge_time
+    }
+
+
+def easyocr_tile_fn(reader, lock=None):
+    """
+    EasyOCR용 타일 처리 함수
+    lock: reader 사용 잠금 (None이면 ocr_engines의 EasyOCR 잠금)
+        한 Reader를 여러 스레드가 동시에 쓸 수 없어 타일 인식은 하나씩 실행됨 (모델 내부 연산은 멀티스레드)
+    """
+    if lock is None:
+        from ocr_engines import engine_lock
+        lock = engine_lock('easyocr')
+
+    def run(tile):
+        with lock:
+            results = reader.readtext(np.ascontiguousarray(tile))
+        return [{'text': text, 'confidence': float(confidence),
+                 'bbox': [[float(x), float(y)] for x, y in bbox]}
+                for bbox, text, confidence in results]
+    return run
+
+
+def tesseract_tile_fn(config='--oem 3 --psm 6 -l kor+eng'):
+    """Tesseract용 타일 처리 함수 (타일마다 별도 tesseract 프로세스 → 스레드 병렬 가능)"""
+    import cv2
+    import pytesseract
+    from PIL import Image
+
+    def run(tile):
+        image_pil = Image.fromarray(cv2.cvtColor(tile, cv2.COLOR_BGR2RGB))
+        data = pytesseract.image_to_data(image_pil, config=config, output_type=pytesseract.Output.DICT)
+        items = []
+        for i in range(len(data['text'])):
+            text = data['text'][i].strip()
+            conf = float(data['conf'][i])
+            if text and conf > 0:
+                l, t = data['left'][i], data['top'][i]
+                r, b = l + data['width'][i], t + data['height'][i]
+                items.append({'text': text, 'confidence': conf / 100.0,
+                              'bbox': [[l, t], [r, t], [r, b], [l, b]]})
+        return items
+    return run
+
+
+def ocr_bytes_tiled(image_bytes, engine='tesseract', image_name='', tile_size=DEFAULT_TILE_SIZE,
+                    overlap=DEFAULT_OVERLAP, workers=None, config=None, use_cache=True, frame=None):
+    """
+    이미지 바이트를 타일 분할 OCR - 반환값은 ocr_bytes_* 결과 dict와 같은 형식
+    (bbox는 4점 좌표, raw_data 대신 'tiled': {'tile_size', 'overlap'})
+    engine: TILE_ENGINES 중 하나
+    config: Tesseract 설정 (None이면 tesseract_test.DEFAULT_CONFIG)
+    frame: 같은 이미지의 DecodedFrame (캐시 적중 시에는 디코딩하지 않음)
+    return: 결과 dict (이미지를 디코딩할 수 없으면 None)
+    """
+    from decoded_frame import DecodedFrame
+    from ocr_cache import cached_ocr, engine_version
+
+    if engine == 'easyocr':
+        import json
+        from easyocr_test import reader_cache_params
+        from ocr_engines import get_easyocr_reader
+        reader = get_easyocr_reader(['ko', 'en'], gpu=False)
+        ocr_tile = easyocr_tile_fn(reader)
+        cache_config = (f"lang={','.join(getattr(reader, 'lang_list', []))}"
+                        f"|params={json.dumps(reader_cache_params(reader), sort_keys=True, default=str)}|readtext")
+    elif engine == 'tesseract':
+        from tesseract_test import DEFAULT_CONFIG
+        config = config or DEFAULT_CONFIG
+        ocr_tile = tesseract_tile_fn(config)
+        cache_config = config
+    else:
+        raise ValueError(f"타일 분할을 지원하지 않는 엔진: {engine}")
+    frame = frame or DecodedFrame(image_bytes, image_name)
+
+    def run_ocr():
+        try:
+            image = frame.bgr
+        except ValueError:
+            return None
+        extracted_texts, _ = ocr_tiled(image, ocr_tile, tile_size, overlap, workers)
+        return {'extracted_texts': extracted_texts}
+
+    start_time = time.time()
+    if use_cache:
+        ocr_output, cache_hit = cached_ocr(image_bytes, engine, engine_version(engine),
+                                           f"{cache_config}|tiled={tile_size},{overlap}", run_ocr)
+    else:
+        ocr_output, cache_hit = run_ocr(), False
+    processing_time = time.time() - start_time
+
+    if ocr_output is None:
+        return None
+    extracted_texts = ocr_output['extracted_texts']
+    total_confidence = sum(item['confidence'] for item in extracted_texts)
+    return {
+        'image_name': image_name,
+        'processing_time': processing_time,
+        'cache_hit': cache_hit,
+        'text_count': len(extracted_texts),
+        'avg_confidence': total_confidence / len(extracted_texts) if extracted_texts else 0,
+        'total_length': sum(len(item['text']) for item in extracted_texts),
+        'extracted_texts': extracted_texts,
+        'full_text': ' '.join(item['text'] for item in extracted_texts),
+        'tiled': {'tile_size': tile_size, 'overlap': overlap}
+    }